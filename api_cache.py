@@ -0,0 +1,200 @@
+"""
+Cache persistente (SQLite) para as respostas da YouTube Data API v3.
+
+As entradas são indexadas por endpoint + parâmetros da requisição, expiram
+conforme o TTL de cada endpoint e são removidas por LRU quando o cache passa
+do número máximo de entradas.
+
+Um acerto não escreve no banco: a hora do último acesso fica em memória e vai
+para o disco em lote (a cada ``TOUCH_FLUSH_ENTRIES`` entradas ou
+``TOUCH_FLUSH_SECONDS`` segundos, antes de uma remoção e ao sair). O tamanho
+é acompanhado por um contador aproximado, e o ``COUNT(*)`` com a remoção LRU
+só roda quando ele passa do limite, descendo até ``EVICT_TO`` do máximo.
+"""
+from __future__ import annotations
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = Path(".cache") / "youtube_api.sqlite"
+DEFAULT_MAX_ENTRIES = 50_000
+TOUCH_FLUSH_ENTRIES = 256     # horas de acesso acumuladas antes de gravar
+TOUCH_FLUSH_SECONDS = 30.0    # ou segundos desde a última gravação
+EVICT_TO = 0.9                # a remoção LRU deixa o cache com esta fração do máximo
+
+# TTL (em segundos) por endpoint da API
+DEFAULT_TTLS = {
+    "search": 7 * 24 * 3600,
+    "channels": 24 * 3600,
+    "playlists": 6 * 3600,
+    "playlistItems": 3600,
+    "videos": 6 * 3600,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key      TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    created  REAL NOT NULL,
+    accessed REAL NOT NULL,
+    body     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+"""
+
+
+class ApiCache:
+    """Cache de respostas em SQLite, seguro para uso entre threads."""
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, ttls: Dict[str, float] = None,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, refresh: bool = False):
+        self.path = Path(path)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.refresh = refresh  # ignora leituras, mas continua gravando
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")   # com WAL, sem fsync a cada commit
+        self._conn.executescript(_SCHEMA)
+        self._touched: Dict[str, float] = {}   # key -> último acesso ainda não gravado
+        self._touch_flushed = time.monotonic()
+        self._approx_entries = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def make_key(endpoint: str, params: Dict) -> str:
+        raw = json.dumps([endpoint, params], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        """Devolve a resposta em cache, ou None se ausente/expirada."""
+        if self.refresh:
+            return None
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT created, body FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            created, body = row
+            if now - created > self.ttls.get(endpoint, 0):
+                self._touched.pop(key, None)
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._touched[key] = now
+            if (len(self._touched) >= TOUCH_FLUSH_ENTRIES
+                    or time.monotonic() - self._touch_flushed >= TOUCH_FLUSH_SECONDS):
+                self._flush_touched()
+                self._conn.commit()
+        return json.loads(body)
+
+    def put(self, endpoint: str, params: Dict, response: Dict) -> None:
+        """Grava uma resposta; a remoção LRU só roda quando o tamanho aproximado passa do máximo."""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        body = json.dumps(response, ensure_ascii=False)
+        with self._lock:
+            self._touched.pop(key, None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, endpoint, created, accessed, body) VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint, now, now, body),
+            )
+            self._approx_entries += 1   # uma substituição conta a mais; a remoção recalcula
+            if self._approx_entries > self.max_entries:
+                self._evict()
+            self._conn.commit()
+
+    def _flush_touched(self) -> None:
+        """Grava as horas de acesso pendentes (chamado com a trava; o commit fica com quem chama)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+            self._touched.clear()
+        self._touch_flushed = time.monotonic()
+
+    def _evict(self) -> None:
+        """Remove as entradas menos usadas até sobrar ``EVICT_TO`` do máximo."""
+        self._flush_touched()
+        count = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        keep = int(self.max_entries * EVICT_TO) if count > self.max_entries else count
+        self._conn.execute(
+            "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed ASC LIMIT ?)",
+            (max(0, count - keep),),
+        )
+        self._approx_entries = min(count, keep)
+
+    def flush(self) -> None:
+        """Grava as horas de acesso ainda em memória."""
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._approx_entries = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
+
+
+_cache: Optional[ApiCache] = None
+_configured = False
+_config_lock = threading.RLock()
+
+
+def configure_cache(enabled: bool = True, path: Path = None, refresh: bool = False,
+                    max_entries: int = DEFAULT_MAX_ENTRIES) -> Optional[ApiCache]:
+    """Define o cache global usado pelos wrappers da API (None desativa)."""
+    global _cache, _configured
+    with _config_lock:
+        if _cache is not None:
+            try:
+                _cache.flush()
+            except sqlite3.Error:   # conexão já fechada
+                pass
+        _cache = ApiCache(path or DEFAULT_CACHE_PATH, max_entries=max_entries, refresh=refresh) if enabled else None
+        _configured = True
+        return _cache
+
+
+def get_cache() -> Optional[ApiCache]:
+    """Devolve o cache global, criando o padrão na primeira chamada.
+
+    A variável de ambiente YOUTUBE_API_CACHE pode apontar para outro arquivo
+    ou desativar o cache com "off".
+    """
+    with _config_lock:
+        if not _configured:
+            env = os.getenv("YOUTUBE_API_CACHE", "")
+            if env.lower() in ("0", "off", "false", "no"):
+                return configure_cache(enabled=False)
+            return configure_cache(path=Path(env) if env else None)
+        return _cache
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    with _config_lock:
+        if _cache is not None:
+            try:
+                _cache.flush()
+            except sqlite3.Error:   # conexão já fechada
+                pass
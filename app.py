@@ -1,101 +1,413 @@
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, Response, stream_with_context
+import json
 import os
+import shutil
 from pathlib import Path
-from youtube_playlist_scraper import main as scraper_main, get_playlist_info, iter_playlists, get_channel_id
+from youtube_playlist_scraper import main as scraper_main, YouTubeSession, channel_dir_name, channel_ref_key, extract_playlist_id, playlist_csv_path, playlist_file_paths
 import threading
 import queue
 import time
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dotenv import load_dotenv
-import pandas as pd
-import csv
-from googleapiclient.discovery import build
+from output_writers import OUTPUT_FORMATS, open_writer, output_path
+from metrics import PREFIX as METRICS_PREFIX, get_metrics
+from video_store import DEFAULT_STORE_PATH, DEFAULT_SEARCH_LIMIT, VideoStore
+from scrape_stats import SUMMARY_FILENAME, ScrapeStats, summary_path
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 
-# Global state for tracking download progress
-download_state = {
-    "is_running": False,
-    "progress": 0,
-    "message": "",
-    "status": "idle",
-    "current_playlist": "",
-    "total_playlists": 0,
-    "processed_playlists": 0,
-    "current_video": 0,
-    "total_videos": 0
-}
-
-def process_channel_playlists(youtube, channel_handle, channel_name, split, progress_queue=None):
-    all_data = []
+# Limits for the job subsystem
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "2"))
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+# Identical requests attach to the running job; a completed one is reused for this long
+RESULT_CACHE_SECONDS = int(os.getenv("JOB_RESULT_CACHE_SECONDS", "300"))
+PROGRESS_STREAM_INTERVAL = 0.25  # minimum seconds between two pushed progress events
+PROGRESS_STREAM_KEEPALIVE = 15
+SESSION_MEMO_TTL = int(os.getenv("SESSION_MEMO_TTL", "3600"))
+SESSION_MEMO_SIZE = int(os.getenv("SESSION_MEMO_SIZE", "1024"))  # channel/playlist lookups kept, least recently used dropped first
+SPLIT_WORKERS = int(os.getenv("SPLIT_WORKERS", "4"))  # playlists fetched at once, shared by every running job
+OUTPUT_DIR = Path("playlists")
+JOBS_DIR = OUTPUT_DIR / "jobs"  # every job writes into JOBS_DIR/<job_id>, removed when the job is evicted
+ZIP_CHUNK_SIZE = 256 * 1024
+
+# One API session for the whole app: per-thread clients are reused by every
+# job, and up to SESSION_MEMO_SIZE channel/playlist lookups are memoized for SESSION_MEMO_TTL seconds
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = YouTubeSession(os.getenv('YOUTUBE_API_KEY'), memo_ttl=SESSION_MEMO_TTL, memo_size=SESSION_MEMO_SIZE)
+        return _session
+
+# Playlist fetches of every job run on one shared pool, so at most SPLIT_WORKERS
+# hit the API at once no matter how many jobs are running
+_playlist_pool = None
+
+def get_playlist_pool():
+    global _playlist_pool
+    with _session_lock:
+        if _playlist_pool is None:
+            _playlist_pool = ThreadPoolExecutor(max_workers=max(1, SPLIT_WORKERS), thread_name_prefix="playlist-fetch")
+        return _playlist_pool
+
+# Every scraped video also goes into a searchable SQLite store (VIDEO_STORE=off disables it)
+_video_store = None
+
+def get_video_store():
+    global _video_store
+    path = os.getenv("VIDEO_STORE", str(DEFAULT_STORE_PATH))
+    if path.lower() == "off":
+        return None
+    with _session_lock:
+        if _video_store is None:
+            _video_store = VideoStore(Path(path))
+        return _video_store
+
+def new_download_state():
+    """Initial progress state of a download job"""
+    return {
+        "is_running": False,
+        "progress": 0,
+        "message": "",
+        "status": "idle",
+        "current_playlist": "",
+        "total_playlists": 0,
+        "processed_playlists": 0,
+        "current_video": 0,
+        "total_videos": 0,
+        "detail": "",
+        "playlist_progress": 0,
+        "output_dir": "",  # the job's own folder, relative to OUTPUT_DIR
+        "files": [],  # written by the job, relative to its output_dir
+        "failed_playlists": [],  # one message per channel/playlist that could not be scraped
+        "stats": None  # per channel/playlist aggregates, set when the job finishes
+    }
+
+class JobState(dict):
+    """Progress state that wakes up stream subscribers whenever it changes"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self._changed = threading.Condition()
+
+    def __setitem__(self, key, value):
+        with self._changed:
+            super().__setitem__(key, value)
+            self.touch()
+
+    def touch(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def wait_for_change(self, version, timeout):
+        """Block until the state moves past ``version``; returns the current version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+class JobProgressQueue(queue.Queue):
+    """progress_queue handed to the scraper.
+
+    Events are folded into the job state as they arrive instead of piling up
+    unread; the scraper's own "completed" events only end a sub-task, so they
+    never change the job status.
+    """
+
+    def __init__(self, state):
+        super().__init__()
+        self.state = state
+
+    def put(self, item, block=True, timeout=None):
+        self.state["detail"] = item.get("message", "")
+        self.state["playlist_progress"] = item.get("progress", 0)
+
+class Job:
+    """A single download request and its progress state"""
+
+    def __init__(self, channel, playlists, split, output_format="csv"):
+        self.id = uuid.uuid4().hex
+        self.channel = channel
+        self.playlists = playlists
+        self.split = split
+        self.output_format = output_format
+        self.created_at = time.time()
+        self.finished_at = None
+        self.subscribers = 1  # requests served by this job, including coalesced ones
+        self.output_dir = JOBS_DIR / self.id
+        self.state = JobState(new_download_state())
+        self.state["output_dir"] = self.output_dir.relative_to(OUTPUT_DIR).as_posix()
+        self.state["status"] = "queued"
+        self.state["message"] = "Aguardando na fila..."
+        self.progress_queue = JobProgressQueue(self.state)
+
+    def run(self):
+        try:
+            run_scraper(self.channel, self.playlists, self.split, self.output_dir, self.state, self.progress_queue,
+                        output_format=self.output_format)
+        finally:
+            self.finished_at = time.time()
+            self.state.touch()
+
+    def stream(self):
+        """Server-Sent Events with the job state, coalesced to one event per interval"""
+        version = None
+        while True:
+            current = self.state.wait_for_change(version, PROGRESS_STREAM_KEEPALIVE)
+            if current == version:
+                yield ": keep-alive\n\n"
+                continue
+            version = current
+            yield f"data: {json.dumps(self.to_dict())}\n\n"
+            if self.finished_at is not None:
+                return
+            time.sleep(PROGRESS_STREAM_INTERVAL)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "channel": self.channel,
+            "playlists": self.playlists,
+            "split": self.split,
+            "format": self.output_format,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "subscribers": self.subscribers,
+            **self.state,
+        }
+
+def job_key(channel, playlists, split, output_format="csv"):
+    """Normalized target of a download: the channel reference and playlist IDs plus the output options.
+
+    Computed from the request alone, without calling the API: the channel is
+    resolved (and any API error reported) by the job itself.
+    """
+    channel_key = None
+    if channel:
+        try:
+            channel_key = channel_ref_key(channel)
+        except Exception:
+            channel_key = channel.strip().lower()  # the job itself reports the error
+    playlist_keys = []
+    for url in playlists or []:
+        try:
+            playlist_keys.append(extract_playlist_id(url))
+        except Exception:
+            playlist_keys.append(url.strip())
+    return channel_key, tuple(playlist_keys), bool(split), output_format
+
+class JobManager:
+    """Bounded worker pool with a queue of pending jobs and time-based eviction.
+
+    Jobs are single-flight per ``job_key``: a request for a target that is
+    already queued or running attaches to that job, and one that completed
+    less than ``result_ttl`` seconds ago is answered with its result.
+    """
+
+    def __init__(self, max_workers=MAX_CONCURRENT_JOBS, retention=JOB_RETENTION_SECONDS, result_ttl=RESULT_CACHE_SECONDS):
+        self.retention = retention
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scraper-job")
+        self._jobs = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0  # requests attached to an in-flight job
+        self.reused = 0     # requests answered from a recently completed job
+
+    def submit(self, channel, playlists, split, output_format="csv", key=None):
+        """Queue a job; returns (job, reused) where ``reused`` tells whether an existing job was handed back"""
+        with self._lock:
+            self._evict()
+            existing = self._by_key.get(key) if key is not None else None
+            if existing is not None and self._reusable(existing):
+                existing.subscribers += 1
+                if existing.finished_at is None:
+                    self.coalesced += 1
+                else:
+                    self.reused += 1
+                return existing, True
+            job = Job(channel, playlists, split, output_format)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._by_key[key] = job
+        self._executor.submit(job.run)
+        return job, False
+
+    def get(self, job_id):
+        with self._lock:
+            self._evict()
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            self._evict()
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+
+    def _reusable(self, job):
+        if job.finished_at is None:
+            return True
+        return job.state["status"] == "completed" and time.time() - job.finished_at < self.result_ttl
+
+    def _evict(self):
+        cutoff = time.time() - self.retention
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]:
+            shutil.rmtree(self._jobs.pop(job_id).output_dir, ignore_errors=True)
+        for key in [k for k, j in self._by_key.items() if j.id not in self._jobs]:
+            del self._by_key[key]
+
+jobs = JobManager()
+
+def write_playlist_file(rows, path, output_format="csv"):
+    """Write one playlist to its own file (';'-separated like the single-file CSV)"""
+    writer = open_writer(path, output_format, sep=';')
+    try:
+        writer.write_rows(rows)
+    finally:
+        writer.close()
+    return path
+
+def add_job_file(state, path, output_dir):
+    state["files"] = state["files"] + [path.relative_to(output_dir).as_posix()]
+
+def add_job_failure(state, message):
+    state["failed_playlists"] = state["failed_playlists"] + [message]
+
+def fetch_playlist_rows(session, progress_queue, stats, **target):
+    """Rows of one playlist (``playlist_id=`` or ``playlist_url=``), fetched on the shared playlist pool"""
+    return get_playlist_pool().submit(
+        scraper_main, None, Path("playlists.csv"), True, return_data=True, progress_queue=progress_queue,
+        session=session, store=get_video_store(), stats=stats, **target,
+    ).result()
+
+def process_channel_playlists(session, channel_handle, channel_name, split, state, progress_queue=None, writer=None, output_format="csv", stats=None, output_dir=OUTPUT_DIR):
+    """Fetch every playlist of a channel.
+
+    In split mode up to SPLIT_WORKERS playlists are queued on the shared
+    playlist pool at once and each one is written to its own file as soon as
+    it completes; returns (files, videos). Otherwise streams the rows into
+    ``writer`` and returns the number of rows written. Playlists that fail
+    are recorded in ``state["failed_playlists"]`` and skipped.
+    """
     arquivos_gerados = 0
     videos_processados = 0
     try:
-        channel_id = get_channel_id(youtube, channel_handle)
+        channel_id = session.channel_id(channel_handle)
     except Exception as e:
-        download_state["message"] = f"Erro ao encontrar o canal: {str(e)}"
-        download_state["status"] = "error"
-        return (0, 0) if split else []
+        state["message"] = f"Erro ao encontrar o canal: {str(e)}"
+        state["status"] = "error"
+        return (0, 0) if split else 0
     try:
-        playlists = list(iter_playlists(youtube, channel_id))
+        playlists = session.playlists(channel_id)
     except Exception as e:
-        download_state["message"] = f"Erro ao obter playlists do canal: {str(e)}"
-        download_state["status"] = "error"
-        return (0, 0) if split else []
+        state["message"] = f"Erro ao obter playlists do canal: {str(e)}"
+        state["status"] = "error"
+        return (0, 0) if split else 0
     if not playlists:
-        download_state["message"] = "Nenhuma playlist encontrada neste canal"
-        download_state["status"] = "error"
-        return (0, 0) if split else []
+        state["message"] = "Nenhuma playlist encontrada neste canal"
+        state["status"] = "error"
+        return (0, 0) if split else 0
     total_playlists = len(playlists)
-    download_state["total_playlists"] = total_playlists
-    download_state["processed_playlists"] = 0
+    state["total_playlists"] = total_playlists
+    state["processed_playlists"] = 0
+    if split:
+        channel_dir = output_dir / channel_dir_name(channel_handle)
+        # Files are written in parallel: titles that sanitize to the same name get the playlist ID appended
+        paths = playlist_file_paths(channel_dir, playlists, output_format)
+
+        def fetch_and_write(pl):
+            rows = scraper_main(None, Path("playlists.csv"), True, channel=channel_id, playlist_id=pl["id"], return_data=True, progress_queue=progress_queue, session=session, store=get_video_store(), stats=stats)
+            if not rows:
+                return None, 0
+            return write_playlist_file(rows, paths[pl["id"]], output_format), len(rows)
+
+        # Only SPLIT_WORKERS playlists of this job wait on the shared pool at a time,
+        # so a large channel does not hold back the other jobs' playlists
+        pool = get_playlist_pool()
+        remaining = iter(playlists)
+        pending = {}
+
+        def submit_next():
+            pl = next(remaining, None)
+            if pl is not None:
+                pending[pool.submit(fetch_and_write, pl)] = pl
+
+        for _ in range(max(1, SPLIT_WORKERS)):
+            submit_next()
+        done = 0
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                pl = pending.pop(future)
+                submit_next()
+                done += 1
+                state["processed_playlists"] = done
+                state["current_playlist"] = pl["title"]
+                state["message"] = f"Playlist {done} de {total_playlists} concluída: {pl['title']}"
+                state["progress"] = done / total_playlists * 100
+                try:
+                    path, rows = future.result()
+                except Exception as e:
+                    add_job_failure(state, f"Playlist {pl['title']}: {str(e)}")
+                    continue
+                if path is not None:
+                    add_job_file(state, path, output_dir)
+                    arquivos_gerados += 1
+                    videos_processados += rows
+        return arquivos_gerados, videos_processados
     for i, pl in enumerate(playlists, 1):
-        download_state["current_playlist"] = pl["title"]
-        download_state["processed_playlists"] = i - 1
-        download_state["message"] = f"Processando playlist {i} de {total_playlists}: {pl['title']}"
-        download_state["progress"] = (i - 1) / total_playlists * 100
+        state["current_playlist"] = pl["title"]
+        state["processed_playlists"] = i - 1
+        state["message"] = f"Processando playlist {i} de {total_playlists}: {pl['title']}"
+        state["progress"] = (i - 1) / total_playlists * 100
         try:
-            playlist_data = scraper_main(None, Path("playlists.csv"), True, channel=channel_id, playlist_id=pl["id"], return_data=True, progress_queue=progress_queue)
-            if split:
-                arquivos_gerados += 1
-                if playlist_data:
-                    videos_processados += len(playlist_data)
-            else:
-                if playlist_data:
-                    all_data.extend(playlist_data)
-        except Exception:
+            playlist_data = fetch_playlist_rows(session, progress_queue, stats, channel=channel_id, playlist_id=pl["id"])
+            if playlist_data:
+                videos_processados += writer.write_rows(playlist_data)
+                writer.end_group()
+        except Exception as e:
+            add_job_failure(state, f"Playlist {pl['title']}: {str(e)}")
             continue
-    if split:
-        return arquivos_gerados, videos_processados
-    else:
-        return all_data
+    return videos_processados
 
-def run_scraper(channel, playlists, split, output_dir):
-    """Run the scraper in a separate thread and update progress"""
-    global download_state
-    
+def run_scraper(channel, playlists, split, output_dir, state, progress_queue=None, output_format="csv"):
+    """Run the scraper for one job and update its progress state; every file goes under ``output_dir``"""
+    writer = None
+    output_dir = Path(output_dir)
     try:
-        download_state["is_running"] = True
-        download_state["progress"] = 0
-        download_state["message"] = "Iniciando download..."
-        download_state["status"] = "in_progress"
-        download_state["current_playlist"] = ""
-        download_state["total_playlists"] = 0
-        download_state["processed_playlists"] = 0
-        download_state["current_video"] = 0
-        download_state["total_videos"] = 0
+        state["is_running"] = True
+        state["progress"] = 0
+        state["message"] = "Iniciando download..."
+        state["status"] = "in_progress"
+        state["current_playlist"] = ""
+        state["total_playlists"] = 0
+        state["processed_playlists"] = 0
+        state["current_video"] = 0
+        state["total_videos"] = 0
+        state["files"] = []
+        state["failed_playlists"] = []
+        state["stats"] = None
+        # Aggregates are collected by the scraper while it builds the rows
+        stats = ScrapeStats()
         
-        all_data = []
+        # Non-split jobs stream every playlist into a single file as soon as it is fetched
+        # (CSV with ';', or one row group per playlist in the columnar formats)
+        writer = None if split else open_writer(output_path(output_dir / "all_playlists.csv", output_format), output_format, sep=';')
         total_items = 0
         processed_items = 0
-        failed_playlists = []
         total_videos_processados = 0
         arquivos_gerados_sucesso = 0
         
-        # Initialize YouTube API
-        youtube = build("youtube", "v3", developerKey=os.getenv('YOUTUBE_API_KEY'), cache_discovery=False)
+        # Shared YouTube API session
+        session = get_session()
         
         # Calculate total items to process
         if channel:
@@ -105,108 +417,116 @@ def run_scraper(channel, playlists, split, output_dir):
             
         # Process channel if provided
         if channel:
-            download_state["message"] = f"Processando canal: {channel}"
+            state["message"] = f"Processando canal: {channel}"
             try:
                 if split:
-                    arq_canal, vids_canal = process_channel_playlists(youtube, channel, channel, split)
+                    arq_canal, vids_canal = process_channel_playlists(session, channel, channel, split, state, progress_queue, output_format=output_format, stats=stats, output_dir=output_dir)
                     arquivos_gerados_sucesso += arq_canal
                     total_videos_processados += vids_canal
                 else:
-                    channel_data = process_channel_playlists(youtube, channel, channel, split)
-                    if channel_data:
-                        all_data.extend(channel_data)
-                        total_videos_processados += len(channel_data)
+                    total_videos_processados += process_channel_playlists(session, channel, channel, split, state, progress_queue, writer=writer, stats=stats, output_dir=output_dir)
                     arquivos_gerados_sucesso = 1
+                if state["status"] == "error":
+                    # the channel could not be resolved or listed; keep it out of the result cache
+                    add_job_failure(state, f"Canal {channel}: {state['message']}")
+                    state["status"] = "in_progress"
                 processed_items += 1
-                download_state["progress"] = (processed_items / total_items) * 100
+                state["progress"] = (processed_items / total_items) * 100
             except Exception as e:
-                failed_playlists.append(f"Canal {channel}: {str(e)}")
-                download_state["message"] = f"Erro no canal {channel}, continuando com as playlists..."
+                add_job_failure(state, f"Canal {channel}: {str(e)}")
+                state["message"] = f"Erro no canal {channel}, continuando com as playlists..."
         
         # Process individual playlists if provided
         if playlists:
-            download_state["total_playlists"] = len(playlists)
+            state["total_playlists"] = len(playlists)
             for i, playlist_url in enumerate(playlists, 1):
                 # Get playlist info for better progress display
                 try:
                     playlist_id = playlist_url.split('list=')[-1]
                     if not playlist_id or 'youtube.com' not in playlist_url:
                         raise Exception("URL da playlist inválida")
-                    playlist_info = get_playlist_info(youtube, playlist_id)
+                    playlist_info = session.playlist_info(playlist_id)
                     playlist_title = playlist_info["title"]
                 except Exception as e:
-                    failed_playlists.append(f"Playlist {i}/{len(playlists)}: {str(e)}")
-                    download_state["message"] = f"Erro na playlist {i}/{len(playlists)}, continuando..."
+                    add_job_failure(state, f"Playlist {i}/{len(playlists)}: {str(e)}")
+                    state["message"] = f"Erro na playlist {i}/{len(playlists)}, continuando..."
                     processed_items += 1
-                    download_state["progress"] = (processed_items / total_items) * 100
+                    state["progress"] = (processed_items / total_items) * 100
                     continue
-                download_state["current_playlist"] = playlist_title
-                download_state["processed_playlists"] = i - 1
-                download_state["message"] = f"Processando playlist {i}/{len(playlists)}: {playlist_title}"
+                state["current_playlist"] = playlist_title
+                state["processed_playlists"] = i - 1
+                state["message"] = f"Processando playlist {i}/{len(playlists)}: {playlist_title}"
                 try:
+                    playlist_data = fetch_playlist_rows(session, progress_queue, stats, playlist_url=playlist_url)
                     if split:
-                        playlist_data = scraper_main(None, Path("playlists.csv"), True, playlist_url=playlist_url, return_data=True, progress_queue=None)
                         if playlist_data:
+                            path = playlist_csv_path(output_dir / "single_playlists", playlist_title, output_format)
+                            if path.relative_to(output_dir).as_posix().lower() in {f.lower() for f in state["files"]}:
+                                # another playlist of this job already took the name
+                                path = playlist_csv_path(output_dir / "single_playlists", f"{playlist_title} {playlist_info['id']}", output_format)
+                            add_job_file(state, write_playlist_file(playlist_data, path, output_format), output_dir)
                             total_videos_processados += len(playlist_data)
-                        arquivos_gerados_sucesso += 1
+                            arquivos_gerados_sucesso += 1
                     else:
-                        playlist_data = scraper_main(None, Path("playlists.csv"), True, playlist_url=playlist_url, return_data=True, progress_queue=None)
                         if playlist_data:
-                            all_data.extend(playlist_data)
-                            total_videos_processados += len(playlist_data)
+                            total_videos_processados += writer.write_rows(playlist_data)
+                            writer.end_group()
                         arquivos_gerados_sucesso = 1
                     processed_items += 1
-                    download_state["progress"] = (processed_items / total_items) * 100
+                    state["progress"] = (processed_items / total_items) * 100
                 except Exception as e:
-                    failed_playlists.append(f"Playlist {i}/{len(playlists)} ({playlist_title}): {str(e)}")
-                    download_state["message"] = f"Erro na playlist {i}/{len(playlists)} ({playlist_title}), continuando..."
+                    add_job_failure(state, f"Playlist {i}/{len(playlists)} ({playlist_title}): {str(e)}")
+                    state["message"] = f"Erro na playlist {i}/{len(playlists)} ({playlist_title}), continuando..."
                     processed_items += 1
-                    download_state["progress"] = (processed_items / total_items) * 100
+                    state["progress"] = (processed_items / total_items) * 100
                     continue
         
-        # If not splitting, save all data to a single CSV
-        if not split and all_data:
-            download_state["message"] = "Salvando dados em CSV..."
-            df = pd.DataFrame(all_data, columns=["channel", "playlist", "videoTitle", "description", "duration"])
-            output_file = Path("playlists") / "all_playlists.csv"
-            output_file.parent.mkdir(exist_ok=True)
-            df.to_csv(output_file, index=False, encoding="utf-8", quoting=csv.QUOTE_ALL, sep=';')
+        if writer is not None:
+            writer.close()
+            if writer.rows:
+                add_job_file(state, writer.path, output_dir)
+        summary = stats.write(summary_path(writer.path) if writer is not None else output_dir / SUMMARY_FILENAME)
+        if summary is not None:
+            add_job_file(state, summary, output_dir)
+            state["stats"] = stats.to_dict()
         
         # Update final state
-        download_state["is_running"] = False
-        download_state["progress"] = 100
+        state["is_running"] = False
+        state["progress"] = 100
         
         if split:
             arquivos_gerados = arquivos_gerados_sucesso
             videos_processados = total_videos_processados
         else:
             arquivos_gerados = 1
-            videos_processados = len(all_data)
+            videos_processados = writer.rows
 
         # Pluralização inteligente
         arq_str = "arquivo gerado" if arquivos_gerados == 1 else "arquivos gerados"
         video_str = "vídeo processado" if videos_processados == 1 else "vídeos processados"
 
-        if failed_playlists:
-            error_summary = "\n".join(failed_playlists)
-            download_state["message"] = (
+        if state["failed_playlists"]:
+            error_summary = "\n".join(state["failed_playlists"])
+            state["message"] = (
                 f"Download concluído com sucesso! {arquivos_gerados} {arq_str}, {videos_processados} {video_str}.\n"
                 f"{error_summary}"
             )
-            download_state["status"] = "error"
+            state["status"] = "error"
         else:
-            download_state["message"] = f"Download concluído com sucesso! {arquivos_gerados} {arq_str}, {videos_processados} {video_str}."
-            download_state["status"] = "completed"
+            state["message"] = f"Download concluído com sucesso! {arquivos_gerados} {arq_str}, {videos_processados} {video_str}."
+            state["status"] = "completed"
             
-        download_state["current_playlist"] = ""
-        download_state["processed_playlists"] = download_state["total_playlists"]
+        state["current_playlist"] = ""
+        state["processed_playlists"] = state["total_playlists"]
         
     except Exception as e:
-        download_state["is_running"] = False
-        download_state["progress"] = 100
-        download_state["message"] = f"Erro durante o download: {str(e)}"
-        download_state["status"] = "error"
-        download_state["current_playlist"] = ""
+        if writer is not None:
+            writer.close()
+        state["is_running"] = False
+        state["progress"] = 100
+        state["message"] = f"Erro durante o download: {str(e)}"
+        state["status"] = "error"
+        state["current_playlist"] = ""
 
 @app.route('/')
 def index():
@@ -214,40 +534,154 @@ def index():
 
 @app.route('/download', methods=['POST'])
 def download():
-    global download_state
-    
     data = request.json
     channel = data.get('channel')
     playlists = data.get('playlists', [])
     split = data.get('split', False)
+    output_format = data.get('format', 'csv')
     
     if not channel and not playlists:
         return jsonify({"error": "Either channel or playlist(s) must be provided"}), 400
+    if output_format not in OUTPUT_FORMATS:
+        return jsonify({"error": f"Unknown format, expected one of: {', '.join(OUTPUT_FORMATS)}"}), 400
     
-    # Reset download state
-    download_state["is_running"] = False
-    download_state["progress"] = 0
-    download_state["message"] = ""
-    download_state["status"] = "idle"
-    download_state["current_playlist"] = ""
-    download_state["total_playlists"] = 0
-    download_state["processed_playlists"] = 0
-    download_state["current_video"] = 0
-    download_state["total_videos"] = 0
+    # Queue the job (it starts as soon as a worker is free), or join an identical one
+    job, reused = jobs.submit(channel, playlists, split, output_format, key=job_key(channel, playlists, split, output_format))
+    if not reused:
+        message = "Download started"
+    elif job.finished_at is None:
+        message = "Attached to an identical download in progress"
+    else:
+        message = "Served from a recently completed download"
     
-    # Start scraper in a separate thread
-    thread = threading.Thread(
-        target=run_scraper,
-        args=(channel, playlists, split, "playlists")
+    return jsonify({"message": message, "job_id": job.id, "coalesced": reused, "output_dir": job.state["output_dir"]})
+
+@app.route('/progress/<job_id>')
+def get_progress(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/progress/stream/<job_id>')
+def stream_progress(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return Response(
+        stream_with_context(job.stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.route('/jobs')
+def list_jobs():
+    return jsonify([job.to_dict() for job in jobs.list()])
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition: API latencies and counters, stage timings and job counts"""
+    lines = [
+        f"# HELP {METRICS_PREFIX}_jobs Jobs currently tracked by the job manager, by status.",
+        f"# TYPE {METRICS_PREFIX}_jobs gauge",
+    ]
+    counts = {}
+    for job in jobs.list():
+        counts[job.state["status"]] = counts.get(job.state["status"], 0) + 1
+    lines += [f'{METRICS_PREFIX}_jobs{{status="{status}"}} {n}' for status, n in sorted(counts.items())]
+    lines += [
+        f"# HELP {METRICS_PREFIX}_job_requests_coalesced_total Download requests that joined an identical job.",
+        f"# TYPE {METRICS_PREFIX}_job_requests_coalesced_total counter",
+        f'{METRICS_PREFIX}_job_requests_coalesced_total{{source="in_flight"}} {jobs.coalesced}',
+        f'{METRICS_PREFIX}_job_requests_coalesced_total{{source="result_cache"}} {jobs.reused}',
+    ]
+    body = get_metrics().render_prometheus() + "\n".join(lines) + "\n"
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+@app.route('/search')
+def search():
+    """Full-text search over the titles and descriptions of every scraped video"""
+    store = get_video_store()
+    if store is None:
+        return jsonify({"error": "Video store is disabled"}), 404
+    try:
+        limit = min(int(request.args.get('limit', DEFAULT_SEARCH_LIMIT)), 500)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    started = time.perf_counter()
+    results = store.search(
+        request.args.get('q', ''),
+        channel=request.args.get('channel'),
+        playlist=request.args.get('playlist'),
+        limit=limit,
+    )
+    return jsonify({"results": results, "count": len(results), "elapsed_ms": (time.perf_counter() - started) * 1000})
+
+class ZipSink:
+    """Write-only file object for zipfile; the response generator drains it after every chunk"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def stream_zip(base_dir, names):
+    """Yield a ZIP of ``names`` (relative to ``base_dir``) as it is built, one file chunk at a time.
+
+    The sink is not seekable, so zipfile writes sizes and CRCs in data
+    descriptors and memory use stays at about one chunk whatever the file sizes.
+    """
+    sink = ZipSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name in names:
+            path = base_dir / name
+            if not path.is_file():
+                continue
+            info = zipfile.ZipInfo.from_file(path, arcname=name)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(path, "rb") as src, archive.open(info, "w", force_zip64=True) as dest:
+                for chunk in iter(lambda: src.read(ZIP_CHUNK_SIZE), b""):
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+    yield sink.drain()  # remaining compressed data and the central directory
+
+@app.route('/download_zip/<job_id>')
+def download_zip(job_id):
+    """Every file written by a finished job, streamed as one ZIP archive"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job.finished_at is None:
+        return jsonify({"error": "Job is still running"}), 409
+    if not job.state["files"]:
+        return jsonify({"error": "Job produced no files"}), 404
+    return Response(
+        stream_with_context(stream_zip(job.output_dir, job.state["files"])),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="playlists-{job.id[:8]}.zip"'},
     )
-    thread.start()
-    
-    return jsonify({"message": "Download started"})
 
-@app.route('/progress')
-def get_progress():
-    global download_state
-    return jsonify(download_state)
+@app.route('/jobs/<job_id>/files/<path:filename>')
+def download_job_file(job_id, filename):
+    """One file written by a job (``filename`` as listed in the job's ``files``)"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if filename not in job.state["files"]:
+        return jsonify({"error": "File not found"}), 404
+    return send_from_directory(job.output_dir.resolve(), filename, as_attachment=True)
 
 @app.route('/download_file/<path:filename>')
 def download_file(filename):
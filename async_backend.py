@@ -0,0 +1,249 @@
+"""
+Backend assíncrono (asyncio + httpx) para raspagens com muitas requisições simultâneas.
+
+Fala direto com a API REST, num único ``httpx.AsyncClient`` com pool de
+conexões keep-alive (HTTP/2 quando o pacote ``h2`` está instalado) e com
+um limite de requisições em voo. As chamadas passam pelo mesmo cache em disco
+e pelo mesmo agendador de quota do backend síncrono.
+
+A fachada síncrona mantém um loop e um cliente por thread, reaproveitados
+entre chamadas: as conexões keep-alive sobrevivem de uma playlist para a outra.
+
+Dependência opcional: ``pip install "httpx[http2]"``.
+"""
+from __future__ import annotations
+import asyncio
+import atexit
+import threading
+import time
+from typing import AsyncGenerator, Dict, List, Tuple
+
+import youtube_playlist_scraper as scraper
+from api_cache import get_cache
+from metrics import get_metrics, stage
+from quota import get_scheduler
+from youtube_playlist_scraper import (
+    PLAYLIST_ITEMS_FIELDS, PLAYLISTS_FIELDS, VIDEOS_BATCH_SIZE, VIDEOS_FIELDS,
+    drop_listed_uploads, pack_video_batches, parse_videos_response,
+)
+
+GOOGLE_API_ENDPOINT = "https://www.googleapis.com"  # usado quando YOUTUBE_API_ENDPOINT não está definido
+DEFAULT_CONCURRENCY = 16
+
+
+class AsyncApiError(Exception):
+    """Erro HTTP da API; ``resp`` imita o objeto de resposta do httplib2 (status + cabeçalhos)."""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: str):
+        super().__init__(f"HTTP {status}: {body}")
+        self.resp = _Resp(headers)
+        self.resp.status = status
+
+
+class _Resp(dict):
+    status = 0
+
+
+class AsyncYouTube:
+    """Cliente assíncrono da YouTube Data API v3 com concorrência limitada."""
+
+    def __init__(self, api_key: str, concurrency: int = DEFAULT_CONCURRENCY, endpoint: str = None):
+        try:
+            import httpx
+        except ImportError:
+            raise Exception('O backend assíncrono requer o pacote httpx: pip install "httpx[http2]"')
+        try:
+            import h2  # noqa: F401
+            http2 = True
+        except ImportError:
+            http2 = False
+        # Mesma configuração do backend síncrono (lida na hora, como em build_client)
+        endpoint = endpoint or scraper.API_ENDPOINT or GOOGLE_API_ENDPOINT
+        self.api_key = api_key
+        self.concurrency = concurrency
+        self.endpoint = endpoint
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=f"{endpoint.rstrip('/')}/youtube/v3/",
+            http2=http2,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            headers={"Accept-Encoding": "gzip"},
+            timeout=30.0,
+        )
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "AsyncYouTube":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def call(self, resource: str, **params) -> Dict:
+        """Equivalente assíncrono de ``api_call``: cache em disco + agendador de quota."""
+        cache = get_cache()
+        if cache is not None:
+            cached = cache.get(resource, params)
+            if cached is not None:
+                get_metrics().record_cache_hit(resource)
+                return cached
+        query = {k: v for k, v in params.items() if v is not None}
+        query["key"] = self.api_key
+
+        async def send():
+            async with self._semaphore:
+                start = time.perf_counter()
+                failed = True
+                try:
+                    resp = await self._client.get(resource, params=query)
+                    failed = resp.status_code >= 400
+                finally:
+                    get_metrics().observe_request(resource, time.perf_counter() - start, failed)
+            get_scheduler().record_bytes(resource, len(resp.content))
+            if resp.status_code >= 400:
+                raise AsyncApiError(resp.status_code, dict(resp.headers), resp.text)
+            return resp.json()
+
+        data = await get_scheduler().execute_async(resource, send)
+        if cache is not None:
+            cache.put(resource, params, data)
+        return data
+
+
+# ---------- wrappers assíncronos ----------
+async def iter_playlists(api: AsyncYouTube, channel_id: str) -> AsyncGenerator[Dict, None]:
+    """Itera sobre todas as playlists públicas do canal."""
+    next_token = None
+    while True:
+        resp = await api.call(
+            "playlists",
+            channelId=channel_id,
+            part="snippet,contentDetails",
+            maxResults=50,
+            pageToken=next_token,
+            fields=PLAYLISTS_FIELDS,
+        )
+        for pl in resp["items"]:
+            yield {
+                "id": pl["id"],
+                "title": pl["snippet"]["title"],
+                "itemCount": pl.get("contentDetails", {}).get("itemCount", 0),
+            }
+        next_token = resp.get("nextPageToken")
+        if not next_token:
+            break
+
+
+async def iter_videos_in_playlist(api: AsyncYouTube, playlist_id: str) -> List[str]:
+    """Retorna todos os videoIds de uma playlist."""
+    ids = []
+    next_token = None
+    with stage("items"):
+        while True:
+            resp = await api.call(
+                "playlistItems",
+                playlistId=playlist_id,
+                part="contentDetails",
+                maxResults=50,
+                pageToken=next_token,
+                fields=PLAYLIST_ITEMS_FIELDS,
+            )
+            ids.extend(item["contentDetails"]["videoId"] for item in resp["items"])
+            next_token = resp.get("nextPageToken")
+            if not next_token:
+                break
+    return ids
+
+
+async def get_videos_metadata(api: AsyncYouTube, video_ids: List[str]) -> Dict[str, Dict]:
+    """Chama videos.list em lotes de 50, com os lotes em paralelo."""
+    async def batch(chunk):
+        with stage("metadata"):
+            return parse_videos_response(
+                await api.call("videos", id=",".join(chunk), part="snippet,contentDetails,status", fields=VIDEOS_FIELDS)
+            )
+
+    chunks = [video_ids[i : i + VIDEOS_BATCH_SIZE] for i in range(0, len(video_ids), VIDEOS_BATCH_SIZE)]
+    meta = {}
+    for part in await asyncio.gather(*(batch(chunk) for chunk in chunks)):
+        meta.update(part)
+    return meta
+
+
+async def fetch_playlists(api: AsyncYouTube, playlists: List[Dict], uploads_id: str = None) -> List[Tuple[Dict, List[str], Dict[str, Dict]]]:
+    """Pagina todas as playlists em paralelo e resolve cada vídeo do canal uma única vez.
+
+    Com ``uploads_id``, a playlist de uploads (a última) fica só com os vídeos fora das outras.
+    """
+    playlist_ids = await asyncio.gather(*(iter_videos_in_playlist(api, pl["id"]) for pl in playlists))
+    playlist_ids = drop_listed_uploads(playlists, list(playlist_ids), uploads_id)
+    batches, _ = pack_video_batches(playlist_ids)
+    meta = await get_videos_metadata(api, [vid for batch in batches for vid in batch])
+    return [
+        (pl, ids, {vid: meta[vid] for vid in ids if vid in meta})
+        for pl, ids in zip(playlists, playlist_ids)
+    ]
+
+
+# ---------- fachada síncrona ----------
+class _ThreadRunner:
+    """Loop de eventos e cliente de uma thread, reaproveitados entre chamadas."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.api = None
+
+    def client(self, api_key: str, concurrency: int) -> AsyncYouTube:
+        """Cliente da thread; é refeito só se a chave, a concorrência ou o endpoint mudarem."""
+        endpoint = scraper.API_ENDPOINT or GOOGLE_API_ENDPOINT
+        api = self.api
+        if api is None or (api.api_key, api.concurrency, api.endpoint) != (api_key, concurrency, endpoint):
+            if api is not None:
+                self.loop.run_until_complete(api.close())
+            self.api = api = AsyncYouTube(api_key, concurrency, endpoint)
+        return api
+
+    def close(self) -> None:
+        if self.loop.is_closed():
+            return
+        if self.api is not None:
+            self.loop.run_until_complete(self.api.close())
+            self.api = None
+        self.loop.close()
+
+
+_local = threading.local()
+_runners: List[_ThreadRunner] = []
+_runners_lock = threading.Lock()
+
+
+def _thread_runner() -> _ThreadRunner:
+    runner = getattr(_local, "runner", None)
+    if runner is None:
+        runner = _local.runner = _ThreadRunner()
+        with _runners_lock:
+            _runners.append(runner)
+    return runner
+
+
+@atexit.register
+def close_clients() -> None:
+    """Fecha os clientes e loops criados pela fachada síncrona."""
+    with _runners_lock:
+        runners, _runners[:] = list(_runners), []
+    for runner in runners:
+        try:
+            runner.close()
+        except RuntimeError:  # loop ainda rodando em outra thread no encerramento
+            pass
+
+
+def fetch_playlists_sync(api_key: str, playlists: List[Dict], concurrency: int = DEFAULT_CONCURRENCY, uploads_id: str = None) -> List[Tuple[Dict, List[str], Dict[str, Dict]]]:
+    """Roda ``fetch_playlists`` no loop da thread atual; usada por ``main(backend="async")``.
+
+    Cada thread guarda o seu cliente entre as chamadas, então as conexões
+    abertas para uma playlist (ou canal) servem para as seguintes.
+    """
+    runner = _thread_runner()
+    return runner.loop.run_until_complete(fetch_playlists(runner.client(api_key, concurrency), playlists, uploads_id))
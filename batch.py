@@ -0,0 +1,341 @@
+"""
+Modo lote: raspa uma lista de canais e playlists num pool de processos.
+
+O arquivo de alvos tem um canal (handle, ID ou URL) ou uma URL de playlist
+por linha; linhas vazias e comentários (``#``) são ignorados. Com ``--shard i/N``
+cada máquina fica só com os alvos cujo hash cai na sua fatia, de modo que a
+divisão não depende da ordem do arquivo nem de coordenação entre os nós.
+
+Cada shard grava um manifesto em ``playlists/.batch/`` com os arquivos gerados
+por alvo; ``merge`` junta as saídas de todos os shards na ordem do arquivo de
+alvos, então o resultado é o mesmo qualquer que seja a ordem de conclusão.
+Os manifestos levam o hash da lista de alvos e o ID da execução (por padrão
+derivado dos alvos, do número de shards e das opções de saída); ``merge``
+recusa manifestos de execuções diferentes, e cada shard apaga os que sobraram
+de outras execuções antes de começar.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from output_writers import format_for_path, output_path
+from quota import configure_scheduler, get_scheduler
+
+BATCH_DIR = Path("playlists") / ".batch"
+DEFAULT_JOBS = 4
+
+
+# ---------- alvos ----------
+def read_targets(path: Path) -> List[Dict]:
+    """Lê o arquivo de alvos: [{index, target, kind}], sem repetições e na ordem do arquivo."""
+    targets, seen = [], set()
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        target = line.split(" #", 1)[0].strip()   # comentário no fim da linha
+        if not target or target.startswith("#") or target in seen:
+            continue
+        seen.add(target)
+        kind = "playlist" if urlparse(target).path.rstrip("/").endswith("/playlist") else "channel"
+        targets.append({"index": len(targets), "target": target, "kind": kind})
+    return targets
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'2/8' -> (2, 8); os shards são numerados de 0 a N-1."""
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard inválido: {spec!r} (use i/N, ex.: 0/4)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard inválido: {spec!r} (i deve estar entre 0 e N-1)")
+    return index, count
+
+
+def shard_of(target: str, count: int) -> int:
+    """Shard de um alvo: hash estável, igual em qualquer máquina."""
+    return int(hashlib.sha1(target.encode("utf-8")).hexdigest(), 16) % count
+
+
+def select_shard(targets: List[Dict], index: int, count: int) -> List[Dict]:
+    return [t for t in targets if shard_of(t["target"], count) == index]
+
+
+def manifest_path(index: int, count: int, batch_dir: Path = BATCH_DIR) -> Path:
+    return Path(batch_dir) / f"shard-{index}-of-{count}.json"
+
+
+def targets_hash(targets: List[Dict]) -> str:
+    """Hash da lista de alvos já normalizada (comentários e linhas vazias não contam)."""
+    return hashlib.sha1("\n".join(t["target"] for t in targets).encode("utf-8")).hexdigest()
+
+
+def default_run_id(targets: List[Dict], count: int, options: Dict) -> str:
+    """ID da execução igual em todas as máquinas que recebem o mesmo arquivo, shards e opções de saída."""
+    key = json.dumps([targets_hash(targets), count, options["format"], options["split"], Path(options["out"]).name])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+def clear_stale_manifests(run_id: str, digest: str, count: int, batch_dir: Path = BATCH_DIR) -> List[Path]:
+    """Apaga os manifestos deixados por outras execuções (outro ID, outra lista de alvos ou outro N)."""
+    removed = []
+    for path in Path(batch_dir).glob("shard-*-of-*.json"):
+        try:
+            m = json.loads(path.read_text(encoding="utf-8"))
+            stale = (m.get("runId"), m.get("targetsHash"), m.get("count")) != (run_id, digest, count)
+        except (OSError, ValueError):
+            stale = True
+        if stale:
+            path.unlink(missing_ok=True)
+            removed.append(path)
+    return removed
+
+
+# ---------- worker ----------
+_worker: Dict = {}
+
+
+def _init_worker(api_key: str, options: Dict, rate: Optional[float], budget: int) -> None:
+    """Roda uma vez em cada processo: um agendador e uma sessão reaproveitados por todos os alvos."""
+    from youtube_playlist_scraper import YouTubeSession
+    scheduler = get_scheduler()
+    configure_scheduler(rate=rate or scheduler.rate, daily_budget=budget, usage_path=None)
+    _worker.update(api_key=api_key, options=options, session=YouTubeSession(api_key), store=None)
+    if options.get("store"):
+        from video_store import VideoStore
+        _worker["store"] = VideoStore(Path(options["store"]))
+
+
+def _single_dir(target: Dict) -> Path:
+    """Pasta própria de cada playlist avulsa: processos diferentes nunca gravam no mesmo arquivo."""
+    from youtube_playlist_scraper import extract_playlist_id
+    return Path("playlists") / "single_playlists" / extract_playlist_id(target["target"])
+
+
+def _target_outputs(target: Dict, options: Dict) -> List[str]:
+    """Arquivos que a raspagem do alvo gerou, na ordem das playlists."""
+    from youtube_playlist_scraper import channel_dir_name, extract_playlist_id, playlist_csv_path, playlist_file_paths
+    session, fmt = _worker["session"], options["format"]
+    playlists_dir = Path("playlists")
+    if target["kind"] == "playlist":
+        playlist = session.playlist_info(extract_playlist_id(target["target"]))
+        paths = [playlist_csv_path(_single_dir(target), playlist["title"], fmt)]
+    else:
+        channel_dir = playlists_dir / channel_dir_name(target["target"])
+        if options["split"]:
+            channel_id = session.channel_id(target["target"])
+            playlists = session.playlists(channel_id)
+            if options["uploads"]:
+                playlists = playlists + [session.uploads_playlist(channel_id)]
+            paths = list(playlist_file_paths(channel_dir, playlists, fmt).values())
+        else:
+            paths = [channel_dir / Path(options["out"]).name]
+    return [str(p) for p in paths if p.exists()]
+
+
+def _run_target(target: Dict) -> Dict:
+    from youtube_playlist_scraper import main
+    options, scheduler = _worker["options"], get_scheduler()
+    units_before, requests_before = dict(scheduler.units), dict(scheduler.requests)
+    started = time.perf_counter()
+    record = {**target, "status": "ok", "error": None, "files": []}
+    try:
+        main(
+            _worker["api_key"], Path(options["out"]), options["split"],
+            channel=target["target"] if target["kind"] == "channel" else None,
+            playlist_url=target["target"] if target["kind"] == "playlist" else None,
+            workers=options["workers"], use_cache=options["use_cache"], refresh_cache=options["refresh_cache"],
+            incremental=options["incremental"], resume=options["resume"], backend=options["backend"],
+            pipeline=options["pipeline"], output_format=options["format"], uploads=options["uploads"],
+            session=_worker["session"], store=_worker["store"],
+            single_dir=_single_dir(target) if target["kind"] == "playlist" else None,
+        )
+        record["files"] = _target_outputs(target, options)
+    except (Exception, SystemExit) as e:
+        record.update(status="error", error=str(e))
+    record["seconds"] = time.perf_counter() - started
+    record["units"] = {ep: n - units_before.get(ep, 0) for ep, n in scheduler.units.items() if n != units_before.get(ep, 0)}
+    record["requests"] = {ep: n - requests_before.get(ep, 0) for ep, n in scheduler.requests.items() if n != requests_before.get(ep, 0)}
+    return record
+
+
+# ---------- coordenação ----------
+def run_batch(api_key: str, targets_file: Path, shard: str = "0/1", jobs: int = DEFAULT_JOBS,
+              out_file: Path = Path("playlists.csv"), split: bool = False, output_format: str = None,
+              workers: int = 1, rate: float = None, use_cache: bool = True, refresh_cache: bool = False,
+              incremental: bool = False, resume: bool = False, backend: str = "threads",
+              pipeline: bool = False, store: Optional[Path] = None, uploads: bool = False,
+              batch_dir: Path = BATCH_DIR, run_id: Optional[str] = None) -> Path:
+    """Raspa os alvos do shard num pool de ``jobs`` processos e grava o manifesto do shard.
+
+    Todos os shards de uma execução precisam do mesmo ``run_id`` (o padrão já
+    coincide quando arquivo de alvos, N e opções de saída são os mesmos).
+    """
+    index, count = parse_shard(shard)
+    all_targets = read_targets(targets_file)
+    targets = select_shard(all_targets, index, count)
+    output_format = format_for_path(out_file, output_format)
+    options = {
+        "out": str(output_path(out_file, output_format)), "split": split, "format": output_format,
+        "workers": workers, "use_cache": use_cache, "refresh_cache": refresh_cache,
+        "incremental": incremental, "resume": resume, "backend": backend, "pipeline": pipeline,
+        "store": str(store) if store else None, "uploads": uploads,
+    }
+    digest = targets_hash(all_targets)
+    run_id = run_id or default_run_id(all_targets, count, options)
+    for path in clear_stale_manifests(run_id, digest, count, batch_dir):
+        print(f"🧹 Manifesto de outra execução removido: {path}")
+    jobs = max(1, min(jobs, len(targets) or 1))
+    scheduler = get_scheduler()
+    rate = (rate or scheduler.rate) / jobs     # o limite de requisições vale para o lote inteiro
+    budget = scheduler.remaining // jobs
+    print(f"📦 Shard {index}/{count}: {len(targets)} de {len(all_targets)} alvos, {jobs} processo(s)")
+
+    records = []
+    # spawn: os workers não herdam conexões SQLite (cache, banco de vídeos) abertas no processo pai
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(api_key, options, rate, budget)) as pool:
+        futures = [pool.submit(_run_target, t) for t in targets]
+        for done, fut in enumerate(as_completed(futures), 1):
+            record = fut.result()
+            scheduler.add_usage(record["units"], record["requests"])
+            records.append(record)
+            mark = "✅" if record["status"] == "ok" else "❌"
+            print(f"{mark} [{done}/{len(targets)}] {record['target']}  ({record['seconds']:.1f}s)"
+                  + (f": {record['error']}" if record["error"] else ""))
+
+    records.sort(key=lambda r: r["index"])
+    manifest = manifest_path(index, count, batch_dir)
+    manifest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = manifest.with_suffix(".tmp")
+    tmp.write_text(json.dumps({
+        "runId": run_id, "shard": index, "count": count, "targetsFile": str(targets_file), "targetsHash": digest,
+        "targets": len(all_targets), "format": output_format, "split": split, "records": records,
+    }, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, manifest)
+    failed = sum(r["status"] != "ok" for r in records)
+    print(f"🗂️  Manifesto salvo em {manifest}" + (f"  ({failed} alvo(s) com erro)" if failed else ""))
+    return manifest
+
+
+# ---------- merge ----------
+def load_manifests(batch_dir: Path = BATCH_DIR, allow_partial: bool = False) -> List[Dict]:
+    """Lê os manifestos dos shards e confere se são da mesma execução e se todos os N estão presentes."""
+    manifests = [json.loads(p.read_text(encoding="utf-8")) for p in sorted(Path(batch_dir).glob("shard-*-of-*.json"))]
+    if not manifests:
+        raise Exception(f"Nenhum manifesto encontrado em {batch_dir}")
+    runs = {(m.get("runId"), m.get("targetsHash")) for m in manifests}
+    if len(runs) != 1:
+        raise Exception(f"Manifestos de execuções diferentes em {batch_dir} "
+                        f"(IDs {', '.join(sorted(str(run) for run, _ in runs))}); rode os shards de novo ou apague os antigos")
+    counts = {m["count"] for m in manifests}
+    if len(counts) != 1:
+        raise Exception(f"Manifestos de divisões diferentes em {batch_dir}: {sorted(counts)} shards")
+    count = counts.pop()
+    missing = sorted(set(range(count)) - {m["shard"] for m in manifests})
+    if missing and not allow_partial:
+        raise Exception(f"Faltam os shards {', '.join(map(str, missing))} de {count}")
+    return manifests
+
+
+def merge_outputs(out_file: Path, batch_dir: Path = BATCH_DIR, allow_partial: bool = False) -> int:
+    """Junta as saídas de todos os shards num único arquivo, na ordem do arquivo de alvos.
+
+    Devolve o número de arquivos de origem. CSVs são concatenados sem reprocessar
+    as linhas; Parquet/Arrow mantêm um row group por arquivo de origem.
+    """
+    manifests = load_manifests(batch_dir, allow_partial)
+    formats = {m["format"] for m in manifests}
+    if len(formats) != 1:
+        raise Exception(f"Shards com formatos diferentes: {', '.join(sorted(formats))}")
+    fmt = formats.pop()
+    records = sorted((r for m in manifests for r in m["records"]), key=lambda r: r["index"])
+    sources = [Path(f) for r in records for f in r["files"]]
+    out_file = output_path(out_file, fmt)
+    out_file.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        _merge_csv(sources, out_file)
+    else:
+        _merge_columnar(sources, out_file, ipc=(fmt == "arrow"))
+    failed = [r["target"] for r in records if r["status"] != "ok"]
+    if failed:
+        print(f"⚠️  {len(failed)} alvo(s) falharam e ficaram de fora: {', '.join(failed)}")
+    print(f"✅ {len(sources)} arquivo(s) juntados em {out_file.resolve()}")
+    return len(sources)
+
+
+def _merge_csv(sources: List[Path], out_file: Path) -> None:
+    header = None
+    with open(out_file, "wb") as out:
+        for src in sources:
+            with open(src, "rb") as f:
+                first = f.readline()
+                if header is None:
+                    header = first
+                    out.write(first)
+                elif first != header:
+                    raise Exception(f"Cabeçalho diferente em {src}; os shards usaram separadores distintos?")
+                shutil.copyfileobj(f, out)
+
+
+def _iter_groups(sources: List[Path]):
+    """Row groups (Parquet) ou lotes (Arrow) de cada arquivo, um por vez e na ordem."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    for src in sources:
+        if src.suffix.lower() in (".parquet", ".pq"):
+            pf = pq.ParquetFile(src)
+            for i in range(pf.num_row_groups):
+                yield pf.read_row_group(i)
+        else:
+            with pa.memory_map(str(src)) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    yield pa.Table.from_batches([reader.get_batch(i)])
+
+
+def _merge_columnar(sources: List[Path], out_file: Path, ipc: bool) -> None:
+    """Copia um grupo por vez para um único escritor, sem carregar os shards inteiros na memória.
+
+    channel/playlist são recodificadas num dicionário que só cresce (como no
+    ``ArrowRowWriter``), então o Arrow IPC grava só os deltas e os limites dos
+    grupos são preservados.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from output_writers import _DictionaryColumn
+    dictionaries: Dict[str, _DictionaryColumn] = {}
+    writer = sink = None
+    try:
+        for group in _iter_groups(sources):
+            arrays = []
+            for field, column in zip(group.schema, group.columns):
+                if pa.types.is_dictionary(field.type):
+                    encoder = dictionaries.setdefault(field.name, _DictionaryColumn())
+                    arrays.append(encoder.encode(pa, column.cast(field.type.value_type).to_pylist()))
+                else:
+                    arrays.append(column.combine_chunks())
+            table = pa.Table.from_arrays(arrays, schema=group.schema)
+            if writer is None:
+                if ipc:
+                    sink = pa.OSFile(str(out_file), "wb")
+                    options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+                    writer = pa.ipc.new_file(sink, table.schema, options=options)
+                else:
+                    writer = pq.ParquetWriter(out_file, table.schema, compression="zstd",
+                                              use_dictionary=["channel", "playlist"])
+            if ipc:
+                writer.write_table(table, max_chunksize=max(1, table.num_rows))
+            else:
+                writer.write_table(table, row_group_size=max(1, table.num_rows))
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
@@ -0,0 +1,514 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita a YouTube Data API v3 para medir o scraper sem gastar quota.
+
+Implementa ``search.list``, ``channels.list``, ``playlists.list``,
+``playlistItems.list`` e ``videos.list`` sobre canais sintéticos gerados de
+forma determinística (N playlists com M vídeos cada, com parte dos vídeos
+repetida entre playlists e alguns privados ou removidos). Respeita
+``maxResults``/``pageToken``, ``fields=``, ``If-None-Match`` (304) e gzip, e
+permite injetar latência e erros transitórios.
+
+Uso:
+    python bench/fake_youtube_api.py --port 8765 --playlists 20 --videos 200
+    YOUTUBE_API_ENDPOINT=http://127.0.0.1:8765 python youtube_playlist_scraper.py -c @benchchannel0
+
+``GET /_stats`` devolve as requisições recebidas por endpoint e ``GET /_reset`` zera a contagem.
+"""
+from __future__ import annotations
+import argparse
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = "/youtube/v3/"
+MAX_RESULTS = 50
+WORDS = ("python", "tutorial", "aula", "live", "review", "música", "jogo", "curso",
+         "notícias", "dica", "setup", "vlog", "entrevista", "parte", "final", "especial")
+
+
+@dataclass
+class FakeConfig:
+    channels: int = 1
+    playlists: int = 10          # playlists por canal
+    videos: int = 100            # vídeos por playlist
+    shared: float = 0.2          # fração dos itens que reaproveita um vídeo de outra playlist do canal
+    unlisted: int = 0            # vídeos por canal que só aparecem nos uploads, fora de qualquer playlist
+    private: float = 0.02        # fração de vídeos privados
+    deleted: float = 0.01        # fração de vídeos removidos (somem do videos.list)
+    latency: float = 0.0         # segundos por requisição
+    jitter: float = 0.0          # latência extra aleatória, em segundos
+    error_rate: float = 0.0      # fração de requisições que falham com um erro transitório
+    seed: int = 1
+
+
+# ---------- dados sintéticos ----------
+def _make_id(prefix: str, *parts) -> str:
+    digest = hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()
+    return prefix + digest
+
+
+def _sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def _thumbnails(video_or_playlist_id: str) -> Dict:
+    base = f"https://i.ytimg.com/vi/{video_or_playlist_id}"
+    return {
+        name: {"url": f"{base}/{name}.jpg", "width": w, "height": h}
+        for name, w, h in (("default", 120, 90), ("medium", 320, 180), ("high", 480, 360),
+                           ("standard", 640, 480), ("maxres", 1280, 720))
+    }
+
+
+class FakeWorld:
+    """Canais, playlists e vídeos sintéticos, gerados uma única vez a partir da semente."""
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.channels: Dict[str, Dict] = {}
+        self.handles: Dict[str, str] = {}        # handle (sem @, minúsculo) -> channelId
+        self.playlists: Dict[str, Dict] = {}
+        self.items: Dict[str, List[str]] = {}    # playlistId -> videoIds (inclui a de uploads)
+        self.videos: Dict[str, Dict] = {}
+        self.deleted: set = set()
+        rng = random.Random(config.seed)
+        for c in range(config.channels):
+            self._make_channel(rng, c)
+
+    def _make_channel(self, rng: random.Random, c: int) -> None:
+        cfg = self.config
+        channel_id = "UC" + _make_id("", cfg.seed, "channel", c)[:22]
+        handle = f"benchchannel{c}"
+        uploads = "UU" + channel_id[2:]
+        self.channels[channel_id] = {
+            "id": channel_id,
+            "title": f"Bench Channel {c}",
+            "handle": handle,
+            "uploads": uploads,
+            "playlistIds": [],
+        }
+        self.handles[handle] = channel_id
+        channel_videos: List[str] = []
+        for p in range(cfg.playlists):
+            playlist_id = "PL" + _make_id("", cfg.seed, channel_id, "playlist", p)[:32]
+            ids = []
+            for _ in range(cfg.videos):
+                if channel_videos and rng.random() < cfg.shared:
+                    ids.append(rng.choice(channel_videos))
+                    continue
+                vid = self._make_video(rng, channel_id, len(self.videos))
+                channel_videos.append(vid)
+                ids.append(vid)
+            self.playlists[playlist_id] = {
+                "id": playlist_id,
+                "channelId": channel_id,
+                "title": f"Playlist {p}: {_sentence(rng, 3)}",
+                "description": _sentence(rng, 30),
+            }
+            self.items[playlist_id] = ids
+            self.channels[channel_id]["playlistIds"].append(playlist_id)
+        for _ in range(cfg.unlisted):
+            channel_videos.append(self._make_video(rng, channel_id, len(self.videos)))
+        self.items[uploads] = list(reversed(channel_videos))
+
+    def _make_video(self, rng: random.Random, channel_id: str, n: int) -> str:
+        cfg = self.config
+        vid = _make_id("", cfg.seed, "video", n)[:11]
+        roll = rng.random()
+        if roll < cfg.deleted:
+            self.deleted.add(vid)
+        seconds = rng.randrange(30, 3 * 3600)
+        h, rem = divmod(seconds, 3600)
+        m, s = divmod(rem, 60)
+        duration = "PT" + (f"{h}H" if h else "") + (f"{m}M" if m else "") + (f"{s}S" if s else "")
+        self.videos[vid] = {
+            "channelId": channel_id,
+            "title": f"{_sentence(rng, 6)} #{n}",
+            "description": "\n".join(_sentence(rng, 12) for _ in range(rng.randrange(1, 12))),
+            "tags": [rng.choice(WORDS) for _ in range(8)],
+            "duration": duration,
+            "privacyStatus": "private" if cfg.deleted <= roll < cfg.deleted + cfg.private else "public",
+        }
+        return vid
+
+    # ---------- recursos ----------
+    def channel_resource(self, channel_id: str) -> Dict:
+        ch = self.channels[channel_id]
+        return {
+            "kind": "youtube#channel",
+            "etag": _etag(channel_id),
+            "id": channel_id,
+            "snippet": {
+                "title": ch["title"],
+                "description": f"Canal sintético {ch['title']}",
+                "customUrl": "@" + ch["handle"],
+                "publishedAt": "2015-01-01T00:00:00Z",
+                "thumbnails": _thumbnails(channel_id),
+                "localized": {"title": ch["title"], "description": ""},
+            },
+            "contentDetails": {"relatedPlaylists": {"likes": "", "uploads": ch["uploads"]}},
+            "statistics": {"videoCount": str(len(self.items[ch["uploads"]])), "subscriberCount": "1000"},
+        }
+
+    def playlist_resource(self, playlist_id: str) -> Dict:
+        pl = self.playlists[playlist_id]
+        return {
+            "kind": "youtube#playlist",
+            "etag": _etag(playlist_id, len(self.items[playlist_id])),
+            "id": playlist_id,
+            "snippet": {
+                "publishedAt": "2016-01-01T00:00:00Z",
+                "channelId": pl["channelId"],
+                "title": pl["title"],
+                "description": pl["description"],
+                "thumbnails": _thumbnails(playlist_id),
+                "channelTitle": self.channels[pl["channelId"]]["title"],
+                "localized": {"title": pl["title"], "description": pl["description"]},
+            },
+            "contentDetails": {"itemCount": len(self.items[playlist_id])},
+        }
+
+    def playlist_item_resource(self, playlist_id: str, position: int, vid: str) -> Dict:
+        video = self.videos[vid]
+        return {
+            "kind": "youtube#playlistItem",
+            "etag": _etag(playlist_id, position, vid),
+            "id": _make_id("", playlist_id, position)[:40],
+            "snippet": {
+                "publishedAt": "2017-01-01T00:00:00Z",
+                "channelId": video["channelId"],
+                "title": video["title"],
+                "description": video["description"],
+                "thumbnails": _thumbnails(vid),
+                "playlistId": playlist_id,
+                "position": position,
+                "resourceId": {"kind": "youtube#video", "videoId": vid},
+            },
+            "contentDetails": {"videoId": vid, "videoPublishedAt": "2017-01-01T00:00:00Z"},
+            "status": {"privacyStatus": video["privacyStatus"]},
+        }
+
+    def video_resource(self, vid: str) -> Dict:
+        video = self.videos[vid]
+        return {
+            "kind": "youtube#video",
+            "etag": _etag(vid),
+            "id": vid,
+            "snippet": {
+                "publishedAt": "2017-01-01T00:00:00Z",
+                "channelId": video["channelId"],
+                "title": video["title"],
+                "description": video["description"],
+                "thumbnails": _thumbnails(vid),
+                "channelTitle": self.channels[video["channelId"]]["title"],
+                "tags": video["tags"],
+                "categoryId": "27",
+                "liveBroadcastContent": "none",
+                "localized": {"title": video["title"], "description": video["description"]},
+            },
+            "contentDetails": {
+                "duration": video["duration"],
+                "dimension": "2d",
+                "definition": "hd",
+                "caption": "false",
+                "licensedContent": False,
+                "contentRating": {},
+                "projection": "rectangular",
+            },
+            "status": {
+                "uploadStatus": "processed",
+                "privacyStatus": video["privacyStatus"],
+                "license": "youtube",
+                "embeddable": True,
+                "publicStatsViewable": True,
+                "madeForKids": False,
+            },
+        }
+
+
+def _etag(*parts) -> str:
+    return _make_id("", "etag", *parts)[:27]
+
+
+# ---------- partial responses (fields=) ----------
+def parse_fields(spec: str) -> Dict:
+    """Converte ``items(id,snippet/title),nextPageToken`` numa árvore {campo: subárvore ou None}."""
+    tree, _ = _parse_field_list(spec, 0)
+    return tree
+
+
+def _parse_field_list(spec: str, i: int) -> Tuple[Dict, int]:
+    tree: Dict = {}
+    while i < len(spec) and spec[i] != ")":
+        i = _parse_field_term(spec, i, tree)
+        if i < len(spec) and spec[i] == ",":
+            i += 1
+    return tree, i
+
+
+def _parse_field_term(spec: str, i: int, tree: Dict) -> int:
+    j = i
+    while j < len(spec) and spec[j] not in ",/()":
+        j += 1
+    name = spec[i:j].strip()
+    if j < len(spec) and spec[j] == "/":
+        sub = tree.get(name) or {}
+        j = _parse_field_term(spec, j + 1, sub)
+    elif j < len(spec) and spec[j] == "(":
+        sub, j = _parse_field_list(spec, j + 1)
+        sub = {**(tree.get(name) or {}), **sub}
+        j += 1  # ")"
+    else:
+        sub = None
+    if name in tree and tree[name] is None:
+        return j
+    tree[name] = sub
+    return j
+
+
+def apply_fields(value, tree: Optional[Dict]):
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [apply_fields(v, tree) for v in value]
+    if isinstance(value, dict):
+        return {k: apply_fields(value[k], sub) for k, sub in tree.items() if k in value}
+    return value
+
+
+# ---------- API ----------
+class ApiError(Exception):
+    def __init__(self, status: int, reason: str, message: str):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+
+    def body(self) -> Dict:
+        return {"error": {"code": self.status, "message": str(self),
+                          "errors": [{"message": str(self), "domain": "youtube", "reason": self.reason}]}}
+
+
+def _page(items: List, params: Dict) -> Tuple[List, Dict]:
+    """Aplica maxResults/pageToken; devolve os itens da página e os campos de paginação."""
+    try:
+        size = min(MAX_RESULTS, max(0, int(params.get("maxResults", 5))))
+        offset = int(params["pageToken"][1:]) if params.get("pageToken") else 0
+    except ValueError:
+        raise ApiError(400, "invalidPageToken", "The request specifies an invalid page token.")
+    extra = {"pageInfo": {"totalResults": len(items), "resultsPerPage": size}}
+    if offset + size < len(items):
+        extra["nextPageToken"] = f"T{offset + size}"
+    if offset:
+        extra["prevPageToken"] = f"T{max(0, offset - size)}"
+    return items[offset : offset + size], extra
+
+
+class FakeYouTubeApi:
+    """Responde às chamadas .list() sobre um ``FakeWorld``."""
+
+    def __init__(self, world: FakeWorld):
+        self.world = world
+
+    def handle(self, resource: str, params: Dict) -> Dict:
+        if not params.get("key"):
+            raise ApiError(403, "forbidden", "The request is missing a valid API key.")
+        if not params.get("part"):
+            raise ApiError(400, "required", "No filter selected. Expected one of: part")
+        method = getattr(self, "list_" + resource, None)
+        if method is None:
+            raise ApiError(404, "notFound", f"Unknown resource: {resource}")
+        return method(params)
+
+    def _response(self, kind: str, items: List[Dict], extra: Dict = None) -> Dict:
+        body = {"kind": f"youtube#{kind}ListResponse", "etag": "", **(extra or {}), "items": items}
+        body["etag"] = _etag(json.dumps({**(extra or {}), "items": items}, sort_keys=True))
+        return body
+
+    def list_search(self, params: Dict) -> Dict:
+        q = params.get("q", "").lstrip("@").lower()
+        channel_id = self.world.handles.get(q)
+        items = []
+        if channel_id and params.get("type", "channel") == "channel":
+            ch = self.world.channel_resource(channel_id)
+            items.append({
+                "kind": "youtube#searchResult",
+                "etag": _etag("search", channel_id),
+                "id": {"kind": "youtube#channel", "channelId": channel_id},
+                "snippet": {**ch["snippet"], "channelId": channel_id, "channelTitle": ch["snippet"]["title"]},
+            })
+        return self._response("search", items, {"regionCode": "BR"})
+
+    def list_channels(self, params: Dict) -> Dict:
+        if params.get("id"):
+            ids = params["id"].split(",")
+        elif params.get("forHandle") or params.get("forUsername"):
+            handle = (params.get("forHandle") or params.get("forUsername")).lstrip("@").lower()
+            ids = [self.world.handles[handle]] if handle in self.world.handles else []
+        else:
+            raise ApiError(400, "missingRequiredParameter", "No filter selected.")
+        items = [self.world.channel_resource(c) for c in ids if c in self.world.channels]
+        return self._response("channel", items, {"pageInfo": {"totalResults": len(items), "resultsPerPage": 5}})
+
+    def list_playlists(self, params: Dict) -> Dict:
+        if params.get("id"):
+            ids = [p for p in params["id"].split(",") if p in self.world.playlists]
+            return self._response("playlist", [self.world.playlist_resource(p) for p in ids])
+        channel_id = params.get("channelId")
+        if channel_id not in self.world.channels:
+            raise ApiError(404, "channelNotFound", "The channel specified in the channelId parameter cannot be found.")
+        page, extra = _page(self.world.channels[channel_id]["playlistIds"], params)
+        return self._response("playlist", [self.world.playlist_resource(p) for p in page], extra)
+
+    def list_playlistItems(self, params: Dict) -> Dict:
+        playlist_id = params.get("playlistId")
+        if playlist_id not in self.world.items:
+            raise ApiError(404, "playlistNotFound", "The playlist identified with the request's playlistId parameter cannot be found.")
+        ids = self.world.items[playlist_id]
+        offset = int(params["pageToken"][1:]) if str(params.get("pageToken", "")).startswith("T") else 0
+        page, extra = _page(ids, params)
+        items = [self.world.playlist_item_resource(playlist_id, offset + n, vid) for n, vid in enumerate(page)]
+        return self._response("playlistItem", items, extra)
+
+    def list_videos(self, params: Dict) -> Dict:
+        ids = [v for v in params.get("id", "").split(",") if v]
+        if len(ids) > MAX_RESULTS:
+            raise ApiError(400, "tooManyIds", "The request specifies too many video IDs.")
+        items = [self.world.video_resource(v) for v in ids if v in self.world.videos and v not in self.world.deleted]
+        return self._response("video", items, {"pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}})
+
+
+# ---------- servidor HTTP ----------
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, api: FakeYouTubeApi, config: FakeConfig):
+        super().__init__(address, FakeRequestHandler)
+        self.api = api
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def count(self, resource: str, key: str, n: int = 1) -> None:
+        with self.lock:
+            entry = self.stats.setdefault(resource, {"requests": 0, "errors": 0, "notModified": 0, "bytesOut": 0})
+            entry[key] += n
+
+    def roll(self) -> Tuple[float, bool]:
+        with self.lock:
+            delay = self.config.latency + self.rng.uniform(0, self.config.jitter)
+            return delay, self.rng.random() < self.config.error_rate
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class FakeRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, como a API real
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        if url.path == "/_stats":
+            with self.server.lock:
+                return self._send(200, self.server.stats)
+        if url.path == "/_reset":
+            with self.server.lock:
+                self.server.stats = {}
+            return self._send(200, {})
+        if not url.path.startswith(API_PREFIX):
+            return self._send(404, ApiError(404, "notFound", "Not Found").body())
+
+        resource = url.path[len(API_PREFIX):].strip("/")
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.server.count(resource, "requests")
+        delay, fail = self.server.roll()
+        if delay:
+            time.sleep(delay)
+        try:
+            if fail:
+                status, reason = random.choice(((503, "backendError"), (403, "rateLimitExceeded"), (429, "rateLimitExceeded")))
+                raise ApiError(status, reason, "Injected transient error")
+            body = self.server.api.handle(resource, params)
+        except ApiError as e:
+            self.server.count(resource, "errors")
+            return self._send(e.status, e.body(), resource)
+        # O cabeçalho ETag é o mesmo etag do corpo (calculado antes do fields=), que o cliente guarda e reenvia
+        etag = f'"{body["etag"]}"' if body.get("etag") else None
+        if params.get("fields"):
+            body = apply_fields(body, parse_fields(params["fields"]))
+        if etag and self.headers.get("If-None-Match") in (etag, etag.strip('"')):
+            self.server.count(resource, "notModified")
+            return self._send(304, None, resource, etag)
+        self._send(200, body, resource, etag)
+
+    def _send(self, status: int, body, resource: str = None, etag: str = None) -> None:
+        data = b"" if body is None else json.dumps(body).encode("utf-8")
+        gzipped = bool(data) and "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            data = gzip.compress(data, compresslevel=5)
+        self.send_response(status)
+        if body is not None:
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if data:
+            self.wfile.write(data)
+        if resource:
+            self.server.count(resource, "bytesOut", len(data))
+
+
+def start_server(config: FakeConfig, host: str = "127.0.0.1", port: int = 0) -> FakeServer:
+    """Sobe o servidor numa thread daemon; ``port=0`` escolhe uma porta livre."""
+    server = FakeServer((host, port), FakeYouTubeApi(FakeWorld(config)), config)
+    threading.Thread(target=server.serve_forever, name="fake-youtube-api", daemon=True).start()
+    return server
+
+
+def add_config_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--channels", type=int, default=FakeConfig.channels, help="Canais sintéticos (@benchchannel0, @benchchannel1, ...)")
+    ap.add_argument("--playlists", type=int, default=FakeConfig.playlists, help="Playlists por canal")
+    ap.add_argument("--videos", type=int, default=FakeConfig.videos, help="Vídeos por playlist")
+    ap.add_argument("--shared", type=float, default=FakeConfig.shared, help="Fração de itens repetidos entre playlists")
+    ap.add_argument("--unlisted", type=int, default=FakeConfig.unlisted, help="Vídeos por canal fora de qualquer playlist")
+    ap.add_argument("--latency", type=float, default=FakeConfig.latency, help="Latência por requisição, em segundos")
+    ap.add_argument("--jitter", type=float, default=FakeConfig.jitter, help="Latência extra aleatória, em segundos")
+    ap.add_argument("--error-rate", type=float, default=FakeConfig.error_rate, help="Fração de requisições com erro transitório")
+    ap.add_argument("--seed", type=int, default=FakeConfig.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeConfig:
+    return FakeConfig(
+        channels=args.channels, playlists=args.playlists, videos=args.videos, shared=args.shared, unlisted=args.unlisted,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Servidor falso da YouTube Data API v3")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    add_config_arguments(ap)
+    args = ap.parse_args()
+    server = FakeServer((args.host, args.port), FakeYouTubeApi(FakeWorld(config_from_args(args))), config_from_args(args))
+    print(f"Fake YouTube API em {server.url}  (canais: @benchchannel0..@benchchannel{args.channels - 1})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tempo de partida: quanto custa importar cada módulo num interpretador novo.
+
+Cada medida roda num processo filho com ``python -X importtime`` e vale a
+mediana de ``--repeat`` execuções. Também confere que as dependências pesadas
+(googleapiclient, pyarrow, httpx...) não são carregadas só pelo import: elas
+devem entrar apenas no caminho de código que as usa. Sai com código 1 se algum
+módulo passar do seu limite ou carregar uma dependência proibida, então serve
+de guarda contra regressões.
+
+Uso:
+    python bench/import_time.py
+    python bench/import_time.py --max-ms 150 --json import_time.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# módulo -> (limite em ms, dependências que não podem ser carregadas só pelo import)
+MODULES = {
+    "youtube_playlist_scraper": (150.0, ("googleapiclient", "pyarrow", "httpx", "asyncio", "pandas")),
+    "batch": (150.0, ("googleapiclient", "pyarrow", "httpx", "pandas")),
+    "app": (500.0, ("googleapiclient", "pyarrow", "httpx", "pandas")),   # o Flask sozinho leva ~0,25 s
+}
+
+
+def measure(module: str) -> Dict:
+    """Importa ``module`` num processo novo; devolve o tempo acumulado (ms) e os módulos carregados."""
+    code = f"import sys, json, {module}; print(json.dumps(sorted(sys.modules)))"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_DIR), os.environ.get("PYTHONPATH")]))}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_DIR, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import de {module} falhou:\n{proc.stderr}")
+    cumulative = None
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            cumulative = int(parts[1]) / 1000
+    return {"ms": cumulative, "modules": json.loads(proc.stdout)}
+
+
+def run(modules: List[str], repeat: int) -> List[Dict]:
+    results = []
+    for module in modules:
+        runs = [measure(module) for _ in range(max(1, repeat))]
+        loaded = {name.split(".")[0] for name in runs[-1]["modules"]}
+        results.append({
+            "module": module,
+            "ms": statistics.median(r["ms"] for r in runs),
+            "limitMs": MODULES[module][0],
+            "forbidden": sorted(dep for dep in MODULES[module][1] if dep in loaded),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Mede o tempo de import dos módulos do scraper")
+    ap.add_argument("--modules", default=",".join(MODULES),
+                    help=f"Módulos separados por vírgula (disponíveis: {', '.join(MODULES)})")
+    ap.add_argument("--repeat", type=int, default=5, help="Execuções por módulo (vale a mediana)")
+    ap.add_argument("--max-ms", type=float, help="Limite único para todos os módulos, em ms (padrão: o de cada módulo)")
+    ap.add_argument("--json", type=Path, help="Grava os resultados neste arquivo JSON")
+    args = ap.parse_args()
+
+    names = [n.strip() for n in args.modules.split(",") if n.strip()]
+    unknown = [n for n in names if n not in MODULES]
+    if unknown:
+        ap.error(f"módulos desconhecidos: {', '.join(unknown)}")
+
+    results = run(names, args.repeat)
+    if args.max_ms is not None:
+        for r in results:
+            r["limitMs"] = args.max_ms
+    failed = False
+    print(f"{'módulo':<28}{'import (ms)':>12}  dependências pesadas carregadas")
+    for r in results:
+        slow = r["ms"] > r["limitMs"]
+        failed |= slow or bool(r["forbidden"])
+        print(f"{r['module']:<28}{r['ms']:>12.1f}  {', '.join(r['forbidden']) or '-'}"
+              + ("  ⚠️ acima do limite" if slow else ""))
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Benchmark offline do scraper contra o servidor falso de ``fake_youtube_api.py``.
+
+Cada cenário roda num processo filho, numa pasta temporária, para que o pico
+de memória (RSS) e os arquivos gerados não se misturem entre cenários. O
+processo pai sobe o servidor falso e lê dele a contagem de requisições.
+
+Uso:
+    python bench/run_bench.py --playlists 20 --videos 200 --latency 0.02
+    python bench/run_bench.py --scenarios cli-single,cli-pipeline-single --repeat 3 --json bench.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+from urllib.request import urlopen
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+
+from fake_youtube_api import add_config_arguments, config_from_args, start_server  # noqa: E402
+
+CHANNEL = "@benchchannel0"
+
+# nome -> (ponto de entrada, opções)
+SCENARIOS = {
+    "cli-single": ("main", {"split": False}),
+    "cli-split": ("main", {"split": True}),
+    "cli-pipeline-single": ("main", {"split": False, "pipeline": True}),
+    "cli-pipeline-split": ("main", {"split": True, "pipeline": True}),
+    "cli-async-single": ("main", {"split": False, "backend": "async"}),
+    "app-single": ("run_scraper", {"split": False}),
+    "app-split": ("run_scraper", {"split": True}),
+}
+DEFAULT_SCENARIOS = [name for name in SCENARIOS if "async" not in name]
+
+
+# ---------- processo filho ----------
+def count_csv_rows(root: Path) -> int:
+    """Conta as linhas de dados dos CSVs gerados (um registro por linha, cabeçalho à parte)."""
+    import csv
+    rows = 0
+    for path in root.rglob("*.csv"):
+        with open(path, encoding="utf-8", newline="") as f:
+            sep = ";" if '";"' in f.readline() else ","   # o app grava com ';'
+            f.seek(0)
+            rows += max(0, sum(1 for _ in csv.reader(f, delimiter=sep)) - 1)
+    return rows
+
+
+def run_child(name: str, args: argparse.Namespace) -> Dict:
+    entry, options = SCENARIOS[name]
+    sys.path.insert(0, str(REPO_DIR))
+    from quota import configure_scheduler
+    scheduler = configure_scheduler(rate=args.rps, daily_budget=10 ** 9, usage_path=None,
+                                    base_delay=args.retry_delay, max_delay=args.retry_delay * 8)
+
+    start = time.perf_counter()
+    if entry == "main":
+        from youtube_playlist_scraper import main
+        main(os.environ["YOUTUBE_API_KEY"], Path("out.csv"), options["split"], channel=CHANNEL,
+             workers=args.workers, backend=options.get("backend", "threads"), pipeline=options.get("pipeline", False))
+        rows = count_csv_rows(Path("playlists"))
+    else:
+        import app
+        app.SPLIT_WORKERS = args.workers   # mesmo paralelismo dos cenários da CLI
+        state = app.new_download_state()
+        out_dir = Path("playlists") / "job"
+        app.run_scraper(CHANNEL, [], options["split"], output_dir=out_dir, state=state)
+        if state["status"] != "completed":
+            raise SystemExit(f"run_scraper terminou com erro: {state['message']}")
+        # Os dois modos gravam os arquivos do job em out_dir (o dividido, um por playlist, em
+        # paralelo); conta-se o que foi gravado e confere-se com a mensagem final do job
+        rows = count_csv_rows(out_dir)
+        match = re.search(r"(\d+) vídeos? processados?", state["message"])
+        if match is None or int(match.group(1)) != rows:
+            raise SystemExit(f"run_scraper gravou {rows} linhas, mas informou: {state['message']}")
+    wall = time.perf_counter() - start
+
+    report = scheduler.report()
+    return {
+        "scenario": name,
+        "wallSeconds": wall,
+        "rows": rows,
+        "rowsPerSecond": rows / wall if wall else 0.0,
+        "peakRssMiB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "retries": sum(report["retries"].values()),
+        "bytesIn": sum(report["bytesIn"].values()),
+    }
+
+
+# ---------- processo pai ----------
+def fetch_json(url: str) -> Dict:
+    with urlopen(url) as resp:
+        return json.loads(resp.read())
+
+
+def run_scenario(name: str, server_url: str, args: argparse.Namespace) -> Dict:
+    fetch_json(server_url + "/_reset")
+    env = {
+        **os.environ,
+        "YOUTUBE_API_ENDPOINT": server_url,
+        "YOUTUBE_API_KEY": "bench",
+        "YOUTUBE_API_CACHE": "off",
+        "VIDEO_STORE": "off",   # o app gravaria no banco de vídeos; os cenários da CLI não gravam
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(REPO_DIR), os.environ.get("PYTHONPATH")])),
+    }
+    child_args = [sys.executable, str(Path(__file__).resolve()), "--child", name,
+                  "--workers", str(args.workers), "--rps", str(args.rps), "--retry-delay", str(args.retry_delay)]
+    with tempfile.TemporaryDirectory(prefix="ytbench-") as tmp:
+        proc = subprocess.run(child_args, cwd=tmp, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"cenário {name} falhou:\n{proc.stderr or proc.stdout}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    stats = fetch_json(server_url + "/_stats")
+    result["requests"] = sum(s["requests"] for s in stats.values())
+    result["requestsByEndpoint"] = {ep: s["requests"] for ep, s in sorted(stats.items())}
+    result["bytesOut"] = sum(s["bytesOut"] for s in stats.values())
+    return result
+
+
+def print_table(results: List[Dict]) -> None:
+    header = f"{'cenário':<22}{'tempo (s)':>10}{'linhas':>9}{'linhas/s':>11}{'reqs':>7}{'retries':>9}{'RSS (MiB)':>11}{'KiB rede':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['scenario']:<22}{r['wallSeconds']:>10.3f}{r['rows']:>9}{r['rowsPerSecond']:>11.0f}"
+              f"{r['requests']:>7}{r['retries']:>9}{r['peakRssMiB']:>11.1f}{r['bytesOut'] / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark offline do scraper contra a API falsa")
+    ap.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                    help=f"Cenários separados por vírgula (disponíveis: {', '.join(SCENARIOS)})")
+    ap.add_argument("--repeat", type=int, default=1, help="Execuções de cada cenário (vale o menor tempo)")
+    ap.add_argument("-w", "--workers", type=int, default=4)
+    ap.add_argument("--rps", type=float, default=1000.0, help="Limite de requisições por segundo do agendador")
+    ap.add_argument("--retry-delay", type=float, default=0.05, help="Espera base do backoff, em segundos")
+    ap.add_argument("--json", type=Path, help="Grava os resultados neste arquivo JSON")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    add_config_arguments(ap)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args)))
+        sys.exit(0)
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        ap.error(f"cenários desconhecidos: {', '.join(unknown)}")
+
+    server = start_server(config_from_args(args))
+    print(f"API falsa em {server.url}: {args.playlists} playlists x {args.videos} vídeos, "
+          f"latência {args.latency * 1000:.0f} ms, erros {args.error_rate:.0%}\n")
+    results = []
+    for name in names:
+        runs = [run_scenario(name, server.url, args) for _ in range(max(1, args.repeat))]
+        results.append(min(runs, key=lambda r: r["wallSeconds"]))
+    server.shutdown()
+
+    print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
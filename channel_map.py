@@ -0,0 +1,90 @@
+"""
+Mapa persistente (SQLite) de referências de canal -> channelId.
+
+Guarda o resultado de cada resolução (handle, nome de usuário ou URL já
+normalizados) para que raspagens seguidas, de qualquer processo, não voltem
+a consultar a API. As entradas expiram depois de ``ttl`` segundos, porque um
+handle pode mudar de dono.
+"""
+from __future__ import annotations
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_MAP_PATH = Path(".cache") / "channel_ids.sqlite"
+DEFAULT_MAP_TTL = 30 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channel_ids (
+    ref        TEXT PRIMARY KEY,
+    channel_id TEXT NOT NULL,
+    method     TEXT NOT NULL,
+    resolved   REAL NOT NULL
+);
+"""
+
+
+class ChannelMap:
+    """Mapa referência -> channelId com expiração, seguro para uso entre threads e processos."""
+
+    def __init__(self, path: Path = DEFAULT_MAP_PATH, ttl: float = DEFAULT_MAP_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, ref: str) -> Optional[str]:
+        """channelId memorizado para ``ref``, ou None se ausente/expirado."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT channel_id, resolved FROM channel_ids WHERE ref = ?", (ref,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl:
+            return None
+        return row[0]
+
+    def put(self, ref: str, channel_id: str, method: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO channel_ids (ref, channel_id, method, resolved) VALUES (?, ?, ?, ?)",
+                (ref, channel_id, method, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_map: Optional[ChannelMap] = None
+_configured = False
+_config_lock = threading.RLock()
+
+
+def configure_channel_map(enabled: bool = True, path: Path = None, ttl: float = DEFAULT_MAP_TTL) -> Optional[ChannelMap]:
+    """Define o mapa global usado na resolução de canais (None desativa)."""
+    global _map, _configured
+    with _config_lock:
+        _map = ChannelMap(path or DEFAULT_MAP_PATH, ttl) if enabled else None
+        _configured = True
+        return _map
+
+
+def get_channel_map() -> Optional[ChannelMap]:
+    """Devolve o mapa global, criando o padrão na primeira chamada.
+
+    A variável de ambiente YOUTUBE_CHANNEL_MAP pode apontar para outro arquivo
+    ou desativar o mapa com "off".
+    """
+    with _config_lock:
+        if not _configured:
+            env = os.getenv("YOUTUBE_CHANNEL_MAP", "")
+            if env.lower() in ("0", "off", "false", "no"):
+                return configure_channel_map(enabled=False)
+            return configure_channel_map(path=Path(env) if env else None)
+        return _map
@@ -0,0 +1,126 @@
+"""
+Journal de progresso para retomar raspagens longas de canais.
+
+Cada evento (lista de playlists, página de playlistItems, lote de videos.list,
+playlist gravada) é anexado como uma linha JSON e enviado ao disco na hora.
+Ao retomar, o journal é relido e só o que falta é buscado de novo.
+"""
+from __future__ import annotations
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+CHECKPOINT_FILENAME = ".checkpoint.jsonl"
+
+
+class Checkpoint:
+    """Journal (JSON lines) de uma raspagem de canal."""
+
+    def __init__(self, path: Path, job_key: str, resume: bool = False):
+        self.path = Path(path)
+        self.job_key = job_key
+        self.playlists: Optional[List[Dict]] = None
+        self.pages: Dict[str, List[Dict]] = {}
+        self.items_done: set = set()
+        self.videos: Dict[str, Dict] = {}
+        self.fetched: set = set()     # IDs já enviados ao videos.list (inclusive privados)
+        self.done: Dict[str, Optional[int]] = {}  # playlist -> offset do CSV após gravá-la
+        self.done_stats: Dict[str, Dict] = {}     # playlist -> estatísticas (PlaylistStats.to_dict) da gravação
+        self._lock = threading.Lock()
+
+        resumed = resume and self.path.exists() and self._load()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a" if resumed else "w", encoding="utf-8")
+        if not resumed:
+            self._append({"type": "job", "key": job_key})
+        self.resumed = resumed
+
+    @classmethod
+    def for_channel(cls, channel_dir: Path, job_key: str, resume: bool = False) -> "Checkpoint":
+        return cls(Path(channel_dir) / CHECKPOINT_FILENAME, job_key, resume)
+
+    def _load(self) -> bool:
+        """Relê o journal; devolve False se ele pertence a outro job."""
+        with open(self.path, encoding="utf-8") as f:
+            for n, line in enumerate(f):
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:  # última linha cortada por uma queda
+                    break
+                kind = rec.get("type")
+                if n == 0:
+                    if kind != "job" or rec.get("key") != self.job_key:
+                        return False
+                elif kind == "playlists":
+                    self.playlists = rec["items"]
+                elif kind == "page":
+                    self.pages.setdefault(rec["playlist"], []).append(rec)
+                elif kind == "items_done":
+                    self.items_done.add(rec["playlist"])
+                elif kind == "meta":
+                    self.fetched.update(rec["ids"])
+                    self.videos.update(rec["videos"])
+                elif kind == "playlist_done":
+                    self.done[rec["playlist"]] = rec.get("offset")
+                    if rec.get("stats"):
+                        self.done_stats[rec["playlist"]] = rec["stats"]
+        return True
+
+    def _append(self, record: Dict) -> None:
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    # ---------- playlists ----------
+    def record_playlists(self, playlists: List[Dict]) -> None:
+        self.playlists = playlists
+        self._append({"type": "playlists", "items": playlists})
+
+    # ---------- playlistItems ----------
+    def resume_items(self, playlist_id: str) -> Tuple[List[str], Optional[str], bool]:
+        """Devolve (IDs já paginados, próximo pageToken, paginação concluída)."""
+        pages = self.pages.get(playlist_id, [])
+        ids = [vid for page in pages for vid in page["ids"]]
+        next_token = pages[-1]["next"] if pages else None
+        return ids, next_token, playlist_id in self.items_done
+
+    def record_page(self, playlist_id: str, page_token: Optional[str], ids: List[str], next_token: Optional[str]) -> None:
+        self._append({"type": "page", "playlist": playlist_id, "pageToken": page_token, "ids": ids, "next": next_token})
+
+    def record_items_done(self, playlist_id: str) -> None:
+        self._append({"type": "items_done", "playlist": playlist_id})
+
+    # ---------- videos.list ----------
+    def record_meta(self, video_ids: List[str], videos: Dict[str, Dict]) -> None:
+        self._append({"type": "meta", "ids": video_ids, "videos": videos})
+
+    # ---------- saída ----------
+    def record_playlist_done(self, playlist_id: str, offset: Optional[int] = None, stats: Optional[Dict] = None) -> None:
+        """Marca a playlist como gravada; ``stats`` permite refazer o resumo ao retomar sem relê-la."""
+        self.done[playlist_id] = offset
+        if stats:
+            self.done_stats[playlist_id] = stats
+        self._append({"type": "playlist_done", "playlist": playlist_id, "offset": offset, "stats": stats})
+
+    def is_done(self, playlist_id: str) -> bool:
+        return playlist_id in self.done
+
+    def stats(self, playlist_id: str) -> Optional[Dict]:
+        """Estatísticas gravadas junto com a playlist concluída (None em journals antigos)."""
+        return self.done_stats.get(playlist_id)
+
+    def last_offset(self) -> Optional[int]:
+        """Tamanho do CSV único após a última playlist concluída (None se nada foi gravado)."""
+        offsets = [off for off in self.done.values() if off is not None]
+        return max(offsets) if offsets else None
+
+    def finish(self) -> None:
+        """Fecha e remove o journal depois de uma execução completa."""
+        with self._lock:
+            self._file.close()
+        self.path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,198 @@
+"""
+Instrumentação do caminho quente do scraper.
+
+Guarda histogramas de latência por endpoint da API, acertos do cache e o tempo
+gasto em cada etapa (listagem de playlists, paginação de itens, metadados,
+montagem das linhas e gravação). Contadores de requisições, unidades de quota,
+repetições e bytes recebidos vêm do agendador de ``quota.py``.
+
+O conteúdo é exposto em formato texto do Prometheus (``/metrics`` no app) ou
+como JSON (``--profile`` na linha de comando).
+"""
+from __future__ import annotations
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from quota import get_scheduler
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGES = ("listing", "items", "metadata", "rows", "write")
+PREFIX = "ytscraper"
+
+
+class Histogram:
+    """Histograma cumulativo com baldes fixos, como o do Prometheus."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # o último balde é +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total, out = 0, []
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            total += n
+            out.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return out
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class Metrics:
+    """Métricas de um processo; seguro para uso entre threads."""
+
+    def __init__(self):
+        self.started = time.time()
+        self.latency: Dict[str, Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.cache_hits: Dict[str, int] = {}
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    # ---------- API ----------
+    def observe_request(self, endpoint: str, seconds: float, failed: bool = False) -> None:
+        with self._lock:
+            self.latency.setdefault(endpoint, Histogram()).observe(seconds)
+            if failed:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def timed_call(self, endpoint: str, call: Callable[[], Dict]) -> Dict:
+        """Executa uma tentativa de requisição medindo sua latência."""
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = call()
+            failed = False
+            return result
+        finally:
+            self.observe_request(endpoint, time.perf_counter() - start, failed)
+
+    def record_cache_hit(self, endpoint: str) -> None:
+        with self._lock:
+            self.cache_hits[endpoint] = self.cache_hits.get(endpoint, 0) + 1
+
+    # ---------- etapas ----------
+    def record_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stage_seconds[name] = self.stage_seconds.get(name, 0.0) + seconds
+            self.stage_calls[name] = self.stage_calls.get(name, 0) + 1
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Soma o tempo do bloco à etapa ``name`` (em threads paralelas os tempos se somam)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - start)
+
+    # ---------- relatórios ----------
+    def snapshot(self) -> Dict:
+        report = get_scheduler().report()
+        with self._lock:
+            endpoints = sorted(set(self.latency) | set(self.cache_hits) | set(report["requests"]))
+            api = {
+                ep: {
+                    "requests": report["requests"].get(ep, 0),
+                    "quotaUnits": report["units"].get(ep, 0),
+                    "retries": report["retries"].get(ep, 0),
+                    "errors": self.errors.get(ep, 0),
+                    "bytesIn": report["bytesIn"].get(ep, 0),
+                    "cacheHits": self.cache_hits.get(ep, 0),
+                    "latency": self.latency[ep].to_dict() if ep in self.latency else None,
+                }
+                for ep in endpoints
+            }
+            stages = {
+                name: {"seconds": self.stage_seconds[name], "calls": self.stage_calls[name]}
+                for name in STAGES + tuple(sorted(set(self.stage_seconds) - set(STAGES)))
+                if name in self.stage_seconds
+            }
+        return {
+            "uptimeSeconds": time.time() - self.started,
+            "api": api,
+            "stages": stages,
+            "quota": {"usedToday": report["usedToday"], "dailyBudget": report["dailyBudget"]},
+        }
+
+    def render_prometheus(self) -> str:
+        """Formato texto de exposição do Prometheus (versão 0.0.4)."""
+        snap = self.snapshot()
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+        family("api_request_duration_seconds", "histogram", "Latency of each API request attempt.")
+        for ep, data in snap["api"].items():
+            if data["latency"] is None:
+                continue
+            for le, n in data["latency"]["buckets"].items():
+                lines.append(f'{PREFIX}_api_request_duration_seconds_bucket{{endpoint="{ep}",le="{le}"}} {n}')
+            lines.append(f'{PREFIX}_api_request_duration_seconds_sum{{endpoint="{ep}"}} {data["latency"]["sum"]}')
+            lines.append(f'{PREFIX}_api_request_duration_seconds_count{{endpoint="{ep}"}} {data["latency"]["count"]}')
+
+        counters = (
+            ("api_requests_total", "requests", "API requests sent, including retries."),
+            ("api_quota_units_total", "quotaUnits", "Quota units charged."),
+            ("api_retries_total", "retries", "Requests retried after a transient error."),
+            ("api_errors_total", "errors", "Request attempts that raised an error."),
+            ("api_response_bytes_total", "bytesIn", "Decoded response body bytes received."),
+            ("api_cache_hits_total", "cacheHits", "Calls answered by the local response cache."),
+        )
+        for name, key, help_text in counters:
+            family(name, "counter", help_text)
+            for ep, data in snap["api"].items():
+                lines.append(f'{PREFIX}_{name}{{endpoint="{ep}"}} {data[key]}')
+
+        family("stage_seconds_total", "counter", "Time spent per scrape stage, summed across threads.")
+        for name, data in snap["stages"].items():
+            lines.append(f'{PREFIX}_stage_seconds_total{{stage="{name}"}} {data["seconds"]}')
+        family("stage_calls_total", "counter", "Times each scrape stage ran.")
+        for name, data in snap["stages"].items():
+            lines.append(f'{PREFIX}_stage_calls_total{{stage="{name}"}} {data["calls"]}')
+
+        family("quota_used_today", "gauge", "Quota units used in the current quota day.")
+        lines.append(f'{PREFIX}_quota_used_today {snap["quota"]["usedToday"]}')
+        family("quota_daily_budget", "gauge", "Daily quota budget.")
+        lines.append(f'{PREFIX}_quota_daily_budget {snap["quota"]["dailyBudget"]}')
+        return "\n".join(lines) + "\n"
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
+
+
+def stage(name: str):
+    """Atalho para ``get_metrics().stage(name)``; também serve como decorador."""
+    return get_metrics().stage(name)
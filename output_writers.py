@@ -0,0 +1,243 @@
+"""
+Escrita incremental dos arquivos de saída.
+
+Todos os escritores têm a mesma interface (``write_rows``, ``end_group``,
+``tell``, ``close``); ``open_writer`` escolhe o formato pelo parâmetro
+``fmt`` ou pela extensão do arquivo. Parquet e Arrow IPC dependem do pacote
+opcional ``pyarrow``.
+"""
+from __future__ import annotations
+import csv
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from metrics import stage
+
+CSV_COLUMNS = ["channel", "playlist", "videoTitle", "description", "duration"]
+OUTPUT_FORMATS = ("csv", "parquet", "arrow")
+FORMAT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+EXTENSION_FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet",
+                     ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+
+
+def format_for_path(path: Path, fmt: Optional[str] = None) -> str:
+    """Formato pedido explicitamente ou, na falta dele, o indicado pela extensão (CSV por padrão)."""
+    if fmt:
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Formato de saída desconhecido: {fmt}")
+        return fmt
+    return EXTENSION_FORMATS.get(Path(path).suffix.lower(), "csv")
+
+
+def output_path(path: Path, fmt: Optional[str] = None) -> Path:
+    """Ajusta a extensão de ``path`` ao formato escolhido."""
+    path = Path(path)
+    fmt = format_for_path(path, fmt)
+    if EXTENSION_FORMATS.get(path.suffix.lower()) == fmt:
+        return path
+    return path.with_suffix(FORMAT_EXTENSIONS[fmt])
+
+
+def open_writer(path: Path, fmt: Optional[str] = None, sep: str = ",", resume_offset: Optional[int] = None):
+    """Cria o escritor do formato de ``path`` (ou de ``fmt``)."""
+    fmt = format_for_path(path, fmt)
+    if fmt == "csv":
+        return CsvRowWriter(path, sep=sep, resume_offset=resume_offset)
+    if resume_offset is not None:
+        raise ValueError("Só a saída CSV pode ser retomada de um ponto de controle")
+    return ArrowRowWriter(path, ipc=(fmt == "arrow"))
+
+
+def hms_to_seconds(duration: str) -> Optional[int]:
+    """01:02:03 -> 3723 (None se a duração estiver vazia)."""
+    if not duration:
+        return None
+    seconds = 0
+    for part in duration.split(":"):
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def duration_seconds(info: Dict) -> Optional[int]:
+    """``durationSeconds`` dos metadados; só os gravados antes dele existir caem na conversão do HH:MM:SS."""
+    seconds = info.get("durationSeconds")
+    if seconds is None:
+        seconds = hms_to_seconds(info.get("duration", ""))
+    return seconds
+
+
+class CsvRowWriter:
+    """Grava linhas num CSV à medida que são produzidas.
+
+    O arquivo só é criado na primeira gravação, então nenhuma saída vazia é
+    deixada para trás. Cada lote é enviado ao disco logo após ser escrito, de
+    modo que um resultado parcial sobrevive a uma falha no meio do processo.
+    """
+
+    def __init__(self, path: Path, sep: str = ",", resume_offset: Optional[int] = None):
+        self.path = Path(path)
+        self.sep = sep
+        self.rows = 0
+        self._file = None
+        self._writer = None
+        if resume_offset is not None:
+            self._open(resume_offset)
+
+    def _open(self, resume_offset: Optional[int] = None) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if resume_offset is not None and not self.path.exists():
+            # O arquivo sumiu desde a interrupção: recomeça do zero em vez de falhar no "r+"
+            resume_offset = None
+        if resume_offset is not None:
+            # Descarta o que foi gravado depois do último ponto de controle
+            self._file = open(self.path, "r+", encoding="utf-8", newline="")
+            self._file.truncate(resume_offset)
+            self._file.seek(resume_offset)
+        else:
+            self._file = open(self.path, "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=CSV_COLUMNS, delimiter=self.sep,
+            quoting=csv.QUOTE_ALL, lineterminator="\n", extrasaction="ignore",
+        )
+        if resume_offset is None:
+            self._writer.writeheader()
+
+    def write_rows(self, rows: Iterable[Dict]) -> int:
+        rows = list(rows)
+        if not rows:
+            return 0
+        with stage("write"):
+            if self._file is None:
+                self._open()
+            self._writer.writerows(rows)
+            self._file.flush()
+        self.rows += len(rows)
+        return len(rows)
+
+    def end_group(self) -> None:
+        """Fim de uma playlist; no CSV não há nada a fazer."""
+
+    def tell(self) -> Optional[int]:
+        """Posição atual no arquivo (None se nada foi gravado ainda)."""
+        return self._file.tell() if self._file is not None else None
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "CsvRowWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _DictionaryColumn:
+    """Coluna de texto com dicionário que só cresce entre os lotes.
+
+    Como os valores já vistos mantêm o mesmo índice, o Arrow IPC pode gravar
+    apenas os deltas do dicionário, e o Parquet recebe a coluna já codificada.
+    """
+
+    def __init__(self):
+        self.values = []
+        self._index = {}
+
+    def encode(self, pa, strings):
+        indices = []
+        for value in strings:
+            i = self._index.get(value)
+            if i is None:
+                i = self._index[value] = len(self.values)
+                self.values.append(value)
+            indices.append(i)
+        return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(self.values, pa.string()))
+
+
+class ArrowRowWriter:
+    """Grava as linhas em Parquet ou Arrow IPC, com um row group (ou lote) por playlist.
+
+    ``channel`` e ``playlist`` são colunas com dicionário, e ``durationSeconds``
+    (que já vem na linha) acompanha a duração ``HH:MM:SS``. As linhas de uma playlist ficam em memória
+    até ``end_group`` e então vão ao disco de uma vez.
+    """
+
+    def __init__(self, path: Path, ipc: bool = False):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise Exception("A saída Parquet/Arrow requer o pacote pyarrow: pip install pyarrow")
+        self.pa = pa
+        self.path = Path(path)
+        self.ipc = ipc
+        self.rows = 0
+        self.schema = pa.schema([
+            ("channel", pa.dictionary(pa.int32(), pa.string())),
+            ("playlist", pa.dictionary(pa.int32(), pa.string())),
+            ("videoTitle", pa.string()),
+            ("description", pa.string()),
+            ("duration", pa.string()),
+            ("durationSeconds", pa.int32()),
+        ])
+        self._columns = {"channel": _DictionaryColumn(), "playlist": _DictionaryColumn()}
+        self._pending = []
+        self._writer = None
+        self._sink = None
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.ipc:
+            self._sink = self.pa.OSFile(str(self.path), "wb")
+            options = self.pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            self._writer = self.pa.ipc.new_file(self._sink, self.schema, options=options)
+        else:
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.path, self.schema, compression="zstd",
+                                            use_dictionary=["channel", "playlist"])
+
+    def write_rows(self, rows: Iterable[Dict]) -> int:
+        rows = list(rows)
+        self._pending.extend(rows)
+        self.rows += len(rows)
+        return len(rows)
+
+    def end_group(self) -> None:
+        """Grava as linhas acumuladas como um row group (Parquet) ou um lote (IPC)."""
+        if not self._pending:
+            return
+        pa, rows = self.pa, self._pending
+        self._pending = []
+        with stage("write"):
+            table = pa.Table.from_arrays([
+                self._columns["channel"].encode(pa, [r["channel"] for r in rows]),
+                self._columns["playlist"].encode(pa, [r["playlist"] for r in rows]),
+                pa.array([r["videoTitle"] for r in rows], pa.string()),
+                pa.array([r["description"] for r in rows], pa.string()),
+                pa.array([r["duration"] for r in rows], pa.string()),
+                pa.array([r["durationSeconds"] for r in rows], pa.int32()),
+            ], schema=self.schema)
+            if self._writer is None:
+                self._open()
+            if self.ipc:
+                self._writer.write_table(table, max_chunksize=len(rows))
+            else:
+                self._writer.write_table(table, row_group_size=len(rows))
+
+    def tell(self) -> Optional[int]:
+        return None
+
+    def close(self) -> None:
+        self.end_group()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def __enter__(self) -> "ArrowRowWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,321 @@
+"""
+Agendador central das requisições à YouTube Data API v3.
+
+Controla o ritmo das chamadas com um token bucket, contabiliza as unidades de
+quota gastas por endpoint (com um orçamento diário persistido em disco) e
+repete erros transitórios (403 de limite de taxa, 429 e 5xx) com backoff
+exponencial e jitter.
+
+O uso do dia é gravado em lote (a cada ``USAGE_FLUSH_CHARGES`` cobranças ou
+``USAGE_FLUSH_SECONDS`` segundos, e ao sair do processo), fora da trava que as
+threads disputam a cada requisição.
+"""
+from __future__ import annotations
+import atexit
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+# Custo em unidades de quota de cada chamada .list()
+QUOTA_COSTS = {
+    "search": 100,
+    "channels": 1,
+    "playlists": 1,
+    "playlistItems": 1,
+    "videos": 1,
+}
+DEFAULT_DAILY_BUDGET = 10_000       # quota padrão de um projeto no Google Cloud
+DEFAULT_RATE = 10.0                 # requisições por segundo
+DEFAULT_USAGE_PATH = Path(".cache") / "quota_usage.json"
+USAGE_FLUSH_CHARGES = 50            # cobranças acumuladas antes de regravar o uso do dia
+USAGE_FLUSH_SECONDS = 5.0           # ou segundos desde a última gravação
+
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+TRANSIENT_REASONS = ("rateLimitExceeded", "userRateLimitExceeded", "backendError")
+
+
+def quota_day() -> str:
+    """Dia da quota: a API zera o contador à meia-noite do horário do Pacífico."""
+    try:
+        from zoneinfo import ZoneInfo
+        now = datetime.now(ZoneInfo("America/Los_Angeles"))
+    except Exception:
+        now = datetime.now(timezone.utc)
+    return now.strftime("%Y-%m-%d")
+
+
+def _httpx_error(error: Exception, name: str) -> bool:
+    """``isinstance`` contra uma classe do httpx sem importá-lo (só existe se o backend assíncrono já o carregou)."""
+    httpx = sys.modules.get("httpx")
+    cls = getattr(httpx, name, None) if httpx is not None else None
+    return cls is not None and isinstance(error, cls)
+
+
+def is_transient(error: Exception) -> bool:
+    """Indica se vale a pena repetir a requisição que falhou."""
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    if _httpx_error(error, "TransportError"):   # conexão recusada/caída, timeout, erro de protocolo
+        return True
+    if _httpx_error(error, "HTTPStatusError"):
+        status = error.response.status_code
+        return status in TRANSIENT_STATUS or status >= 500
+    resp = getattr(error, "resp", None)
+    status = getattr(resp, "status", None)
+    if status is None:
+        return False
+    status = int(status)
+    if status in TRANSIENT_STATUS:
+        return True
+    return status == 403 and any(reason in str(error) for reason in TRANSIENT_REASONS)
+
+
+def retry_after(error: Exception) -> Optional[float]:
+    resp = getattr(error, "resp", None)
+    if resp is None:   # httpx.HTTPStatusError: os cabeçalhos ficam em error.response
+        resp = getattr(getattr(error, "response", None), "headers", None)
+    value = resp.get("retry-after") if hasattr(resp, "get") else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RequestScheduler:
+    """Token bucket + orçamento diário de quota + repetição com backoff."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = None,
+                 daily_budget: int = DEFAULT_DAILY_BUDGET, usage_path: Optional[Path] = DEFAULT_USAGE_PATH,
+                 max_retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+        self.rate = rate
+        self.capacity = burst or max(1, int(math.ceil(rate)))
+        self.daily_budget = daily_budget
+        self.usage_path = Path(usage_path) if usage_path else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.units: Dict[str, int] = {}      # unidades gastas nesta execução, por endpoint
+        self.requests: Dict[str, int] = {}
+        self.retries: Dict[str, int] = {}
+        self.bytes_in: Dict[str, int] = {}   # bytes de corpo de resposta recebidos, por endpoint
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+        self._day, self._used_today = self._load_usage()
+        self._unsaved = 0                    # cobranças ainda não gravadas
+        self._saved_at = time.monotonic()
+        self._save_lock = threading.Lock()
+        self._written = (self._day, self._used_today)
+
+    # ---------- orçamento ----------
+    def _load_usage(self):
+        day = quota_day()
+        if self.usage_path and self.usage_path.exists():
+            try:
+                data = json.loads(self.usage_path.read_text(encoding="utf-8"))
+                if data.get("day") == day:
+                    return day, int(data.get("units", 0))
+            except (ValueError, OSError):
+                pass
+        return day, 0
+
+    def _save_usage(self, snapshot) -> None:
+        """Grava (dia, unidades); uma foto mais antiga que a já gravada é ignorada."""
+        if not self.usage_path or snapshot is None:
+            return
+        with self._save_lock:
+            day, units = snapshot
+            if day == self._written[0] and units <= self._written[1]:
+                return
+            self.usage_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.usage_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"day": day, "units": units}), encoding="utf-8")
+            os.replace(tmp, self.usage_path)
+            self._written = snapshot
+
+    def _usage_due(self, force: bool = False):
+        """Chamado com a trava: a foto do uso a gravar agora, ou None se ainda dá para acumular."""
+        if not self.usage_path:
+            return None
+        self._unsaved += 1
+        now = time.monotonic()
+        if not force and self._unsaved < USAGE_FLUSH_CHARGES and now - self._saved_at < USAGE_FLUSH_SECONDS:
+            return None
+        self._unsaved, self._saved_at = 0, now
+        return self._day, self._used_today
+
+    def flush(self) -> None:
+        """Grava o uso acumulado (chamado ao sair do processo e ao trocar de agendador)."""
+        with self._lock:
+            if not self._unsaved:
+                return
+            self._unsaved, self._saved_at = 0, time.monotonic()
+            snapshot = self._day, self._used_today
+        self._save_usage(snapshot)
+
+    @property
+    def used_today(self) -> int:
+        return self._used_today
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.daily_budget - self._used_today)
+
+    def _charge(self, endpoint: str) -> None:
+        cost = QUOTA_COSTS.get(endpoint, 1)
+        with self._lock:
+            day = quota_day()
+            rollover = day != self._day
+            if rollover:
+                self._day, self._used_today = day, 0
+            if self._used_today + cost > self.daily_budget:
+                raise Exception(
+                    f"quotaExceeded: orçamento diário de {self.daily_budget} unidades atingido "
+                    f"({self._used_today} usadas hoje)"
+                )
+            self._used_today += cost
+            self.units[endpoint] = self.units.get(endpoint, 0) + cost
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            snapshot = self._usage_due(force=rollover)
+        self._save_usage(snapshot)
+
+    def add_usage(self, units: Dict[str, int], requests: Dict[str, int] = None) -> None:
+        """Soma ao orçamento as unidades gastas por outro processo (ex.: os workers do modo lote)."""
+        with self._lock:
+            day = quota_day()
+            if day != self._day:
+                self._day, self._used_today = day, 0
+            for endpoint, cost in units.items():
+                self._used_today += cost
+                self.units[endpoint] = self.units.get(endpoint, 0) + cost
+            for endpoint, n in (requests or {}).items():
+                self.requests[endpoint] = self.requests.get(endpoint, 0) + n
+            snapshot = self._usage_due(force=True)
+        self._save_usage(snapshot)
+
+    def record_bytes(self, endpoint: str, size: int) -> None:
+        with self._lock:
+            self.bytes_in[endpoint] = self.bytes_in.get(endpoint, 0) + size
+
+    # ---------- ritmo ----------
+    def _take_token(self) -> float:
+        """Consome um token; devolve 0 ou quantos segundos esperar antes de tentar de novo."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def _acquire_token(self) -> None:
+        while True:
+            wait = self._take_token()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    def _backoff(self, endpoint: str, attempt: int, error: Exception) -> float:
+        delay = retry_after(error) or min(self.max_delay, self.base_delay * 2 ** attempt)
+        with self._lock:
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+        return random.uniform(delay / 2, delay)  # jitter
+
+    # ---------- execução ----------
+    def execute(self, endpoint: str, call: Callable[[], Dict]) -> Dict:
+        """Executa ``call`` respeitando ritmo e orçamento, repetindo erros transitórios."""
+        attempt = 0
+        while True:
+            self._acquire_token()
+            self._charge(endpoint)
+            try:
+                return call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient(e):
+                    raise
+                delay = self._backoff(endpoint, attempt, e)
+                attempt += 1
+                time.sleep(delay)
+
+    async def execute_async(self, endpoint: str, call: Callable[[], Awaitable[Dict]]) -> Dict:
+        """Versão assíncrona de ``execute``: espera com asyncio.sleep sem bloquear o loop."""
+        import asyncio   # só o backend assíncrono passa por aqui
+        attempt = 0
+        while True:
+            wait = self._take_token()
+            while wait:
+                await asyncio.sleep(wait)
+                wait = self._take_token()
+            self._charge(endpoint)
+            try:
+                return await call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient(e):
+                    raise
+                delay = self._backoff(endpoint, attempt, e)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def report(self) -> Dict:
+        return {
+            "units": dict(self.units),
+            "requests": dict(self.requests),
+            "retries": dict(self.retries),
+            "bytesIn": dict(self.bytes_in),
+            "usedToday": self._used_today,
+            "dailyBudget": self.daily_budget,
+        }
+
+
+# Custo de resolver o canal por cada método de resolve_channel ("map": achado no mapa de canais)
+CHANNEL_RESOLUTION_UNITS = {"id": 0, "map": 0, "forHandle": 1, "forUsername": 1, "search": 100}
+
+
+def project_channel_quota(item_counts: Iterable[int], resolve_method: Optional[str] = None) -> int:
+    """Estima as unidades gastas para raspar playlists com os tamanhos informados.
+
+    ``resolve_method`` é o método com que o canal foi resolvido (None: não
+    entra na conta). É um teto: vídeos repetidos entre playlists são
+    consultados uma única vez.
+    """
+    counts = list(item_counts)
+    units = CHANNEL_RESOLUTION_UNITS.get(resolve_method, 0)
+    units += sum(max(1, math.ceil(c / 50)) for c in counts)   # playlistItems.list
+    units += math.ceil(sum(counts) / 50)                       # videos.list
+    return units
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def configure_scheduler(**kwargs) -> RequestScheduler:
+    """Substitui o agendador global (parâmetros de RequestScheduler)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.flush()   # o novo agendador relê o uso do dia do disco
+        _scheduler = RequestScheduler(**kwargs)
+        return _scheduler
+
+
+def get_scheduler() -> RequestScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler()
+        return _scheduler
+
+
+@atexit.register
+def _flush_at_exit() -> None:
+    if _scheduler is not None:
+        _scheduler.flush()
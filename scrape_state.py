@@ -0,0 +1,120 @@
+"""
+Estado persistido entre execuções para o modo incremental.
+
+Para cada playlist guarda a contagem de itens, os ETags de cada página de
+playlistItems, a lista de videoIds, o arquivo de saída gerado e as suas
+estatísticas; para cada vídeo guarda os metadados já resolvidos e quando foram
+buscados. Vídeos que o videos.list não devolveu (privados ou removidos) também
+são anotados, para não serem consultados de novo a cada execução. As duas
+anotações vencem depois de ``VIDEO_MAX_AGE``: o vídeo volta a ser consultado e
+edições de título, mudanças de privacidade ou remoções chegam à saída.
+"""
+from __future__ import annotations
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+STATE_FILENAME = ".scrape_state.json"
+VIDEO_MAX_AGE = int(os.getenv("SCRAPE_STATE_VIDEO_MAX_AGE", str(7 * 24 * 3600)))   # segundos
+
+
+class ScrapeState:
+    """Estado incremental de um canal, gravado em ``<pasta do canal>/.scrape_state.json``."""
+
+    def __init__(self, path: Path, max_age: float = VIDEO_MAX_AGE):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.playlists: Dict[str, Dict] = {}
+        self.videos: Dict[str, Dict] = {}
+        self.fetched_at: Dict[str, float] = {}   # videoId -> quando os metadados foram buscados
+        self.missing: Dict[str, float] = {}      # videoId -> quando o videos.list não o devolveu
+        self.changed: set = set()
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.playlists = data.get("playlists", {})
+            self.videos = data.get("videos", {})
+            self.fetched_at = data.get("fetchedAt", {})
+            self.missing = data.get("missing", {})
+
+    @classmethod
+    def for_channel(cls, channel_dir: Path) -> "ScrapeState":
+        return cls(Path(channel_dir) / STATE_FILENAME)
+
+    def pages(self, playlist_id: str) -> List[Dict]:
+        """Páginas da execução anterior: [{pageToken, etag, ids, next}, ...]."""
+        return self.playlists.get(playlist_id, {}).get("pages", [])
+
+    def update_playlist(self, playlist: Dict, pages: List[Dict], video_ids: List[str], changed: bool) -> None:
+        entry = self.playlists.setdefault(playlist["id"], {})
+        entry.update({
+            "title": playlist["title"],
+            "itemCount": len(video_ids),
+            "pages": pages,
+            "videoIds": video_ids,
+        })
+        if changed:
+            self.changed.add(playlist["id"])
+
+    def needs_fetch(self, video_id: str, now: float = None) -> bool:
+        """O vídeo nunca foi consultado ou a última consulta (positiva ou negativa) venceu."""
+        now = time.time() if now is None else now
+        if video_id in self.videos:
+            return now - self.fetched_at.get(video_id, 0) >= self.max_age
+        if video_id in self.missing:
+            return now - self.missing[video_id] >= self.max_age
+        return True
+
+    def record_videos(self, requested: Iterable[str], meta: Dict[str, Dict], now: float = None) -> Set[str]:
+        """Guarda o resultado de um videos.list; devolve os vídeos já conhecidos que mudaram."""
+        now = time.time() if now is None else now
+        modified = set()
+        for vid in requested:
+            info = meta.get(vid)
+            known = vid in self.videos or vid in self.missing
+            if info is None:
+                if vid in self.videos:
+                    modified.add(vid)
+                self.videos.pop(vid, None)
+                self.fetched_at.pop(vid, None)
+                self.missing[vid] = now
+            else:
+                if known and self.videos.get(vid) != info:
+                    modified.add(vid)
+                self.videos[vid] = info
+                self.fetched_at[vid] = now
+                self.missing.pop(vid, None)
+        return modified
+
+    def is_changed(self, playlist_id: str) -> bool:
+        return playlist_id in self.changed
+
+    def output_file(self, playlist_id: str) -> Optional[Path]:
+        out = self.playlists.get(playlist_id, {}).get("outputFile")
+        return Path(out) if out else None
+
+    def set_output_file(self, playlist_id: str, path: Path) -> None:
+        self.playlists.setdefault(playlist_id, {})["outputFile"] = str(path)
+
+    def stats(self, playlist_id: str) -> Optional[Dict]:
+        """Estatísticas agregadas da última vez que a playlist foi gravada."""
+        return self.playlists.get(playlist_id, {}).get("stats")
+
+    def set_stats(self, playlist_id: str, stats: Dict) -> None:
+        self.playlists.setdefault(playlist_id, {})["stats"] = stats
+
+    def save(self, playlist_ids: List[str] = None) -> None:
+        """Grava o estado de forma atômica, descartando playlists e vídeos que sumiram."""
+        if playlist_ids is not None:
+            keep = set(playlist_ids)
+            self.playlists = {pid: e for pid, e in self.playlists.items() if pid in keep}
+        referenced = {vid for e in self.playlists.values() for vid in e.get("videoIds", [])}
+        self.videos = {vid: m for vid, m in self.videos.items() if vid in referenced}
+        self.fetched_at = {vid: t for vid, t in self.fetched_at.items() if vid in self.videos}
+        self.missing = {vid: t for vid, t in self.missing.items() if vid in referenced}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        data = {"playlists": self.playlists, "videos": self.videos, "fetchedAt": self.fetched_at, "missing": self.missing}
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -0,0 +1,133 @@
+"""
+Estatísticas agregadas de uma raspagem, calculadas enquanto as linhas são geradas.
+
+Para cada playlist (e somadas por canal) conta os vídeos gravados e os
+indisponíveis ou privados, soma a duração em segundos e o tamanho das
+descrições e deriva as médias. A duração vem em segundos inteiros junto com os
+metadados do vídeo, então nada precisa reler a saída nem converter HH:MM:SS de
+volta. O resumo é gravado num JSON compacto ao lado da saída.
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from output_writers import duration_seconds
+
+SUMMARY_FILENAME = "summary.json"   # modo --split: um resumo por pasta de canal
+SUMMARY_SUFFIX = ".summary.json"    # arquivo único: <saída>.summary.json
+
+
+def summary_path(output: Path) -> Path:
+    """Resumo de um arquivo de saída: playlists.csv -> playlists.summary.json."""
+    output = Path(output)
+    return output.with_name(output.stem + SUMMARY_SUFFIX)
+
+
+def video_seconds(info: Dict) -> int:
+    """Duração do vídeo em segundos (0 se desconhecida)."""
+    return duration_seconds(info) or 0
+
+
+class PlaylistStats:
+    """Contadores de uma playlist; cada instância é atualizada por uma única thread."""
+
+    __slots__ = ("id", "title", "videos", "unavailable", "duration_seconds", "description_chars")
+
+    def __init__(self, playlist_id: str, title: str):
+        self.id = playlist_id
+        self.title = title
+        self.videos = 0
+        self.unavailable = 0
+        self.duration_seconds = 0
+        self.description_chars = 0
+
+    def add(self, info: Dict) -> None:
+        self.videos += 1
+        self.duration_seconds += video_seconds(info)
+        self.description_chars += len(info.get("description", ""))
+
+    def merge(self, other: "PlaylistStats") -> None:
+        self.videos += other.videos
+        self.unavailable += other.unavailable
+        self.duration_seconds += other.duration_seconds
+        self.description_chars += other.description_chars
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "videos": self.videos,
+            "unavailable": self.unavailable,
+            "durationSeconds": self.duration_seconds,
+            "meanDurationSeconds": round(self.duration_seconds / self.videos, 1) if self.videos else 0,
+            "descriptionChars": self.description_chars,
+            "meanDescriptionChars": round(self.description_chars / self.videos, 1) if self.videos else 0,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PlaylistStats":
+        stats = cls(data["id"], data["title"])
+        stats.videos = data["videos"]
+        stats.unavailable = data["unavailable"]
+        stats.duration_seconds = data["durationSeconds"]
+        stats.description_chars = data["descriptionChars"]
+        return stats
+
+
+class ScrapeStats:
+    """Estatísticas de uma execução inteira, agrupadas por canal e playlist.
+
+    Os totais do canal somam as linhas das suas playlists: um vídeo presente
+    em duas playlists conta duas vezes, como nos arquivos de saída.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._playlists: Dict[Tuple[str, str], PlaylistStats] = {}
+
+    def playlist(self, channel: str, playlist: Dict) -> PlaylistStats:
+        """Contadores novos para a playlist; uma nova raspagem dela substitui a anterior."""
+        stats = PlaylistStats(playlist["id"], playlist["title"])
+        self.restore(channel, stats)
+        return stats
+
+    def restore(self, channel: str, stats: PlaylistStats) -> None:
+        """Reaproveita contadores já calculados (ex.: playlist sem alterações no modo incremental)."""
+        with self._lock:
+            self._playlists.pop((channel, stats.id), None)
+            self._playlists[(channel, stats.id)] = stats
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            items = list(self._playlists.items())
+        channels: Dict[str, List[PlaylistStats]] = {}
+        for (channel, _), stats in items:
+            channels.setdefault(channel, []).append(stats)
+        result = []
+        overall = PlaylistStats("", "")
+        for channel, playlists in channels.items():
+            total = PlaylistStats("", channel)
+            for stats in playlists:
+                total.merge(stats)
+            overall.merge(total)
+            summary = total.to_dict()
+            del summary["id"], summary["title"]
+            result.append({"channel": channel, **summary, "playlists": [s.to_dict() for s in playlists]})
+        totals = overall.to_dict()
+        del totals["id"], totals["title"]
+        return {"generatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), **totals, "channels": result}
+
+    def write(self, path: Path) -> Optional[Path]:
+        """Grava o resumo em JSON compacto (de forma atômica); não grava nada se estiver vazio."""
+        if not self._playlists:
+            return None
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+        return path
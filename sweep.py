@@ -0,0 +1,304 @@
+"""
+Modo daemon: mantém atualizada uma lista de canais e playlists.
+
+Em vez de raspar tudo a intervalos fixos, cada alvo passa primeiro por uma
+sondagem barata (playlists.list e channels.list sem cache, 1 unidade a cada
+50 playlists) que compara a contagem de itens de cada playlist e de vídeos do
+canal com a da verificação anterior. Só quando algo mudou, ou quando o alvo
+passou de ``max_interval`` sem uma raspagem completa, o ``main()`` roda — em
+modo incremental para canais, revalidando páginas por ETag e chamando
+videos.list só para vídeos novos.
+
+O intervalo entre verificações de cada alvo segue a sua taxa de mudança
+observada (média com decaimento exponencial): canais movimentados são
+verificados com frequência, canais parados quase não gastam quota. A fila é
+ordenada pelo próximo vencimento e, entre os vencidos, pelo atraso relativo
+(tempo desde a última verificação / intervalo desejado). O orçamento diário
+do agendador e o limite de raspagens simultâneas valem para o daemon inteiro.
+"""
+from __future__ import annotations
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from batch import read_targets
+from quota import get_scheduler, project_channel_quota
+
+DEFAULT_STATE_PATH = Path(".cache") / "sweep_state.json"
+DEFAULT_JOBS = 2
+DEFAULT_MIN_INTERVAL = 15 * 60
+DEFAULT_MAX_INTERVAL = 7 * 24 * 3600
+POLL_SECONDS = 30
+RATE_HALF_LIFE = 14 * 24 * 3600   # observações perdem metade do peso a cada duas semanas
+PRIOR_HOURS = 48.0                 # sem histórico, supõe uma mudança a cada dois dias
+CHECKS_PER_CHANGE = 2              # verificações por mudança esperada
+
+PROBE_PLAYLISTS_FIELDS = "nextPageToken,items(id,snippet/title,contentDetails/itemCount)"
+PROBE_PLAYLIST_FIELDS = "items(id,snippet(title,channelId),contentDetails/itemCount)"
+
+
+def parse_duration(text: str) -> float:
+    """'90' ou '90s' -> 90; '15m' -> 900; '6h' -> 21600; '7d' -> 604800."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", str(text))
+    if not m:
+        raise ValueError(f"Duração inválida: {text!r} (use ex.: 90s, 15m, 6h, 7d)")
+    return float(m.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}[m.group(2)]
+
+
+# ---------- estado ----------
+class SweepState:
+    """Histórico de cada alvo do daemon, gravado em JSON entre execuções."""
+
+    def __init__(self, path: Path = DEFAULT_STATE_PATH):
+        self.path = Path(path)
+        self.targets: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            self.targets = json.loads(self.path.read_text(encoding="utf-8")).get("targets", {})
+
+    def entry(self, target: str) -> Dict:
+        return self.targets.setdefault(target, {
+            "lastCheck": None, "lastScrape": None, "lastChange": None,
+            "checks": 0, "changes": 0, "errors": 0, "lastError": None,
+            "weightedChanges": 0.0, "weightedHours": 0.0,   # taxa de mudança com decaimento
+            "signature": None, "estimatedUnits": None,
+        })
+
+    @staticmethod
+    def change_rate(entry: Dict) -> float:
+        """Mudanças por hora estimadas (média com decaimento + prior)."""
+        return (entry["weightedChanges"] + 1) / (entry["weightedHours"] + PRIOR_HOURS)
+
+    def interval(self, entry: Dict, min_interval: float, max_interval: float) -> float:
+        """Intervalo desejado até a próxima verificação do alvo."""
+        if entry["errors"]:
+            return min(max_interval, min_interval * 2 ** entry["errors"])
+        seconds = 3600 / (self.change_rate(entry) * CHECKS_PER_CHANGE)
+        return max(min_interval, min(max_interval, seconds))
+
+    def record(self, target: str, now: float, changed: bool, signature: Dict, scraped: bool,
+               estimated_units: Optional[int]) -> None:
+        with self._lock:
+            entry = self.entry(target)
+            if entry["lastCheck"] is not None:
+                hours = max(0.0, now - entry["lastCheck"]) / 3600
+                decay = 0.5 ** (hours * 3600 / RATE_HALF_LIFE)
+                entry["weightedHours"] = entry["weightedHours"] * decay + hours
+                entry["weightedChanges"] = entry["weightedChanges"] * decay + (1 if changed else 0)
+            entry["lastCheck"] = now
+            entry["checks"] += 1
+            entry["errors"] = 0
+            entry["lastError"] = None
+            entry["signature"] = signature
+            entry["estimatedUnits"] = estimated_units
+            if changed:
+                entry["changes"] += 1
+                entry["lastChange"] = now
+            if scraped:
+                entry["lastScrape"] = now
+            self._save()
+
+    def record_error(self, target: str, now: float, error: str) -> None:
+        with self._lock:
+            entry = self.entry(target)
+            entry["lastCheck"] = now
+            entry["errors"] += 1
+            entry["lastError"] = error
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"targets": self.targets}, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+# ---------- sondagem ----------
+def probe(session, target: Dict) -> Tuple[Dict, int]:
+    """Contagens atuais do alvo, sem cache: (assinatura, unidades estimadas para raspá-lo).
+
+    As respostas também alimentam a memória da sessão, então a raspagem que
+    vier em seguida não lista as playlists de novo.
+    """
+    from youtube_playlist_scraper import UPLOADS_FIELDS, api_call_conditional, extract_playlist_id
+    youtube = session.client
+    if target["kind"] == "playlist":
+        playlist_id = extract_playlist_id(target["target"])
+        resp = api_call_conditional(youtube, "playlists", None, id=playlist_id, part="snippet,contentDetails",
+                                    fields=PROBE_PLAYLIST_FIELDS)
+        items = resp.get("items", [])
+        if not items:
+            raise Exception("Playlist não encontrada")
+        count = items[0]["contentDetails"]["itemCount"]
+        session.remember("playlist_info", playlist_id, {
+            "id": playlist_id, "title": items[0]["snippet"]["title"], "channelId": items[0]["snippet"]["channelId"],
+        })
+        return {"playlists": {playlist_id: count}}, project_channel_quota([count])
+
+    channel_id = session.channel_id(target["target"])
+    playlists, next_token = [], None
+    while True:
+        resp = api_call_conditional(youtube, "playlists", None, channelId=channel_id, part="snippet,contentDetails",
+                                    maxResults=50, pageToken=next_token, fields=PROBE_PLAYLISTS_FIELDS)
+        playlists += [
+            {"id": pl["id"], "title": pl["snippet"]["title"], "itemCount": pl.get("contentDetails", {}).get("itemCount", 0)}
+            for pl in resp.get("items", [])
+        ]
+        next_token = resp.get("nextPageToken")
+        if not next_token:
+            break
+    session.remember("playlists", channel_id, playlists)
+    resp = api_call_conditional(youtube, "channels", None, id=channel_id, part="contentDetails,statistics",
+                                fields=UPLOADS_FIELDS)
+    items = resp.get("items", [])
+    video_count = int(items[0].get("statistics", {}).get("videoCount", 0)) if items else 0
+    signature = {"playlists": {pl["id"]: pl["itemCount"] for pl in playlists}, "videos": video_count}
+    return signature, project_channel_quota(pl["itemCount"] for pl in playlists)
+
+
+# ---------- daemon ----------
+class SweepDaemon:
+    """Fila de prioridade de alvos + pool de raspagens limitado a ``jobs`` simultâneas."""
+
+    def __init__(self, api_key: str, watchlist: Path, jobs: int = DEFAULT_JOBS,
+                 min_interval: float = DEFAULT_MIN_INTERVAL, max_interval: float = DEFAULT_MAX_INTERVAL,
+                 state_path: Path = DEFAULT_STATE_PATH, out_file: Path = Path("playlists.csv"),
+                 split: bool = False, output_format: str = None, workers: int = 1,
+                 store=None, uploads: bool = False):
+        from youtube_playlist_scraper import YouTubeSession
+        self.api_key = api_key
+        self.watchlist = Path(watchlist)
+        self.jobs = max(1, jobs)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.state = SweepState(state_path)
+        self.options = {"out_file": Path(out_file), "split": split, "output_format": output_format,
+                        "workers": workers, "store": store, "uploads": uploads}
+        # Listas de playlists e informações de canal valem até a próxima verificação possível
+        self.session = YouTubeSession(api_key, memo_ttl=min_interval)
+        self.targets: Dict[str, Dict] = {}
+        self._watchlist_mtime = None
+        self._queue: List[Tuple[float, str]] = []   # (vencimento, alvo)
+        self._running: Dict = {}                     # future -> alvo
+        self._stop = threading.Event()
+
+    # ---------- fila ----------
+    def due_at(self, target: str) -> float:
+        entry = self.state.entry(target)
+        if entry["lastCheck"] is None:
+            return 0.0
+        return entry["lastCheck"] + self.state.interval(entry, self.min_interval, self.max_interval)
+
+    def overdue_ratio(self, target: str, now: float) -> float:
+        """Tempo desde a última verificação em relação ao intervalo desejado (maior = mais urgente)."""
+        entry = self.state.entry(target)
+        if entry["lastCheck"] is None:
+            return math.inf
+        return (now - entry["lastCheck"]) / self.state.interval(entry, self.min_interval, self.max_interval)
+
+    def reload_watchlist(self) -> None:
+        """Relê a lista de alvos quando o arquivo muda; alvos removidos saem da fila."""
+        mtime = self.watchlist.stat().st_mtime
+        if mtime == self._watchlist_mtime:
+            return
+        self._watchlist_mtime = mtime
+        self.targets = {t["target"]: t for t in read_targets(self.watchlist)}
+        running = set(self._running.values())
+        self._queue = [(self.due_at(t), t) for t in self.targets if t not in running]
+        heapq.heapify(self._queue)
+        print(f"👀 Lista de alvos: {len(self.targets)} alvo(s) em {self.watchlist}")
+
+    def _take_ready(self, now: float, slots: int) -> List[str]:
+        """Tira da fila os alvos vencidos mais atrasados que cabem nos ``slots`` e no orçamento."""
+        ready = []
+        while self._queue and self._queue[0][0] <= now:
+            ready.append(heapq.heappop(self._queue)[1])
+        ready.sort(key=lambda t: self.overdue_ratio(t, now), reverse=True)
+        scheduler = get_scheduler()
+        available = scheduler.remaining
+        chosen = []
+        for target in ready:
+            estimate = self.state.entry(target)["estimatedUnits"] or 0
+            # a sondagem custa ~2 unidades; a raspagem só acontece se houver mudança
+            if len(chosen) < slots and estimate + 2 <= available:
+                chosen.append(target)
+                available -= estimate + 2
+            else:
+                heapq.heappush(self._queue, (now if len(chosen) >= slots else now + POLL_SECONDS, target))
+        return chosen
+
+    # ---------- execução ----------
+    def check(self, target: str) -> str:
+        """Sonda o alvo e raspa se ele mudou ou se a última raspagem ficou velha demais."""
+        from youtube_playlist_scraper import main
+        info = self.targets[target]
+        entry = self.state.entry(target)
+        signature, estimate = probe(self.session, info)
+        changed = entry["signature"] is not None and signature != entry["signature"]
+        stale = entry["lastScrape"] is None or time.time() - entry["lastScrape"] >= self.max_interval
+        if changed or stale:
+            opts = self.options
+            main(self.api_key, opts["out_file"], opts["split"],
+                 channel=target if info["kind"] == "channel" else None,
+                 playlist_url=target if info["kind"] == "playlist" else None,
+                 workers=opts["workers"], incremental=info["kind"] == "channel",
+                 output_format=opts["output_format"], session=self.session, store=opts["store"],
+                 uploads=opts["uploads"] and info["kind"] == "channel")
+        self.state.record(target, time.time(), changed, signature, scraped=changed or stale, estimated_units=estimate)
+        return "alterado" if changed else ("raspado" if stale else "sem mudanças")
+
+    def _finish(self, future) -> None:
+        target = self._running.pop(future)
+        try:
+            outcome = future.result()
+            print(f"✅ {target}: {outcome}")
+        except (Exception, SystemExit) as e:
+            self.state.record_error(target, time.time(), str(e))
+            print(f"❌ {target}: {e}")
+        if target in self.targets:
+            heapq.heappush(self._queue, (self.due_at(target), target))
+            entry = self.state.entry(target)
+            rate = self.state.change_rate(entry) * 24
+            next_in = self.due_at(target) - time.time()
+            print(f"   próxima verificação em {next_in / 3600:.1f} h (~{rate:.2f} mudança(s)/dia)")
+
+    def run(self, once: bool = False) -> None:
+        """Laço principal; com ``once`` verifica só os alvos vencidos agora e termina."""
+        pool = ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="sweep")
+        try:
+            self.reload_watchlist()
+            started = time.time()
+            while not self._stop.is_set():
+                now = time.time()
+                for target in self._take_ready(started if once else now, self.jobs - len(self._running)):
+                    self._running[pool.submit(self.check, target)] = target
+                if once and not self._running:
+                    break
+                timeout = POLL_SECONDS
+                if self._queue and not once:
+                    timeout = min(timeout, max(0.0, self._queue[0][0] - now))
+                if self._running:
+                    done, _ = wait(list(self._running), timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish(future)
+                else:
+                    self._stop.wait(timeout)
+                if not once:
+                    self.reload_watchlist()
+        except KeyboardInterrupt:
+            print("⏹️  Encerrando: aguardando as raspagens em andamento...")
+        finally:
+            self._stop.set()
+            for future in wait(list(self._running)).done:
+                self._finish(future)
+            pool.shutdown(wait=True)
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,55 @@
+"""Fixtures comuns: o servidor falso de bench/ e o scraper apontado para ele, sem cache nem estado global."""
+import json
+import sys
+from pathlib import Path
+from urllib.request import urlopen
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "bench"))
+
+from fake_youtube_api import FakeConfig, start_server  # noqa: E402
+
+
+def api_stats(server, key: str = "requests") -> dict:
+    """Contagem do servidor falso por endpoint (``requests``, ``notModified``, ``errors``...)."""
+    stats = json.loads(urlopen(server.url + "/_stats").read())
+    return {resource: entry[key] for resource, entry in stats.items() if entry[key]}
+
+
+def reset_stats(server) -> None:
+    urlopen(server.url + "/_reset").read()
+
+
+@pytest.fixture
+def fake_api(tmp_path, monkeypatch):
+    """Fábrica: ``fake_api(playlists=3, videos=40)`` sobe um servidor e aponta o scraper para ele.
+
+    Cada teste roda numa pasta temporária, com cache de respostas, mapa de
+    canais e banco de vídeos desligados e um agendador sem limite prático.
+    """
+    import youtube_playlist_scraper
+    from api_cache import configure_cache
+    from channel_map import configure_channel_map
+    from quota import configure_scheduler
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("YOUTUBE_API_KEY", "x")
+    monkeypatch.setenv("VIDEO_STORE", "off")
+    configure_cache(enabled=False)
+    configure_channel_map(enabled=False)
+    configure_scheduler(rate=1000, usage_path=None)
+    servers = []
+
+    def start(**config):
+        server = start_server(FakeConfig(**{"latency": 0.0, **config}))
+        servers.append(server)
+        monkeypatch.setattr(youtube_playlist_scraper, "API_ENDPOINT", server.url)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
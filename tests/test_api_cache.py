@@ -0,0 +1,51 @@
+"""Cache de respostas: acertos sem escrita no banco e remoção LRU só quando o cache passa do limite."""
+import sqlite3
+
+import api_cache
+from api_cache import ApiCache
+
+
+def accessed(cache, endpoint, params):
+    conn = sqlite3.connect(str(cache.path))
+    try:
+        return conn.execute("SELECT accessed FROM entries WHERE key = ?",
+                            (cache.make_key(endpoint, params),)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_hits_do_not_write(tmp_path, monkeypatch):
+    cache = ApiCache(tmp_path / "c.sqlite")
+    assert cache._conn.execute("PRAGMA synchronous").fetchone()[0] == 1   # NORMAL
+    cache.put("videos", {"id": "a"}, {"items": [1]})
+    before = accessed(cache, "videos", {"id": "a"})
+    monkeypatch.setattr(api_cache.time, "time", lambda: before + 100)
+    assert cache.get("videos", {"id": "a"}) == {"items": [1]}
+    assert accessed(cache, "videos", {"id": "a"}) == before   # ainda só em memória
+    cache.flush()
+    assert accessed(cache, "videos", {"id": "a"}) == before + 100
+    cache.close()
+
+
+def test_eviction_is_batched_and_keeps_recently_used(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(api_cache.time, "time", lambda: clock[0])
+    cache = ApiCache(tmp_path / "c.sqlite", max_entries=10)
+    counts = []
+    original = cache._evict
+    monkeypatch.setattr(cache, "_evict", lambda: counts.append(1) or original())
+    for i in range(10):
+        clock[0] += 1
+        cache.put("videos", {"id": i}, {"n": i})
+    clock[0] += 1
+    assert cache.get("videos", {"id": 0}) == {"n": 0}   # a mais antiga passa a ser a mais recente
+
+    for i in range(10, 12):
+        clock[0] += 1
+        cache.put("videos", {"id": i}, {"n": i})
+    # passou do limite uma vez: desce para 9 (as 2 menos usadas) e a inserção seguinte não reconta
+    assert len(counts) == 1
+    remaining = {row[0] for row in cache._conn.execute("SELECT body FROM entries")}
+    assert len(remaining) == 10
+    assert '{"n": 0}' in remaining and '{"n": 1}' not in remaining and '{"n": 2}' not in remaining
+    cache.close()
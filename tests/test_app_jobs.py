@@ -0,0 +1,116 @@
+"""Jobs simultâneos da aplicação web gravam cada um na sua própria pasta."""
+import csv
+import io
+import json
+import threading
+import time
+import zipfile
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client(fake_api, monkeypatch):
+    fake_api(channels=2, playlists=3, videos=20)
+    monkeypatch.setattr(app, "_session", None)
+    monkeypatch.setattr(app, "jobs", app.JobManager(max_workers=2))
+    return app.app.test_client()
+
+
+def wait_finished(client, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f"/progress/{job_id}").get_json()
+        if job["finished_at"] is not None:
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_concurrent_jobs_write_separate_outputs(client):
+    started = [client.post("/download", json={"channel": f"@benchchannel{c}"}).get_json() for c in range(2)]
+    assert len({s["output_dir"] for s in started}) == 2
+    finished = [wait_finished(client, s["job_id"]) for s in started]
+
+    for c, job in enumerate(finished):
+        assert job["status"] == "completed"
+        assert sorted(job["files"]) == ["all_playlists.csv", "all_playlists.summary.json"]
+        summary = json.loads(client.get(f"/jobs/{job['job_id']}/files/all_playlists.summary.json").data)
+        assert [ch["channel"] for ch in summary["channels"]] == [f"Bench Channel {c}"]
+        rows = list(csv.DictReader(io.StringIO(
+            client.get(f"/jobs/{job['job_id']}/files/all_playlists.csv").data.decode("utf-8-sig")), delimiter=";"))
+        assert len(rows) == summary["videos"]
+
+        archive = zipfile.ZipFile(io.BytesIO(client.get(f"/download_zip/{job['job_id']}").data))
+        assert sorted(archive.namelist()) == sorted(job["files"])
+
+    assert client.get(f"/jobs/{finished[0]['job_id']}/files/../../x").status_code == 404
+
+
+def test_job_key_does_not_call_the_api(monkeypatch):
+    def no_session():
+        raise AssertionError("job_key must not resolve the channel")
+
+    monkeypatch.setattr(app, "get_session", no_session)
+    assert app.job_key("@Bench", [], False) == app.job_key("https://www.youtube.com/@bench", [], False)
+    assert app.job_key("@bench", [], False) != app.job_key("@bench", [], True)
+
+
+def test_unknown_channel_fails_inside_the_job(client):
+    response = client.post("/download", json={"channel": "@nobody"})
+    assert response.status_code == 200
+    job = wait_finished(client, response.get_json()["job_id"])
+    assert job["status"] == "error" and job["files"] == []
+
+
+def test_split_keeps_playlists_with_clashing_titles(fake_api, monkeypatch):
+    server = fake_api(playlists=3, videos=10)
+    world = server.api.world
+    first, second, _ = world.channels[next(iter(world.channels))]["playlistIds"]
+    world.playlists[first]["title"], world.playlists[second]["title"] = "Aula #1", "aula 1"
+    monkeypatch.setattr(app, "_session", None)
+    monkeypatch.setattr(app, "jobs", app.JobManager(max_workers=1))
+    client = app.app.test_client()
+
+    job = wait_finished(client, client.post("/download", json={"channel": "@benchchannel0", "split": True}).get_json()["job_id"])
+    names = sorted(job["files"])
+    assert f"benchchannel0/Aula 1 {first}.csv" in names and f"benchchannel0/aula 1 {second}.csv" in names
+    assert len(names) == 4  # 3 playlists + summary.json
+
+
+@pytest.mark.parametrize("split", [True, False])
+def test_failed_playlists_are_recorded_and_fetches_share_one_limit(client, monkeypatch, split):
+    monkeypatch.setattr(app, "SPLIT_WORKERS", 2)
+    monkeypatch.setattr(app, "_playlist_pool", None)
+    scraper_main = app.scraper_main
+    lock = threading.Lock()
+    running, peak = [0], [0]
+    failing = set()
+
+    def tracked(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        try:
+            time.sleep(0.05)
+            if kwargs.get("playlist_id") in failing:
+                raise RuntimeError("quota exceeded")
+            return scraper_main(*args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(app, "scraper_main", tracked)
+    session = app.get_session()
+    failed = session.playlists(session.channel_id("@benchchannel0"))[1]
+    failing.add(failed["id"])
+
+    started = [client.post("/download", json={"channel": f"@benchchannel{c}", "split": split}).get_json() for c in range(2)]
+    first, second = [wait_finished(client, s["job_id"]) for s in started]
+
+    assert first["status"] == "error"
+    assert first["failed_playlists"] == [f"Playlist {failed['title']}: quota exceeded"]
+    assert second["status"] == "completed" and second["failed_playlists"] == []
+    assert peak[0] <= 2
@@ -0,0 +1,47 @@
+"""O backend assíncrono usa o mesmo endpoint do síncrono e reaproveita o cliente da thread."""
+import csv
+import threading
+
+import pytest
+
+pytest.importorskip("httpx")
+
+import async_backend  # noqa: E402
+import youtube_playlist_scraper as scraper  # noqa: E402
+from conftest import api_stats  # noqa: E402
+
+
+def read_rows(path):
+    with open(path, encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_async_backend_matches_threads_on_the_configured_endpoint(fake_api, tmp_path):
+    server = fake_api(playlists=3, videos=30)
+    scraper.main(channel="@benchchannel0", out_file=tmp_path / "threads.csv")
+    scraper.main(channel="@benchchannel0", out_file=tmp_path / "async.csv", backend="async")
+    threads = read_rows(tmp_path / "playlists" / "benchchannel0" / "threads.csv")
+    assert read_rows(tmp_path / "playlists" / "benchchannel0" / "async.csv") == threads
+    assert api_stats(server)["videos"] >= 2
+
+
+def test_client_is_kept_per_thread(fake_api):
+    server = fake_api(playlists=2, videos=10)
+    playlists = next(iter(server.api.world.channels.values()))["playlistIds"]
+    playlists = [{"id": pid, "title": pid} for pid in playlists]
+
+    async_backend.fetch_playlists_sync("x", playlists[:1], concurrency=4)
+    first = async_backend._thread_runner().api
+    async_backend.fetch_playlists_sync("x", playlists[1:], concurrency=4)
+    assert async_backend._thread_runner().api is first
+    assert first.endpoint == server.url
+
+    other = []
+    thread = threading.Thread(target=lambda: (async_backend.fetch_playlists_sync("x", playlists, concurrency=4),
+                                              other.append(async_backend._thread_runner().api)))
+    thread.start()
+    thread.join()
+    assert other and other[0] is not first
+
+    async_backend.fetch_playlists_sync("x", playlists[:1], concurrency=8)
+    assert async_backend._thread_runner().api is not first
@@ -0,0 +1,97 @@
+"""Modo lote: shards em processos separados, manifestos e merge contra o servidor falso."""
+import csv
+import json
+
+import pytest
+
+import batch
+
+
+@pytest.fixture
+def targets(fake_api, monkeypatch, tmp_path):
+    server = fake_api(channels=2, playlists=2, videos=20)
+    # os workers do lote são processos novos: o endereço do servidor vai pelo ambiente
+    monkeypatch.setenv("YOUTUBE_API_ENDPOINT", server.url)
+    monkeypatch.setenv("YOUTUBE_CHANNEL_MAP", "off")
+    playlist_id = next(iter(server.api.world.playlists))
+    path = tmp_path / "targets.txt"
+    path.write_text(f"@benchchannel0\n# comentário\n@benchchannel1\nhttps://www.youtube.com/playlist?list={playlist_id}\n",
+                    encoding="utf-8")
+    return path
+
+
+def run(targets, shard, **options):
+    return batch.run_batch("x", targets, shard=shard, jobs=2, use_cache=False, **options)
+
+
+def merged_rows(path):
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_shards_merge_in_target_order(targets, tmp_path):
+    run(targets, "0/2")
+    run(targets, "1/2")
+    assert batch.merge_outputs(tmp_path / "all.csv") == 3
+    rows = merged_rows(tmp_path / "all.csv")
+    assert [r["channel"] for r in rows][:1] == ["Bench Channel 0"]
+    assert len(rows) == sum(len(merged_rows(f)) for m in batch.load_manifests() for r in m["records"] for f in r["files"])
+
+
+def test_rerun_with_other_shard_count_clears_old_manifests(targets, tmp_path):
+    run(targets, "0/2")
+    run(targets, "1/2")
+    run(targets, "0/1")
+    assert [p.name for p in batch.BATCH_DIR.glob("shard-*.json")] == ["shard-0-of-1.json"]
+    assert batch.merge_outputs(tmp_path / "all.csv") == 3
+
+
+def test_manifests_from_another_targets_file_are_rejected(targets, tmp_path):
+    first = run(targets, "0/2")
+    other = json.loads(first.read_text(encoding="utf-8"))
+    other.update(shard=1, runId="other", targetsHash="0" * 40, records=[])
+    batch.manifest_path(1, 2).write_text(json.dumps(other), encoding="utf-8")
+    with pytest.raises(Exception, match="execuções diferentes"):
+        batch.merge_outputs(tmp_path / "all.csv")
+
+    # a lista muda: o shard seguinte descarta o manifesto da lista antiga
+    targets.write_text("@benchchannel1\n", encoding="utf-8")
+    run(targets, "1/2")
+    with pytest.raises(Exception, match="Faltam os shards 0"):
+        batch.load_manifests()
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_merge_streams_row_groups(targets, tmp_path, fmt):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    run(targets, "0/1", out_file=tmp_path / f"out.{fmt}", split=True)
+    sources = [f for m in batch.load_manifests() for r in m["records"] for f in r["files"]]
+    out = tmp_path / f"all.{fmt}"
+    assert batch.merge_outputs(out) == len(sources) == 5   # 2 canais x 2 playlists + a playlist avulsa
+    if fmt == "parquet":
+        merged = pq.ParquetFile(out)
+        groups, table = merged.num_row_groups, merged.read()
+    else:
+        reader = pa.ipc.open_file(str(out))
+        groups, table = reader.num_record_batches, reader.read_all()
+    assert groups == len(sources)
+    assert table.column("channel").to_pylist()[0] == "Bench Channel 0"
+    assert set(table.column("channel").to_pylist()) == {"Bench Channel 0", "Bench Channel 1"}
+
+
+def test_single_playlists_with_the_same_title_do_not_collide(fake_api, monkeypatch, tmp_path):
+    server = fake_api(playlists=2, videos=10)
+    monkeypatch.setenv("YOUTUBE_API_ENDPOINT", server.url)
+    monkeypatch.setenv("YOUTUBE_CHANNEL_MAP", "off")
+    first, second = server.api.world.playlists
+    for playlist_id in (first, second):
+        server.api.world.playlists[playlist_id]["title"] = "Mesma lista"
+    path = tmp_path / "targets.txt"
+    path.write_text("".join(f"https://www.youtube.com/playlist?list={p}\n" for p in (first, second)), encoding="utf-8")
+
+    run(path, "0/1")
+    files = [f for m in batch.load_manifests() for r in m["records"] for f in r["files"]]
+    assert len(set(files)) == 2
+    assert batch.merge_outputs(tmp_path / "all.csv") == 2
@@ -0,0 +1,45 @@
+"""Resolução de canais sem search.list e o mapa persistente de channelIds, que vence depois do TTL."""
+import pytest
+
+import channel_map
+import youtube_playlist_scraper as scraper
+from channel_map import configure_channel_map
+from conftest import api_stats, reset_stats
+
+
+@pytest.fixture
+def mapped(fake_api, tmp_path):
+    server = fake_api(channels=2, playlists=1, videos=5)
+    yield server, configure_channel_map(path=tmp_path / "channel_ids.sqlite", ttl=60)
+    configure_channel_map(enabled=False)
+
+
+def resolve(ref):
+    """Resolve com uma sessão nova, para que só o mapa persistente evite a API."""
+    session = scraper.YouTubeSession("x")
+    return session.channel_id(ref), session.resolution_method(ref)
+
+
+def test_handles_resolve_without_search(mapped):
+    server, _ = mapped
+    channel_id, method = resolve("https://www.youtube.com/@BenchChannel1")
+    assert server.api.world.handles["benchchannel1"] == channel_id
+    assert method == "forHandle"
+    assert api_stats(server) == {"channels": 1}
+
+
+def test_map_entry_is_reused_until_it_expires(mapped, monkeypatch):
+    server, ids = mapped
+    channel_id, _ = resolve("@benchchannel0")
+
+    reset_stats(server)
+    assert resolve("https://www.youtube.com/@BenchChannel0") == (channel_id, "map")
+    assert api_stats(server) == {}
+
+    key = scraper.channel_ref_key("@benchchannel0")
+    assert ids.get(key) == channel_id
+    now = channel_map.time.time()
+    monkeypatch.setattr(channel_map.time, "time", lambda: now + ids.ttl + 1)
+    assert ids.get(key) is None
+    assert resolve("@benchchannel0") == (channel_id, "forHandle")
+    assert api_stats(server) == {"channels": 1}
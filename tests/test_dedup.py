@@ -0,0 +1,32 @@
+"""Vídeos repetidos entre playlists são consultados uma única vez, em lotes cheios de videos.list."""
+import csv
+import math
+
+import pytest
+
+import youtube_playlist_scraper as scraper
+from conftest import api_stats
+
+
+def test_pack_video_batches_dedups_in_order():
+    ids = [[f"v{i}" for i in range(40)], [f"v{i}" for i in range(30, 75)], ["v0", "v99"]]
+    batches, batch_of = scraper.pack_video_batches(ids)
+    assert [len(b) for b in batches] == [50, 26]
+    assert batches[0][:3] == ["v0", "v1", "v2"] and batches[-1][-1] == "v99"
+    assert batch_of["v49"] == 0 and batch_of["v50"] == 1 and batch_of["v0"] == 0
+
+
+@pytest.mark.parametrize("backend", ["threads", "async"])
+def test_shared_videos_are_fetched_once(fake_api, tmp_path, backend):
+    if backend == "async":
+        pytest.importorskip("httpx")
+    server = fake_api(playlists=4, videos=60, shared=0.5, private=0.0, deleted=0.0)
+    world = server.api.world
+    items = [world.items[pid] for pid in world.channels[next(iter(world.channels))]["playlistIds"]]
+    distinct = {vid for ids in items for vid in ids}
+    assert len(distinct) < sum(len(ids) for ids in items)
+
+    scraper.main(channel="@benchchannel0", backend=backend, workers=4)
+    assert api_stats(server)["videos"] == math.ceil(len(distinct) / 50)
+    with open(tmp_path / "playlists" / "benchchannel0" / "playlists.csv", encoding="utf-8") as f:
+        assert sum(1 for _ in csv.DictReader(f)) == sum(len(ids) for ids in items)
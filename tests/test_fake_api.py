@@ -0,0 +1,105 @@
+"""O scraper contra o servidor falso: chamadas por endpoint, revalidação por ETag e validade do estado no modo incremental."""
+import csv
+import json
+import math
+from urllib.request import Request, urlopen
+
+import youtube_playlist_scraper as scraper
+from scrape_state import STATE_FILENAME, VIDEO_MAX_AGE
+from conftest import api_stats, reset_stats
+
+PAGES = 9    # 3 playlists x 120 vídeos, 50 por página
+BATCHES = 8  # 360 vídeos distintos em lotes de 50
+
+
+def scrape():
+    scraper.main(channel="@benchchannel0", split_by_playlist=True, incremental=True, workers=2)
+
+
+def output_titles(channel_dir):
+    titles = set()
+    for path in channel_dir.glob("*.csv"):
+        with open(path, encoding="utf-8") as f:
+            titles.update(row["videoTitle"] for row in csv.DictReader(f))
+    return titles
+
+
+def age_state(channel_dir, seconds):
+    """Recua as datas de consulta do estado salvo, como se ``seconds`` tivessem passado."""
+    path = channel_dir / STATE_FILENAME
+    data = json.loads(path.read_text(encoding="utf-8"))
+    for key in ("fetchedAt", "missing"):
+        data[key] = {vid: t - seconds for vid, t in data[key].items()}
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_etag_header_matches_body(fake_api):
+    server = fake_api(playlists=1, videos=10)
+    playlist_id = next(iter(server.api.world.playlists))
+    url = (f"{server.url}/youtube/v3/playlistItems?key=x&part=contentDetails&playlistId={playlist_id}"
+           f"&fields={scraper.PLAYLIST_ITEMS_FIELDS}")
+    with urlopen(url) as resp:
+        etag = json.loads(resp.read())["etag"]
+        assert resp.headers["ETag"] == f'"{etag}"'
+    try:
+        urlopen(Request(url, headers={"If-None-Match": etag}))
+        raise AssertionError("expected 304")
+    except Exception as e:
+        assert getattr(e, "code", None) == 304
+
+
+def test_second_incremental_run_is_revalidated(fake_api):
+    server = fake_api(playlists=3, videos=120, shared=0.0, private=0.0, deleted=0.0)
+    scrape()
+    assert api_stats(server)["playlistItems"] == PAGES
+    assert api_stats(server)["videos"] == BATCHES
+    assert api_stats(server, "notModified") == {}
+
+    # Nada mudou: toda página volta 304 e nenhum vídeo é consultado de novo
+    reset_stats(server)
+    scrape()
+    assert api_stats(server)["playlistItems"] == PAGES
+    assert api_stats(server, "notModified") == {"playlistItems": PAGES}
+    assert "videos" not in api_stats(server)
+
+    # Um vídeo (já conhecido) a mais numa playlist muda as 3 páginas dela, que trazem o total de itens
+    world = server.api.world
+    first, second = world.channels[next(iter(world.channels))]["playlistIds"][:2]
+    world.items[first].append(world.items[second][0])
+    reset_stats(server)
+    scrape()
+    assert api_stats(server)["playlistItems"] == PAGES
+    assert api_stats(server, "notModified") == {"playlistItems": PAGES - 3}
+    assert "videos" not in api_stats(server)
+
+
+def test_expired_state_fetches_videos_again(fake_api, tmp_path):
+    server = fake_api(playlists=2, videos=60, shared=0.0, private=0.0, deleted=0.0)
+    channel_dir = tmp_path / "playlists" / "benchchannel0"
+    scrape()
+    world = server.api.world
+    playlist = world.channels[next(iter(world.channels))]["playlistIds"][0]
+    edited, removed = world.items[playlist][:2]
+    old_title, removed_title = world.videos[edited]["title"], world.videos[removed]["title"]
+    world.videos[edited]["title"] = "Título editado"
+    world.deleted.add(removed)
+
+    # Dentro do VIDEO_MAX_AGE o estado vale: nada de videos.list, a saída não muda
+    reset_stats(server)
+    scrape()
+    assert "videos" not in api_stats(server)
+    assert {old_title, removed_title} <= output_titles(channel_dir)
+
+    # Vencido, todo vídeo volta a ser consultado e a edição e a remoção chegam à saída
+    age_state(channel_dir, VIDEO_MAX_AGE)
+    reset_stats(server)
+    scrape()
+    assert api_stats(server)["videos"] == math.ceil(2 * 60 / 50)
+    titles = output_titles(channel_dir)
+    assert "Título editado" in titles and old_title not in titles and removed_title not in titles
+
+    # O vídeo removido fica anotado: a próxima execução não o consulta de novo
+    reset_stats(server)
+    scrape()
+    assert "videos" not in api_stats(server)
+    assert json.loads((channel_dir / STATE_FILENAME).read_text(encoding="utf-8"))["missing"].keys() == {removed}
@@ -0,0 +1,42 @@
+"""As linhas levam ``durationSeconds`` desde o parse; cada escritor grava só as suas colunas."""
+import csv
+
+import pytest
+
+import youtube_playlist_scraper as scraper
+from output_writers import CSV_COLUMNS, open_writer
+
+RESPONSE = {"items": [
+    {"id": "a", "snippet": {"title": "A", "description": "x\ny"}, "contentDetails": {"duration": "PT1H2M3S"},
+     "status": {"privacyStatus": "public"}},
+    {"id": "b", "snippet": {"title": "B", "description": ""}, "contentDetails": {"duration": "PT0S"},
+     "status": {"privacyStatus": "public"}},
+]}
+
+
+def rows():
+    meta = scraper.parse_videos_response(RESPONSE)
+    return [scraper.make_row("Canal", "Lista", meta[vid]) for vid in ("a", "b")]
+
+
+def test_rows_carry_duration_seconds():
+    assert [(r["duration"], r["durationSeconds"]) for r in rows()] == [("01:02:03", 3723), ("00:00:00", 0)]
+    # metadados antigos (estado/cache gravados antes de durationSeconds) ainda funcionam
+    legacy = scraper.make_row("Canal", "Lista", {"title": "C", "description": "", "duration": "00:01:05"})
+    assert legacy["durationSeconds"] == 65
+
+
+def test_csv_keeps_its_columns(tmp_path):
+    with open_writer(tmp_path / "out.csv", sep=";") as writer:
+        writer.write_rows(rows())
+    with open(tmp_path / "out.csv", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f, delimiter=";")
+        assert reader.fieldnames == CSV_COLUMNS
+        assert [r["duration"] for r in reader] == ["01:02:03", "00:00:00"]
+
+
+def test_parquet_writes_duration_seconds(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    with open_writer(tmp_path / "out.parquet") as writer:
+        writer.write_rows(rows())
+    assert pq.read_table(tmp_path / "out.parquet").column("durationSeconds").to_pylist() == [3723, 0]
@@ -0,0 +1,63 @@
+"""Os motores threads e pipeline mantêm um número limitado de lotes de videos.list em andamento."""
+import threading
+import time
+
+import youtube_playlist_scraper as scraper
+
+WORKERS = 2
+WINDOW = WORKERS * scraper.PREFETCH_PER_WORKER
+
+
+class CountingPool(scraper.ThreadPoolExecutor):
+    """Conta os lotes de videos.list submetidos (em andamento ou prontos, ainda não consumidos)."""
+
+    submitted = 0
+    lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs):
+        if fn is scraper.fetch_metadata_batch:
+            with CountingPool.lock:
+                CountingPool.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+def slow_metadata(monkeypatch):
+    """videos.list mais lento que a paginação, o caso em que lotes se acumulariam sem limite."""
+    fetch = scraper.fetch_metadata_batch
+
+    def slow(*args, **kwargs):
+        time.sleep(0.15)
+        return fetch(*args, **kwargs)
+
+    monkeypatch.setattr(scraper, "fetch_metadata_batch", slow)
+    monkeypatch.setattr(scraper, "ThreadPoolExecutor", CountingPool)
+    CountingPool.submitted = 0
+
+
+def test_threads_engine_bounds_batches_in_flight(fake_api, monkeypatch):
+    # Sem vídeos repetidos, cada playlist de 50 itens vira exatamente um lote
+    fake_api(playlists=12, videos=50, shared=0.0)
+    session = scraper.YouTubeSession("x")
+    playlists = session.playlists(session.channel_id("@benchchannel0"))
+    slow_metadata(monkeypatch)
+
+    consumed = 0
+    for pl, ids, meta in scraper.iter_fetched_playlists(session, playlists, workers=WORKERS):
+        consumed += 1
+        assert CountingPool.submitted - consumed <= WINDOW
+        assert set(meta) <= set(ids)
+    assert consumed == 12 and CountingPool.submitted == 12
+
+
+def test_pipeline_bounds_batches_in_flight(fake_api, monkeypatch):
+    fake_api(playlists=1, videos=600, shared=0.0)
+    session = scraper.YouTubeSession("x")
+    playlist = session.playlists(session.channel_id("@benchchannel0"))[0]
+    slow_metadata(monkeypatch)
+
+    consumed = 0
+    for pl, batches in scraper.iter_pipelined_playlists(session, [playlist], WORKERS):
+        for chunk, meta in batches:
+            consumed += 1
+            assert CountingPool.submitted - consumed <= WINDOW
+    assert consumed == 12 and CountingPool.submitted == 12
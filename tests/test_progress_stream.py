@@ -0,0 +1,47 @@
+"""/progress/stream/<job_id>: eventos SSE com o estado do job até ele terminar."""
+import json
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client(fake_api, monkeypatch):
+    fake_api(channels=1, playlists=3, videos=20)
+    monkeypatch.setattr(app, "_session", None)
+    monkeypatch.setattr(app, "jobs", app.JobManager(max_workers=1))
+    monkeypatch.setattr(app, "PROGRESS_STREAM_INTERVAL", 0.01)
+    return app.app.test_client()
+
+
+def events(response):
+    """Estados enviados no stream (comentários de keep-alive ficam de fora)."""
+    body = b"".join(response.response).decode("utf-8")
+    return [json.loads(block[len("data: "):]) for block in body.split("\n\n") if block.startswith("data: ")]
+
+
+def test_stream_ends_with_the_finished_job(client):
+    job_id = client.post("/download", json={"channel": "@benchchannel0"}).get_json()["job_id"]
+    response = client.get(f"/progress/stream/{job_id}")
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+
+    states = events(response)
+    assert states and all(s["job_id"] == job_id for s in states)
+    assert [s["progress"] for s in states] == sorted(s["progress"] for s in states)
+    last = states[-1]
+    assert last["finished_at"] is not None and last["status"] == "completed"
+    assert last == client.get(f"/progress/{job_id}").get_json()
+
+
+def test_stream_of_a_finished_job_sends_one_event(client):
+    job_id = client.post("/download", json={"channel": "@benchchannel0"}).get_json()["job_id"]
+    b"".join(client.get(f"/progress/stream/{job_id}").response)
+
+    [state] = events(client.get(f"/progress/stream/{job_id}"))
+    assert state["status"] == "completed"
+
+
+def test_stream_of_an_unknown_job(client):
+    assert client.get("/progress/stream/nope").status_code == 404
@@ -0,0 +1,64 @@
+"""Agendador de quota: erros do httpx (backend assíncrono) também são repetidos, e a projeção conta a resolução do canal."""
+import sys
+import types
+
+import pytest
+
+import youtube_playlist_scraper as scraper
+from quota import CHANNEL_RESOLUTION_UNITS, get_scheduler, is_transient, project_channel_quota, retry_after
+
+
+@pytest.fixture
+def httpx(monkeypatch):
+    """Só as classes de erro do httpx, que não é dependência obrigatória."""
+    module = types.ModuleType("httpx")
+
+    class TransportError(Exception):
+        pass
+
+    class ConnectError(TransportError):
+        pass
+
+    class HTTPStatusError(Exception):
+        def __init__(self, status, headers=None):
+            super().__init__(f"HTTP {status}")
+            self.response = types.SimpleNamespace(status_code=status, headers=headers or {})
+
+    module.TransportError, module.ConnectError, module.HTTPStatusError = TransportError, ConnectError, HTTPStatusError
+    monkeypatch.setitem(sys.modules, "httpx", module)
+    return module
+
+
+def test_httpx_errors_are_transient(httpx):
+    assert is_transient(httpx.ConnectError("refused"))
+    assert is_transient(httpx.HTTPStatusError(503))
+    assert is_transient(httpx.HTTPStatusError(429, {"retry-after": "2"}))
+    assert not is_transient(httpx.HTTPStatusError(404))
+    assert retry_after(httpx.HTTPStatusError(429, {"retry-after": "2"})) == 2.0
+
+
+def test_without_httpx_loaded(monkeypatch):
+    monkeypatch.delitem(sys.modules, "httpx", raising=False)
+    assert not is_transient(ValueError("x"))
+    assert is_transient(TimeoutError())
+
+
+@pytest.mark.parametrize("ref, method", [("@benchchannel0", "forHandle"), ("benchchannel0", "forHandle"), ("UC{id}", "id")])
+def test_projection_counts_how_the_channel_was_resolved(fake_api, capsys, ref, method):
+    server = fake_api(playlists=2, videos=60)
+    channel_id = next(iter(server.api.world.channels))
+    ref = ref.replace("UC{id}", channel_id)
+    session = scraper.YouTubeSession("x")
+    scraper.main(channel=ref, session=session)
+
+    assert session.resolution_method(ref) == method
+    counts = [pl["itemCount"] for pl in session.playlists(channel_id)]
+    projected = project_channel_quota(counts, resolve_method=method)
+    assert f"Quota projetada: ~{projected} unidades" in capsys.readouterr().out
+    units = get_scheduler().report()["units"]
+    assert units["playlistItems"] + units["videos"] + CHANNEL_RESOLUTION_UNITS[method] <= projected
+
+
+def test_search_fallback_is_the_expensive_resolution():
+    assert project_channel_quota([120, 10], resolve_method="search") - project_channel_quota([120, 10]) == 100
+    assert project_channel_quota([120, 10], resolve_method="forUsername") - project_channel_quota([120, 10]) == 1
@@ -0,0 +1,85 @@
+"""Uma raspagem retomada com --resume produz o mesmo resumo que uma execução sem interrupção."""
+import json
+
+import pytest
+
+import youtube_playlist_scraper as scraper
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_at(monkeypatch, title):
+    """Falha ao montar a primeira linha da playlist ``title``, como uma queda no meio da raspagem."""
+    make_row = scraper.make_row
+
+    def failing(channel_name, playlist_title, info):
+        if playlist_title == title:
+            raise Interrupted()
+        return make_row(channel_name, playlist_title, info)
+
+    monkeypatch.setattr(scraper, "make_row", failing)
+
+
+def summary(path):
+    data = json.loads(path.read_text(encoding="utf-8"))
+    del data["generatedAt"]
+    return data
+
+
+@pytest.mark.parametrize("split", [True, False])
+def test_resumed_summary_covers_every_playlist(fake_api, monkeypatch, tmp_path, split):
+    server = fake_api(playlists=4, videos=30)
+    titles = [pl["title"] for pl in server.api.world.playlists.values()]
+    channel_dir = tmp_path / "playlists" / "benchchannel0"
+    summary_file = channel_dir / ("summary.json" if split else "playlists.summary.json")
+
+    scraper.main(channel="@benchchannel0", split_by_playlist=split, workers=2)
+    expected = summary(summary_file)
+    assert [pl["title"] for pl in expected["channels"][0]["playlists"]] == titles
+
+    for path in channel_dir.iterdir():
+        path.unlink()
+    with monkeypatch.context() as m:
+        interrupt_at(m, titles[2])
+        with pytest.raises(Interrupted):
+            scraper.main(channel="@benchchannel0", split_by_playlist=split, workers=2)
+    assert (channel_dir / ".checkpoint.jsonl").exists()
+
+    scraper.main(channel="@benchchannel0", split_by_playlist=split, workers=2, resume=True)
+    assert not (channel_dir / ".checkpoint.jsonl").exists()
+    assert summary(summary_file) == expected
+
+
+@pytest.mark.parametrize("split", [True, False])
+def test_resume_restarts_when_output_is_gone(fake_api, monkeypatch, tmp_path, capsys, split):
+    server = fake_api(playlists=4, videos=30)
+    titles = [pl["title"] for pl in server.api.world.playlists.values()]
+    channel_dir = tmp_path / "playlists" / "benchchannel0"
+    summary_file = channel_dir / ("summary.json" if split else "playlists.summary.json")
+
+    scraper.main(channel="@benchchannel0", split_by_playlist=split, workers=2)
+    expected = summary(summary_file)
+
+    for path in channel_dir.iterdir():
+        path.unlink()
+    with monkeypatch.context() as m:
+        interrupt_at(m, titles[2])
+        with pytest.raises(Interrupted):
+            scraper.main(channel="@benchchannel0", split_by_playlist=split, workers=2)
+    for path in channel_dir.iterdir():
+        if path.name != ".checkpoint.jsonl":
+            path.unlink()
+
+    capsys.readouterr()
+    scraper.main(channel="@benchchannel0", split_by_playlist=split, workers=2, resume=True)
+    assert "descartando o journal" in capsys.readouterr().out
+    assert summary(summary_file) == expected
+
+
+def test_resume_with_unsupported_options_is_ignored(fake_api, tmp_path, capsys):
+    fake_api(playlists=2, videos=10)
+    scraper.main(channel="@benchchannel0", pipeline=True, resume=True)
+    assert "--resume ignorado" in capsys.readouterr().out
+    assert not (tmp_path / "playlists" / "benchchannel0" / ".checkpoint.jsonl").exists()
@@ -0,0 +1,34 @@
+"""A memória de canais e playlists da YouTubeSession é um LRU limitado e com validade."""
+import youtube_playlist_scraper as scraper
+
+
+def test_memo_drops_least_recently_used():
+    session = scraper.YouTubeSession("x", memo_size=2)
+    calls = []
+
+    def fetch(key):
+        return lambda: calls.append(key) or key.upper()
+
+    assert session._memoized("channel", "a", fetch("a")) == "A"
+    session._memoized("channel", "b", fetch("b"))
+    session._memoized("channel", "a", fetch("a"))   # "a" passa a ser o mais recente
+    session._memoized("channel", "c", fetch("c"))   # sai "b"
+    assert len(session._memo) == 2
+    session._memoized("channel", "a", fetch("a"))
+    session._memoized("channel", "b", fetch("b"))
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_memo_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(scraper.time, "time", lambda: now[0])
+    session = scraper.YouTubeSession("x", memo_ttl=60)
+    calls = []
+    fetch = lambda: calls.append(1) or "UCx"
+
+    session._memoized("channel", "@a", fetch)
+    now[0] += 59
+    session._memoized("channel", "@a", fetch)
+    now[0] += 2
+    session._memoized("channel", "@a", fetch)
+    assert len(calls) == 2
@@ -0,0 +1,22 @@
+"""O resumo de uma playlist avulsa só é gravado ao lado de um arquivo de saída."""
+import csv
+import json
+
+import youtube_playlist_scraper as scraper
+
+
+def test_single_playlist_summary_follows_the_output(fake_api, tmp_path):
+    server = fake_api(playlists=2, videos=10, deleted=0.0, private=0.0)
+    world = server.api.world
+    full, empty = world.channels[next(iter(world.channels))]["playlistIds"]
+    world.deleted.update(world.items[empty])   # nenhum vídeo disponível: nenhuma linha
+    single_dir = tmp_path / "playlists" / "single_playlists"
+
+    scraper.main(playlist_id=full)
+    [output] = single_dir.glob("*.csv")
+    summary = json.loads(scraper.summary_path(output).read_text(encoding="utf-8"))
+    with open(output, encoding="utf-8") as f:
+        assert summary["videos"] == sum(1 for _ in csv.DictReader(f))
+
+    scraper.main(playlist_id=empty)
+    assert sorted(p.name for p in single_dir.iterdir()) == sorted([output.name, scraper.summary_path(output).name])
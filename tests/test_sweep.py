@@ -0,0 +1,98 @@
+"""Daemon de varredura: sondagem barata, raspagem só do que mudou e fila por taxa de mudança."""
+import json
+
+import pytest
+
+import sweep
+from conftest import api_stats, reset_stats
+from quota import get_scheduler
+
+
+@pytest.fixture
+def daemon(fake_api, tmp_path):
+    server = fake_api(channels=2, playlists=2, videos=20)
+    playlist_id = next(iter(server.api.world.playlists))
+    watchlist = tmp_path / "watchlist.txt"
+    watchlist.write_text(f"@benchchannel0\n@benchchannel1\nhttps://www.youtube.com/playlist?list={playlist_id}\n",
+                         encoding="utf-8")
+
+    def new_daemon():
+        """Um daemon novo sobre o mesmo estado, como cada execução de ``--once`` agendada."""
+        return sweep.SweepDaemon("x", watchlist, jobs=2, min_interval=60, max_interval=7 * 86400,
+                                 state_path=tmp_path / "sweep_state.json")
+
+    return server, new_daemon
+
+
+def make_due(d):
+    """Recua a última verificação de todos os alvos no estado salvo para que vençam agora, sem ficarem velhos."""
+    data = json.loads(d.state.path.read_text(encoding="utf-8"))
+    for entry in data["targets"].values():
+        entry["lastCheck"] -= d.max_interval / 2
+    d.state.path.write_text(json.dumps(data), encoding="utf-8")
+
+
+def test_unchanged_targets_are_only_probed(daemon, tmp_path):
+    server, new_daemon = daemon
+    d = new_daemon()
+    d.run(once=True)
+    assert {t: e["lastScrape"] is not None for t, e in d.state.targets.items()} == dict.fromkeys(d.targets, True)
+    assert (tmp_path / "playlists" / "benchchannel0" / "playlists.csv").exists()
+
+    # Vencidos mas iguais: só playlists.list/channels.list, nenhuma página nem videos.list
+    make_due(d)
+    d = new_daemon()
+    reset_stats(server)
+    d.run(once=True)
+    assert set(api_stats(server)) <= {"playlists", "channels"}
+    assert all(e["checks"] == 2 and e["changes"] == 0 for e in d.state.targets.values())
+
+    # Um vídeo a mais numa playlist do canal 0: só ele é raspado de novo
+    world = server.api.world
+    first, second = world.channels[next(iter(world.channels))]["playlistIds"][:2]
+    world.items[first].append(world.items[second][0])
+    make_due(d)
+    d = new_daemon()
+    d.reload_watchlist()
+    reset_stats(server)
+    assert d.check("@benchchannel0") == "alterado"
+    assert d.check("@benchchannel1") == "sem mudanças"
+    assert d.state.entry("@benchchannel0")["changes"] == 1
+    assert api_stats(server)["playlistItems"] >= 1
+
+
+def test_busy_targets_are_checked_more_often(tmp_path):
+    state = sweep.SweepState(tmp_path / "sweep_state.json")
+    now = 0.0
+    for hour in range(1, 49):
+        now = hour * 3600.0
+        state.record("busy", now, changed=True, signature={}, scraped=True, estimated_units=5)
+        state.record("quiet", now, changed=False, signature={}, scraped=False, estimated_units=5)
+    busy, quiet = state.entry("busy"), state.entry("quiet")
+    assert state.change_rate(busy) > 10 * state.change_rate(quiet)
+    assert state.interval(busy, 60, 7 * 86400) < state.interval(quiet, 60, 7 * 86400)
+
+    state.record_error("busy", now, "quota")
+    state.record_error("busy", now, "quota")
+    assert state.interval(busy, 60, 7 * 86400) == 240   # recuo exponencial depois de erros
+
+
+def test_most_overdue_target_goes_first_within_the_budget(daemon):
+    _, new_daemon = daemon
+    d = new_daemon()
+    d.reload_watchlist()
+    channel0, channel1, playlist = d.targets
+    now = 10 * 86400.0
+    for target, age in ((channel0, 1.0), (channel1, 3.0), (playlist, 2.0)):
+        entry = d.state.entry(target)
+        entry["lastCheck"] = now - age * d.state.interval(entry, d.min_interval, d.max_interval)
+        entry["estimatedUnits"] = 10
+    d._queue = [(d.due_at(t), t) for t in d.targets]
+
+    assert d._take_ready(now, slots=2) == [channel1, playlist]
+    assert [t for _, t in d._queue] == [channel0]
+
+    d._queue = [(d.due_at(t), t) for t in d.targets]
+    scheduler = get_scheduler()
+    scheduler.daily_budget = scheduler.used_today + 13   # cabe só um alvo (10 + 2 da sondagem)
+    assert d._take_ready(now, slots=3) == [channel1]
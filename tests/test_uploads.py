@@ -0,0 +1,23 @@
+"""O modo --uploads só pede metadados dos vídeos que não estão em nenhuma playlist."""
+import pytest
+
+import youtube_playlist_scraper as scraper
+from conftest import api_stats, reset_stats
+
+
+def scrape(server, **options):
+    reset_stats(server)
+    scraper.main(channel="@benchchannel0", split_by_playlist=True, workers=2, **options)
+    return api_stats(server)
+
+
+@pytest.mark.parametrize("pipeline", [False, True])
+def test_uploads_only_fetch_metadata_for_unlisted_videos(fake_api, pipeline):
+    # 30 vídeos fora de playlists: cabem num único lote de videos.list
+    server = fake_api(playlists=4, videos=100, unlisted=30, shared=0.1)
+    uploads_pages = -(-len(server.api.world.items["UU" + next(iter(server.api.world.channels))[2:]]) // 50)
+
+    plain = scrape(server, pipeline=pipeline)
+    with_uploads = scrape(server, pipeline=pipeline, uploads=True)
+    assert with_uploads["playlistItems"] == plain["playlistItems"] + uploads_pages
+    assert with_uploads["videos"] <= plain["videos"] + 1
@@ -0,0 +1,61 @@
+"""Banco de vídeos: busca textual (FTS5) com filtros, atualização do índice e o endpoint /search."""
+import pytest
+
+import app
+import youtube_playlist_scraper as scraper
+from video_store import VideoStore
+
+
+@pytest.fixture
+def scraped(fake_api, tmp_path):
+    """Dois canais raspados para o banco, com um título conhecido num vídeo do primeiro."""
+    server = fake_api(channels=2, playlists=2, videos=20, shared=0.0, private=0.0, deleted=0.0)
+    world = server.api.world
+    first_channel = next(iter(world.channels))
+    playlist = world.channels[first_channel]["playlistIds"][0]
+    video = world.items[playlist][0]
+    world.videos[video]["title"] = "Aula de Álgebra Linear"
+    store = VideoStore(tmp_path / "videos.sqlite")
+    for c in range(2):
+        scraper.main(channel=f"@benchchannel{c}", store=store)
+    yield server, store, video, world.playlists[playlist]["title"]
+    store.close()
+
+
+def test_search_matches_titles_without_accents_and_filters(scraped):
+    server, store, video, playlist_title = scraped
+    assert store.counts()["videos"] == 2 * 2 * 20
+    assert store.counts()["channels"] == 2
+
+    [hit] = store.search("algebra linear")
+    assert hit["id"] == video and hit["title"] == "Aula de Álgebra Linear"
+    assert hit["playlists"] == [{"id": hit["playlists"][0]["id"], "title": playlist_title, "channel": "Bench Channel 0"}]
+    assert store.search("algebra", channel="@benchchannel0") == [hit]
+    assert store.search("algebra", channel="Bench Channel 1") == []
+    assert store.search("algebra", playlist=playlist_title) == [hit]
+    assert store.search('algebra "linear') == [hit]  # aspas no texto não quebram a consulta FTS
+
+    assert len(store.search(channel="@benchchannel1", limit=500)) == 2 * 20
+
+
+def test_rescrape_updates_the_index(scraped):
+    server, store, video, _ = scraped
+    server.api.world.videos[video]["title"] = "Aula de Cálculo"
+    scraper.main(channel="@benchchannel0", store=store, use_cache=False)
+    assert store.search("algebra") == []
+    assert [hit["id"] for hit in store.search("calculo")] == [video]
+
+
+def test_search_endpoint(scraped, monkeypatch):
+    _, store, video, _ = scraped
+    monkeypatch.setenv("VIDEO_STORE", str(store.path))
+    monkeypatch.setattr(app, "_video_store", None)
+    client = app.app.test_client()
+
+    body = client.get("/search?q=álgebra&channel=@benchchannel0").get_json()
+    assert body["count"] == 1 and body["results"][0]["id"] == video
+    assert client.get("/search?channel=@benchchannel1&limit=3").get_json()["count"] == 3
+    assert client.get("/search?q=x&limit=muitos").status_code == 400
+
+    monkeypatch.setenv("VIDEO_STORE", "off")
+    assert client.get("/search?q=algebra").status_code == 404
@@ -0,0 +1,198 @@
+"""
+Armazenamento persistente (SQLite) dos vídeos raspados, com busca textual.
+
+As tabelas são normalizadas: canais, playlists, vídeos (cada vídeo guardado uma
+única vez, mesmo que apareça em várias playlists) e a relação playlist → vídeo
+com a posição. Um índice FTS5 sobre título e descrição responde às buscas.
+"""
+from __future__ import annotations
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
+
+from output_writers import duration_seconds
+
+DEFAULT_STORE_PATH = Path(".cache") / "videos.sqlite"
+DEFAULT_SEARCH_LIMIT = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS channels (
+    id      TEXT PRIMARY KEY,
+    title   TEXT NOT NULL,
+    handle  TEXT,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS playlists (
+    id         TEXT PRIMARY KEY,
+    channel_id TEXT REFERENCES channels (id),
+    title      TEXT NOT NULL,
+    updated    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS playlists_channel ON playlists (channel_id);
+CREATE TABLE IF NOT EXISTS videos (
+    id               TEXT PRIMARY KEY,
+    title            TEXT NOT NULL,
+    description      TEXT NOT NULL,
+    duration         TEXT NOT NULL,
+    duration_seconds INTEGER,
+    updated          REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS playlist_items (
+    playlist_id TEXT NOT NULL REFERENCES playlists (id),
+    position    INTEGER NOT NULL,
+    video_id    TEXT NOT NULL REFERENCES videos (id),
+    PRIMARY KEY (playlist_id, position)
+);
+CREATE INDEX IF NOT EXISTS playlist_items_video ON playlist_items (video_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+    title, description, content='videos', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS videos_ai AFTER INSERT ON videos BEGIN
+    INSERT INTO videos_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS videos_ad AFTER DELETE ON videos BEGIN
+    INSERT INTO videos_fts (videos_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS videos_au AFTER UPDATE ON videos BEGIN
+    INSERT INTO videos_fts (videos_fts, rowid, title, description) VALUES ('delete', old.rowid, old.title, old.description);
+    INSERT INTO videos_fts (rowid, title, description) VALUES (new.rowid, new.title, new.description);
+END;
+"""
+
+
+def fts_query(text: str) -> str:
+    """Transforma o texto digitado numa consulta FTS5 segura (todos os termos, entre aspas)."""
+    terms = [t.replace('"', '""') for t in text.split()]
+    return " ".join(f'"{t}"' for t in terms if t)
+
+
+class VideoStore:
+    """Banco de vídeos em SQLite, seguro para uso entre threads."""
+
+    def __init__(self, path: Path = DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ---------- gravação ----------
+    def save_channel(self, channel_id: str, title: str, handle: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO channels (id, title, handle, updated) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET title = excluded.title, "
+                "handle = COALESCE(excluded.handle, channels.handle), updated = excluded.updated",
+                (channel_id, title, handle.lstrip("@") if handle else None, time.time()),
+            )
+
+    def save_videos(self, meta: Dict[str, Dict]) -> None:
+        now = time.time()
+        rows = [
+            (vid, info["title"], info["description"], info["duration"], duration_seconds(info), now)
+            for vid, info in meta.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO videos (id, title, description, duration, duration_seconds, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+                "title = excluded.title, description = excluded.description, duration = excluded.duration, "
+                "duration_seconds = excluded.duration_seconds, updated = excluded.updated "
+                "WHERE videos.title != excluded.title OR videos.description != excluded.description "
+                "OR videos.duration != excluded.duration",
+                rows,
+            )
+
+    def save_playlist(self, playlist_id: str, title: str, channel_id: Optional[str], video_ids: List[str]) -> None:
+        """Substitui a lista de vídeos da playlist numa única transação."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO playlists (id, channel_id, title, updated) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET channel_id = COALESCE(excluded.channel_id, playlists.channel_id), "
+                "title = excluded.title, updated = excluded.updated",
+                (playlist_id, channel_id, title, time.time()),
+            )
+            self._conn.execute("DELETE FROM playlist_items WHERE playlist_id = ?", (playlist_id,))
+            self._conn.executemany(
+                "INSERT INTO playlist_items (playlist_id, position, video_id) VALUES (?, ?, ?)",
+                [(playlist_id, pos, vid) for pos, vid in enumerate(video_ids)],
+            )
+
+    def record_batches(self, channel_id: Optional[str], playlist: Dict,
+                       batches: Iterable[Tuple[List[str], Dict[str, Dict]]]) -> Generator[Tuple[List[str], Dict[str, Dict]], None, None]:
+        """Repassa os lotes (videoIds, metadados) de uma playlist gravando-os no banco.
+
+        Os vídeos são gravados lote a lote; a relação com a playlist só é
+        substituída depois do último lote, para que uma raspagem interrompida
+        não deixe a playlist pela metade.
+        """
+        available = []
+        for chunk, meta in batches:
+            self.save_videos({vid: meta[vid] for vid in chunk if vid in meta})
+            available.extend(vid for vid in chunk if vid in meta)
+            yield chunk, meta
+        self.save_playlist(playlist["id"], playlist["title"], channel_id or playlist.get("channelId"), available)
+
+    # ---------- consulta ----------
+    def search(self, text: str = "", channel: Optional[str] = None, playlist: Optional[str] = None,
+               limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict]:
+        """Busca vídeos por texto (título/descrição), opcionalmente filtrando por canal ou playlist.
+
+        ``channel`` aceita o ID, o título ou o handle; ``playlist`` aceita o ID ou o título.
+        """
+        where, params = [], []
+        if text.strip():
+            source = "videos_fts JOIN videos v ON v.rowid = videos_fts.rowid"
+            where.append("videos_fts MATCH ?")
+            params.append(fts_query(text))
+            order = "bm25(videos_fts)"
+            snippet = "snippet(videos_fts, 1, '[', ']', '…', 12)"
+        else:
+            source = "videos v"
+            order = "v.title"
+            snippet = "NULL"
+        if channel:
+            where.append(
+                "v.id IN (SELECT pi.video_id FROM playlist_items pi JOIN playlists p ON p.id = pi.playlist_id "
+                "JOIN channels c ON c.id = p.channel_id WHERE c.id = ? OR c.title = ? OR c.handle = ?)"
+            )
+            params += [channel, channel, channel.lstrip("@")]
+        if playlist:
+            where.append(
+                "v.id IN (SELECT pi.video_id FROM playlist_items pi JOIN playlists p ON p.id = pi.playlist_id "
+                "WHERE p.id = ? OR p.title = ?)"
+            )
+            params += [playlist, playlist]
+        sql = (
+            f"SELECT v.id, v.title, v.description, v.duration, v.duration_seconds, {snippet} AS snippet "
+            f"FROM {source} {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY {order} LIMIT ?"
+        )
+        with self._lock:
+            videos = [dict(row) for row in self._conn.execute(sql, (*params, limit))]
+            for video in videos:
+                video["playlists"] = [
+                    dict(row) for row in self._conn.execute(
+                        "SELECT p.id, p.title, c.title AS channel FROM playlist_items pi "
+                        "JOIN playlists p ON p.id = pi.playlist_id LEFT JOIN channels c ON c.id = p.channel_id "
+                        "WHERE pi.video_id = ? GROUP BY p.id ORDER BY p.title",
+                        (video["id"],),
+                    )
+                ]
+        return videos
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("channels", "playlists", "videos", "playlist_items")
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -4,43 +4,78 @@ Baixa (playlist, título, descrição, duração) de playlists do YouTube
 usando a YouTube Data API v3 e grava em arquivos CSV.
 """
 from __future__ import annotations
-import argparse, csv, re, sys, time
-from datetime import timedelta
+import argparse, re, sys, time
+import threading
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Generator, List, Dict, Optional, Tuple
-from urllib.parse import urlparse, parse_qs
+from typing import Generator, Iterable, List, Dict, Optional, Tuple
+from urllib.parse import urlparse, parse_qs, unquote
 
-import pandas as pd
-from googleapiclient.discovery import build
-from tqdm import tqdm
-from dateutil import parser as dateparser   # só para converter ISO 8601
+# googleapiclient (~0,2 s de import) só é carregado quando o primeiro cliente é
+# criado; subcomandos como ``query``/``merge`` e o app não pagam por ele na partida
 from dotenv import load_dotenv
 import os
 import queue
 
+from api_cache import configure_cache, get_cache
+from channel_map import get_channel_map
+from checkpoint import Checkpoint
+from output_writers import OUTPUT_FORMATS, FORMAT_EXTENSIONS, duration_seconds, format_for_path, open_writer, output_path
+from metrics import get_metrics, stage
+from quota import configure_scheduler, get_scheduler, project_channel_quota
+from scrape_state import ScrapeState
+from scrape_stats import SUMMARY_FILENAME, PlaylistStats, ScrapeStats, summary_path
+from video_store import DEFAULT_STORE_PATH, DEFAULT_SEARCH_LIMIT, VideoStore
+
 # Load environment variables
 load_dotenv()
 
+DEFAULT_WORKERS = 4
+BACKENDS = ("threads", "async")
+DEFAULT_BACKEND = os.getenv("YOUTUBE_BACKEND", "threads")
+VIDEOS_BATCH_SIZE = 50   # máximo de IDs aceitos por videos.list
+PREFETCH_PER_WORKER = 2  # lotes de videos.list em andamento por worker, à frente de quem consome
+MEMO_MAX_ENTRIES = 1024  # canais/playlists memorizados por sessão; os menos usados saem primeiro
+API_ENDPOINT = os.getenv("YOUTUBE_API_ENDPOINT")   # ex.: o servidor falso de bench/
+UPLOADS_TITLE = "Vídeos fora de playlists"   # título da pseudo-playlist do modo --uploads
+
+# Partial responses (``fields=``): cada wrapper pede só o que de fato lê
+SEARCH_CHANNEL_FIELDS = "items/snippet/channelId"
+CHANNEL_FIELDS = "items/snippet/title"
+CHANNEL_LOOKUP_FIELDS = "items(id,snippet/title)"
+UPLOADS_FIELDS = "items(contentDetails/relatedPlaylists/uploads,statistics/videoCount)"
+PLAYLIST_INFO_FIELDS = "items/snippet(title,channelId)"
+PLAYLISTS_FIELDS = "nextPageToken,items(id,snippet/title,contentDetails/itemCount)"
+PLAYLIST_ITEMS_FIELDS = "etag,nextPageToken,items/contentDetails/videoId"
+VIDEOS_FIELDS = "items(id,snippet(title,description),contentDetails/duration,status/privacyStatus)"
+
 # ---------- helpers ----------
+CHANNEL_ID_RE = re.compile(r'UC[0-9A-Za-z_-]{22}')
 ISO_DUR_RE = re.compile(
     r'P(?:(?P<d>\d+)D)?T?(?:(?P<h>\d+)H)?(?:(?P<m>\d+)M)?(?:(?P<s>\d+)S)?'
 )
 
-def iso_to_hms(iso: str) -> str:
-    """PT1H2M3S -> 01:02:03   /   PT15M -> 00:15:00"""
+def iso_to_seconds(iso: str) -> Optional[int]:
+    """PT1H2M3S -> 3723   /   P1DT2S -> 86402 (None se o formato não for reconhecido)"""
     m = ISO_DUR_RE.fullmatch(iso)
     if not m:
+        return None
+    d, h, m_, s = (int(m.group(g) or 0) for g in ("d", "h", "m", "s"))
+    return ((d * 24 + h) * 60 + m_) * 60 + s
+
+def seconds_to_hms(seconds: Optional[int]) -> str:
+    """3723 -> 01:02:03   /   900 -> 00:15:00"""
+    if seconds is None:
         return ""
-    h = int(m.group("h") or 0)
-    m_ = int(m.group("m") or 0)
-    s = int(m.group("s") or 0)
-    d = int(m.group("d") or 0)
-    total = timedelta(days=d, hours=h, minutes=m_, seconds=s)
-    hh, rem = divmod(total.seconds, 3600)
+    hh, rem = divmod(seconds, 3600)
     mm, ss = divmod(rem, 60)
-    hh += total.days * 24
     return f"{hh:02}:{mm:02}:{ss:02}"
 
+def iso_to_hms(iso: str) -> str:
+    """PT1H2M3S -> 01:02:03   /   PT15M -> 00:15:00"""
+    return seconds_to_hms(iso_to_seconds(iso))
+
 def extract_playlist_id(url: str) -> Optional[str]:
     """Extrai o ID da playlist de uma URL do YouTube."""
     if not url.startswith(('http://', 'https://')):
@@ -61,13 +96,133 @@ def extract_playlist_id(url: str) -> Optional[str]:
         
     return playlist_id
 
+def parse_channel_ref(channel: str) -> Tuple[str, str]:
+    """Classifica a referência de canal em (tipo, valor).
+
+    Tipos: 'id' (UC...), 'handle' (@nome), 'username' (youtube.com/user/...),
+    'custom' (youtube.com/c/... ou youtube.com/nome) e 'name' (texto solto).
+    """
+    ref = channel.strip()
+    if ref.startswith(('http://', 'https://')):
+        parsed = urlparse(ref)
+        if parsed.netloc not in ('www.youtube.com', 'youtube.com', 'm.youtube.com'):
+            raise Exception("URL inválida: deve ser uma URL do YouTube")
+        parts = [unquote(p) for p in parsed.path.split('/') if p]
+        if not parts:
+            raise Exception(f"URL de canal inválida: {channel}")
+        if parts[0].startswith('@'):
+            return "handle", parts[0][1:]
+        if len(parts) > 1 and parts[0] in ('channel', 'user', 'c'):
+            kind = {"channel": "id", "user": "username", "c": "custom"}[parts[0]]
+            return kind, parts[1]
+        return "custom", parts[0]
+    if CHANNEL_ID_RE.fullmatch(ref):
+        return "id", ref
+    if ref.startswith('@'):
+        return "handle", ref[1:]
+    return "name", ref
+
+def channel_ref_key(channel: str) -> str:
+    """Forma normalizada da referência, sem consultar a API: o ID, ou 'tipo:valor' em minúsculas."""
+    kind, value = parse_channel_ref(channel)
+    return value if kind == "id" else f"{kind}:{value.lower()}"
+
+def channel_dir_name(channel: str) -> str:
+    """Nome da pasta de saída do canal: o handle, ID ou nome, sem o '@' nem a URL."""
+    _, value = parse_channel_ref(channel)
+    return "".join(c for c in value if c.isalnum() or c in ('.', '-', '_')) or "channel"
+
 # ---------- API wrappers ----------
+def api_call(youtube, resource: str, **params) -> Dict:
+    """Executa ``youtube.<resource>().list(**params)`` passando pelo cache em disco.
+
+    Só as requisições que chegam à API passam pelo agendador de quota.
+    """
+    cache = get_cache()
+    if cache is not None:
+        cached = cache.get(resource, params)
+        if cached is not None:
+            get_metrics().record_cache_hit(resource)
+            return cached
+    request = count_bytes_in(getattr(youtube, resource)().list(**params), resource)
+    resp = get_scheduler().execute(resource, lambda: get_metrics().timed_call(resource, request.execute))
+    if cache is not None:
+        cache.put(resource, params, resp)
+    return resp
+
+def count_bytes_in(request, resource: str):
+    """Contabiliza no agendador o tamanho do corpo de cada resposta recebida.
+
+    O cliente já negocia gzip (``accept-encoding`` e ``(gzip)`` no user-agent);
+    o valor contado é o JSON descomprimido, ou seja, o que de fato é parseado.
+    """
+    postproc = request.postproc
+
+    def counted(resp, content):
+        get_scheduler().record_bytes(resource, len(content))
+        return postproc(resp, content)
+
+    request.postproc = counted
+    return request
+
+def api_call_conditional(youtube, resource: str, etag: Optional[str], **params) -> Optional[Dict]:
+    """Requisição condicional (If-None-Match) sem cache; devolve None se nada mudou (HTTP 304)."""
+    request = count_bytes_in(getattr(youtube, resource)().list(**params), resource)
+    if etag:
+        request.headers["If-None-Match"] = etag
+
+    def attempt():
+        from googleapiclient.errors import HttpError   # já carregado junto com o cliente
+        try:
+            return request.execute()
+        except HttpError as e:
+            if e.resp.status == 304:
+                return None
+            raise
+
+    return get_scheduler().execute(resource, lambda: get_metrics().timed_call(resource, attempt))
+
+def lookup_channel(youtube, **params) -> Optional[Dict]:
+    """channels.list por forHandle/forUsername (1 unidade): {"id", "title"} ou None."""
+    resp = api_call(youtube, "channels", part="id,snippet", fields=CHANNEL_LOOKUP_FIELDS, **params)
+    items = resp.get("items", [])
+    if not items:
+        return None
+    return {"id": items[0]["id"], "title": items[0]["snippet"]["title"]}
+
+def resolve_channel(youtube, channel: str) -> Dict:
+    """Resolve a referência de canal em {"id", "title" (se já veio), "method"}.
+
+    IDs e URLs /channel/ não custam nada; handles e nomes de usuário são
+    consultados em channels.list (1 unidade). O search.list (100 unidades, e
+    que pode devolver um canal parecido) fica só para nomes soltos e URLs
+    personalizadas (/c/...) que nenhuma consulta direta encontra.
+    """
+    kind, value = parse_channel_ref(channel)
+    if kind == "id":
+        return {"id": value, "method": "id"}
+    lookups = {"handle": ("forHandle",), "username": ("forUsername",), "custom": ("forUsername",),
+               "name": ("forHandle", "forUsername")}[kind]
+    try:
+        for param in lookups:
+            found = lookup_channel(youtube, **{param: value})
+            if found:
+                return {**found, "method": param}
+    except Exception as e:
+        if "quotaExceeded" in str(e):
+            raise Exception("Limite de requisições da API excedido. Tente novamente mais tarde.")
+        raise Exception(f"Erro ao buscar canal: {str(e)}")
+    if kind == "handle":
+        raise Exception(f"Canal não encontrado: {channel}")
+    return {"id": get_channel_id(youtube, value), "method": "search"}
+
 def get_channel_id(youtube, handle: str) -> str:
-    """Pesquisa o handle e devolve o channelId."""
+    """Pesquisa o handle (search.list, 100 unidades) e devolve o channelId."""
     try:
-        resp = youtube.search().list(
-            q=handle, type="channel", part="snippet", maxResults=1
-        ).execute()
+        resp = api_call(
+            youtube, "search", q=handle, type="channel", part="snippet", maxResults=1,
+            fields=SEARCH_CHANNEL_FIELDS,
+        )
         items = resp.get("items", [])
         if not items:
             raise Exception(f"Canal não encontrado: {handle}")
@@ -83,10 +238,12 @@ def get_channel_id(youtube, handle: str) -> str:
 def get_playlist_info(youtube, playlist_id: str) -> Dict:
     """Obtém informações básicas de uma playlist."""
     try:
-        resp = youtube.playlists().list(
+        resp = api_call(
+            youtube, "playlists",
             id=playlist_id,
-            part="snippet"
-        ).execute()
+            part="snippet",
+            fields=PLAYLIST_INFO_FIELDS,
+        )
         items = resp.get("items", [])
         if not items:
             raise Exception("Playlist não encontrada")
@@ -107,61 +264,136 @@ def iter_playlists(youtube, channel_id: str) -> Generator[Dict, None, None]:
     """Itera sobre todas as playlists públicas do canal."""
     next_token = None
     while True:
-        resp = youtube.playlists().list(
+        resp = api_call(
+            youtube, "playlists",
             channelId=channel_id,
-            part="id,snippet",
+            part="snippet,contentDetails",
             maxResults=50,
             pageToken=next_token,
-        ).execute()
+            fields=PLAYLISTS_FIELDS,
+        )
         for pl in resp["items"]:
-            yield {"id": pl["id"], "title": pl["snippet"]["title"]}
+            yield {
+                "id": pl["id"],
+                "title": pl["snippet"]["title"],
+                "itemCount": pl.get("contentDetails", {}).get("itemCount", 0),
+            }
         next_token = resp.get("nextPageToken")
         if not next_token:
             break
 
-def iter_videos_in_playlist(youtube, playlist_id: str) -> List[str]:
-    """Retorna todos os videoIds de uma playlist."""
+@stage("items")
+def iter_videos_in_playlist(youtube, playlist_id: str, checkpoint: Checkpoint = None) -> List[str]:
+    """Retorna todos os videoIds de uma playlist.
+
+    Com ``checkpoint``, retoma do último pageToken registrado e registra cada página nova.
+    """
     ids = []
     next_token = None
+    if checkpoint is not None:
+        ids, next_token, done = checkpoint.resume_items(playlist_id)
+        if done:
+            return ids
+        if ids and not next_token:  # última página já registrada
+            checkpoint.record_items_done(playlist_id)
+            return ids
     while True:
-        resp = youtube.playlistItems().list(
+        resp = api_call(
+            youtube, "playlistItems",
             playlistId=playlist_id,
             part="contentDetails",
             maxResults=50,
             pageToken=next_token,
-        ).execute()
-        ids.extend(item["contentDetails"]["videoId"] for item in resp["items"])
-        next_token = resp.get("nextPageToken")
+            fields=PLAYLIST_ITEMS_FIELDS,
+        )
+        page_ids = [item["contentDetails"]["videoId"] for item in resp["items"]]
+        ids.extend(page_ids)
+        page_token, next_token = next_token, resp.get("nextPageToken")
+        if checkpoint is not None:
+            checkpoint.record_page(playlist_id, page_token, page_ids, next_token)
         if not next_token:
             break
+    if checkpoint is not None:
+        checkpoint.record_items_done(playlist_id)
     return ids
 
+@stage("items")
+def iter_videos_in_playlist_incremental(youtube, playlist_id: str, previous_pages: List[Dict]) -> Tuple[List[str], List[Dict], bool]:
+    """Como iter_videos_in_playlist, mas revalida cada página pelo ETag da execução anterior.
+
+    Devolve (videoIds, páginas para o próximo estado, houve mudança).
+    """
+    known = {page["pageToken"]: page for page in previous_pages}
+    ids, pages = [], []
+    changed = len(previous_pages) == 0
+    next_token = None
+    while True:
+        old = known.get(next_token)
+        resp = api_call_conditional(
+            youtube, "playlistItems", old["etag"] if old else None,
+            playlistId=playlist_id,
+            part="contentDetails",
+            maxResults=50,
+            pageToken=next_token,
+            fields=PLAYLIST_ITEMS_FIELDS,
+        )
+        if resp is None:  # 304: página idêntica à anterior
+            page = old
+        else:
+            page = {
+                "pageToken": next_token,
+                "etag": resp.get("etag"),
+                "ids": [item["contentDetails"]["videoId"] for item in resp["items"]],
+                "next": resp.get("nextPageToken"),
+            }
+            changed = True
+        pages.append(page)
+        ids.extend(page["ids"])
+        next_token = page["next"]
+        if not next_token:
+            break
+    if len(pages) != len(previous_pages):
+        changed = True
+    return ids, pages, changed
+
+@stage("metadata")
 def get_videos_metadata(youtube, video_ids: List[str]) -> Dict[str, Dict]:
     """Chama videos.list em lotes (máx 50 por requisição)."""
     meta = {}
-    for i in range(0, len(video_ids), 50):
-        chunk = video_ids[i : i + 50]
-        resp = youtube.videos().list(
-            id=",".join(chunk), part="snippet,contentDetails,status"
-        ).execute()
-        for item in resp["items"]:
-            vid = item["id"]
-            # Skip if video is unavailable or private
-            if item.get("status", {}).get("privacyStatus") != "public":
-                continue
-            meta[vid] = {
-                "title": item["snippet"]["title"],
-                "description": item["snippet"]["description"].replace("\n", " ").strip(),
-                "duration": iso_to_hms(item["contentDetails"]["duration"]),
-            }
+    for i in range(0, len(video_ids), VIDEOS_BATCH_SIZE):
+        chunk = video_ids[i : i + VIDEOS_BATCH_SIZE]
+        resp = api_call(
+            youtube, "videos", id=",".join(chunk), part="snippet,contentDetails,status",
+            fields=VIDEOS_FIELDS,
+        )
+        meta.update(parse_videos_response(resp))
+    return meta
+
+def parse_videos_response(resp: Dict) -> Dict[str, Dict]:
+    """Extrai os metadados dos vídeos públicos de uma resposta de videos.list."""
+    meta = {}
+    for item in resp["items"]:
+        vid = item["id"]
+        # Skip if video is unavailable or private
+        if item.get("status", {}).get("privacyStatus") != "public":
+            continue
+        seconds = iso_to_seconds(item["contentDetails"]["duration"])
+        meta[vid] = {
+            "title": item["snippet"]["title"],
+            "description": item["snippet"]["description"].replace("\n", " ").strip(),
+            "duration": seconds_to_hms(seconds),
+            "durationSeconds": seconds,   # vai para as linhas, as estatísticas e o banco sem reconverter o HH:MM:SS
+        }
     return meta
 
 def get_channel_info(youtube, channel_id: str) -> Dict:
     """Obtém informações do canal."""
-    resp = youtube.channels().list(
+    resp = api_call(
+        youtube, "channels",
         id=channel_id,
-        part="snippet"
-    ).execute()
+        part="snippet",
+        fields=CHANNEL_FIELDS,
+    )
     items = resp.get("items", [])
     if not items:
         return {"title": "Unknown Channel"}
@@ -169,74 +401,480 @@ def get_channel_info(youtube, channel_id: str) -> Dict:
         "title": items[0]["snippet"]["title"]
     }
 
-def process_playlist(youtube, playlist: Dict, split_by_playlist: bool, channel_dir: Path, channel_name: str = None, return_data: bool = False, progress_queue: queue.Queue = None) -> List[Dict]:
-    """Processa uma única playlist e salva os dados."""
+def get_uploads_playlist(youtube, channel_id: str) -> Dict:
+    """Playlist de uploads do canal (todos os vídeos enviados), como pseudo-playlist."""
+    resp = api_call(
+        youtube, "channels",
+        id=channel_id,
+        part="contentDetails,statistics",
+        fields=UPLOADS_FIELDS,
+    )
+    items = resp.get("items", [])
+    if not items:
+        raise Exception(f"Canal não encontrado: {channel_id}")
+    return {
+        "id": items[0]["contentDetails"]["relatedPlaylists"]["uploads"],
+        "title": UPLOADS_TITLE,
+        "itemCount": int(items[0].get("statistics", {}).get("videoCount", 0)),
+    }
+
+# ---------- session ----------
+def build_client(api_key: str):
+    """Cria um cliente da YouTube Data API v3."""
+    from googleapiclient.discovery import build
+    client_options = {"api_endpoint": API_ENDPOINT} if API_ENDPOINT else None
+    return build("youtube", "v3", developerKey=api_key, cache_discovery=False,
+                 static_discovery=True, client_options=client_options)
+
+class YouTubeSession:
+    """Estado compartilhado entre as chamadas de uma mesma chave de API.
+
+    Mantém um cliente por thread (o httplib2 não é thread-safe; cada cliente
+    reaproveita as conexões keep-alive do seu ``Http``) e memoriza as
+    resoluções de canal e as informações de canais e playlists, de modo que
+    várias raspagens seguidas só paguem pelas chamadas de playlistItems e videos.
+    A memória é um LRU de até ``memo_size`` entradas, cada uma válida por
+    ``memo_ttl`` segundos (``None``: até sair do LRU).
+    """
+
+    def __init__(self, api_key: str, memo_ttl: Optional[float] = None, memo_size: int = MEMO_MAX_ENTRIES):
+        self.api_key = api_key
+        self.memo_ttl = memo_ttl
+        self.memo_size = max(1, memo_size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._memo: "OrderedDict[Tuple[str, str], Tuple[float, object]]" = OrderedDict()
+
+    @property
+    def client(self):
+        """Cliente da thread atual, criado na primeira vez que é pedido."""
+        youtube = getattr(self._local, "youtube", None)
+        if youtube is None:
+            youtube = self._local.youtube = build_client(self.api_key)
+        return youtube
+
+    def _memoized(self, kind: str, key: str, fetch):
+        now = time.time()
+        with self._lock:
+            hit = self._memo.get((kind, key))
+            if hit is not None:
+                if self.memo_ttl is None or now - hit[0] < self.memo_ttl:
+                    self._memo.move_to_end((kind, key))
+                    return hit[1]
+                del self._memo[(kind, key)]
+        value = fetch()
+        self.remember(kind, key, value)
+        return value
+
+    def remember(self, kind: str, key: str, value) -> None:
+        with self._lock:
+            self._memo[(kind, key)] = (time.time(), value)
+            self._memo.move_to_end((kind, key))
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def channel_id(self, channel: str) -> str:
+        return self._memoized("channel_id", channel, lambda: self._resolve_channel(channel))
+
+    def _resolve_channel(self, channel: str) -> str:
+        """Resolve o canal consultando antes o mapa persistente (válido entre execuções e processos)."""
+        ref = channel_ref_key(channel)
+        if CHANNEL_ID_RE.fullmatch(ref):
+            self.remember("channel_method", ref, "id")
+            return ref
+        channel_map = get_channel_map()
+        channel_id = channel_map.get(ref) if channel_map else None
+        if channel_id:
+            self.remember("channel_method", ref, "map")
+            return channel_id
+        found = resolve_channel(self.client, channel)
+        self.remember("channel_method", ref, found["method"])
+        if found.get("title"):
+            self.remember("channel_info", found["id"], {"title": found["title"]})
+        if channel_map:
+            channel_map.put(ref, found["id"], found["method"])
+        return found["id"]
+
+    def resolution_method(self, channel: str) -> Optional[str]:
+        """Como ``channel`` foi resolvido ("id", "map", "forHandle", "forUsername" ou "search"); None se não foi."""
+        with self._lock:
+            hit = self._memo.get(("channel_method", channel_ref_key(channel)))
+        return hit[1] if hit is not None else None
+
+    def channel_info(self, channel_id: str) -> Dict:
+        return self._memoized("channel_info", channel_id, lambda: get_channel_info(self.client, channel_id))
+
+    def uploads_playlist(self, channel_id: str) -> Dict:
+        return self._memoized("uploads", channel_id, lambda: get_uploads_playlist(self.client, channel_id))
+
+    def playlist_info(self, playlist_id: str) -> Dict:
+        return self._memoized("playlist_info", playlist_id, lambda: get_playlist_info(self.client, playlist_id))
+
+    def playlists(self, channel_id: str) -> List[Dict]:
+        """Lista as playlists do canal e já memoriza as informações de cada uma."""
+        def fetch():
+            with stage("listing"):
+                playlists = list(iter_playlists(self.client, channel_id))
+            for pl in playlists:
+                self.remember("playlist_info", pl["id"], {"id": pl["id"], "title": pl["title"], "channelId": channel_id})
+            return playlists
+        return self._memoized("playlists", channel_id, fetch)
+
+# ---------- concurrent engine ----------
+def fetch_playlist_items(session: YouTubeSession, playlist: Dict, checkpoint: Checkpoint = None) -> List[str]:
+    """Busca os videoIds de uma playlist com o cliente da thread."""
+    return iter_videos_in_playlist(session.client, playlist["id"], checkpoint)
+
+def fetch_metadata_batch(session: YouTubeSession, video_ids: List[str], checkpoint: Checkpoint = None) -> Dict[str, Dict]:
+    """Busca os metadados de um lote de até 50 vídeos com o cliente da thread."""
+    meta = get_videos_metadata(session.client, video_ids)
+    if checkpoint is not None:
+        checkpoint.record_meta(video_ids, meta)
+    return meta
+
+def pack_video_batches(playlist_ids: List[List[str]]) -> Tuple[List[List[str]], Dict[str, int]]:
+    """Deduplica os videoIds de todas as playlists e os agrupa em lotes cheios.
+
+    Devolve os lotes (na ordem em que os vídeos aparecem) e o índice do lote de cada vídeo.
+    """
+    unique = list(dict.fromkeys(vid for ids in playlist_ids for vid in ids))
+    batches = [unique[i : i + VIDEOS_BATCH_SIZE] for i in range(0, len(unique), VIDEOS_BATCH_SIZE)]
+    batch_of = {vid: i // VIDEOS_BATCH_SIZE for i, vid in enumerate(unique)}
+    return batches, batch_of
+
+def drop_listed_uploads(playlists: List[Dict], playlist_ids: List[List[str]], uploads_id: Optional[str]) -> List[List[str]]:
+    """Reduz os IDs da playlist de uploads (a última) aos vídeos que não estão em nenhuma outra.
+
+    Aplicado antes de montar os lotes de videos.list, para que os uploads só
+    custem metadados dos vídeos fora de playlists.
+    """
+    if uploads_id is None or not playlists or playlists[-1]["id"] != uploads_id:
+        return playlist_ids
+    listed = {vid for ids in playlist_ids[:-1] for vid in ids}
+    return playlist_ids[:-1] + [[vid for vid in playlist_ids[-1] if vid not in listed]]
+
+def iter_fetched_playlists(session: YouTubeSession, playlists: List[Dict], workers: int = DEFAULT_WORKERS, checkpoint: Checkpoint = None, uploads_id: str = None) -> Generator[Tuple[Dict, List[str], Dict[str, Dict]], None, None]:
+    """Busca as playlists de um canal em paralelo e devolve (playlist, ids, meta) na ordem original.
+
+    Os itens de todas as playlists são paginados primeiro; depois cada vídeo do canal
+    é consultado uma única vez em lotes cheios de 50 IDs. Só ``workers * PREFETCH_PER_WORKER``
+    lotes ficam em andamento à frente de quem consome, e os metadados compartilhados
+    são descartados assim que a última playlist que os usa é entregue.
+
+    Com ``checkpoint``, playlists já concluídas são devolvidas vazias e os lotes
+    já registrados no journal não são buscados de novo. Com ``uploads_id``, a
+    playlist de uploads é reduzida aos vídeos fora de playlists antes dos lotes.
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    in_flight = deque()   # futures dos lotes ainda não consumidos, na ordem dos lotes
+    try:
+        pending = [pl for pl in playlists if checkpoint is None or not checkpoint.is_done(pl["id"])]
+        item_futures = [pool.submit(fetch_playlist_items, session, pl, checkpoint) for pl in pending]
+        items = {pl["id"]: fut.result() for pl, fut in zip(pending, item_futures)}
+        del item_futures
+        playlist_ids = drop_listed_uploads(playlists, [items.get(pl["id"], []) for pl in playlists], uploads_id)
+
+        meta: Dict[str, Dict] = {}
+        to_fetch = playlist_ids
+        if checkpoint is not None:
+            meta = dict(checkpoint.videos)
+            to_fetch = [[vid for vid in ids if vid not in checkpoint.fetched] for ids in playlist_ids]
+        batches, batch_of = pack_video_batches(to_fetch)
+        last_use = {}
+        for idx, ids in enumerate(playlist_ids):
+            for vid in ids:
+                last_use[vid] = idx
+        max_in_flight = max(1, workers) * PREFETCH_PER_WORKER
+        submitted = resolved = 0
+
+        def refill():
+            nonlocal submitted
+            while submitted < len(batches) and len(in_flight) < max_in_flight:
+                in_flight.append(pool.submit(fetch_metadata_batch, session, batches[submitted], checkpoint))
+                submitted += 1
+
+        for idx, (pl, ids) in enumerate(zip(playlists, playlist_ids)):
+            needed = max((batch_of.get(vid, -1) for vid in ids), default=-1)
+            while resolved <= needed:
+                refill()
+                meta.update(in_flight.popleft().result())
+                resolved += 1
+            refill()   # os próximos lotes andam enquanto esta playlist é gravada
+            yield pl, ids, {vid: meta[vid] for vid in ids if vid in meta}
+            for vid in ids:
+                if last_use.get(vid) == idx:
+                    meta.pop(vid, None)
+    finally:
+        for fut in in_flight:
+            fut.cancel()
+        pool.shutdown(wait=True)
+
+def iter_pipelined_batches(session: YouTubeSession, playlist_id: str, pool: ThreadPoolExecutor, max_pending: int = DEFAULT_WORKERS * PREFETCH_PER_WORKER, skip: set = None) -> Generator[Tuple[List[str], Dict[str, Dict]], None, None]:
+    """Pagina a playlist e envia cada página de 50 IDs direto para o videos.list.
+
+    Os lotes de metadados rodam no ``pool`` enquanto a próxima página é buscada,
+    e são devolvidos na ordem da playlist assim que ficam prontos. Com
+    ``max_pending`` lotes ainda não entregues, a paginação espera o mais antigo,
+    então a memória não cresce com o tamanho da playlist. IDs em ``skip`` saem
+    de cada página antes do videos.list.
+    """
+    pending = deque()
+    try:
+        next_token = None
+        while True:
+            with stage("items"):
+                resp = api_call(
+                    session.client, "playlistItems",
+                    playlistId=playlist_id,
+                    part="contentDetails",
+                    maxResults=50,
+                    pageToken=next_token,
+                    fields=PLAYLIST_ITEMS_FIELDS,
+                )
+            chunk = [item["contentDetails"]["videoId"] for item in resp["items"]]
+            if skip:
+                chunk = [vid for vid in chunk if vid not in skip]
+            if chunk:
+                pending.append((chunk, pool.submit(fetch_metadata_batch, session, chunk)))
+            while pending and (pending[0][1].done() or len(pending) >= max_pending):
+                chunk, fut = pending.popleft()
+                yield chunk, fut.result()
+            next_token = resp.get("nextPageToken")
+            if not next_token:
+                break
+        while pending:
+            chunk, fut = pending.popleft()
+            yield chunk, fut.result()
+    finally:
+        for _, fut in pending:
+            fut.cancel()
+
+def iter_pipelined_playlists(session: YouTubeSession, playlists: List[Dict], workers: int, uploads_id: str = None) -> Generator[Tuple[Dict, Iterable], None, None]:
+    """Produz (playlist, lotes) para o modo pipeline, com um pool compartilhado por todas as playlists.
+
+    Com ``uploads_id``, os IDs das playlists são anotados à medida que passam, e
+    a de uploads (a última) só pede metadados dos vídeos que não apareceram nelas.
+    """
+    listed = set()
+    max_pending = max(1, workers) * PREFETCH_PER_WORKER
+
+    def note(batches):
+        for chunk, meta in batches:
+            listed.update(chunk)
+            yield chunk, meta
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for pl in playlists:
+            if uploads_id is None:
+                yield pl, iter_pipelined_batches(session, pl["id"], pool, max_pending)
+            elif pl["id"] == uploads_id:
+                yield pl, iter_pipelined_batches(session, pl["id"], pool, max_pending, skip=listed)
+            else:
+                yield pl, note(iter_pipelined_batches(session, pl["id"], pool, max_pending))
+
+def fetch_incremental_playlists(session: YouTubeSession, playlists: List[Dict], state: ScrapeState, workers: int = DEFAULT_WORKERS) -> List[Tuple[Dict, List[str], Dict[str, Dict]]]:
+    """Versão incremental de iter_fetched_playlists.
+
+    Revalida as páginas de cada playlist com ETags e só chama videos.list para
+    vídeos que ainda não estão no estado salvo ou cuja consulta anterior venceu
+    (``VIDEO_MAX_AGE``), inclusive os que não vieram da última vez. Tudo é
+    resolvido antes do retorno, de modo que ``state.changed`` já indica as
+    playlists alteradas, inclusive as que só tiveram um vídeo editado.
+    """
+    def fetch(pl):
+        return iter_videos_in_playlist_incremental(session.client, pl["id"], state.pages(pl["id"]))
+
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+    futures = []
+    try:
+        futures = [pool.submit(fetch, pl) for pl in playlists]
+        results = [fut.result() for fut in futures]
+        for pl, (ids, pages, changed) in zip(playlists, results):
+            state.update_playlist(pl, pages, ids, changed)
+
+        now = time.time()
+        to_fetch = [[vid for vid in ids if state.needs_fetch(vid, now)] for ids, _, _ in results]
+        batches, _ = pack_video_batches(to_fetch)
+        futures = [pool.submit(fetch_metadata_batch, session, batch) for batch in batches]
+        modified = set()
+        for batch, fut in zip(batches, futures):
+            modified |= state.record_videos(batch, fut.result(), now)
+        if modified:
+            for pl, (ids, _, _) in zip(playlists, results):
+                if not modified.isdisjoint(ids):
+                    state.changed.add(pl["id"])
+    finally:
+        for fut in futures:
+            fut.cancel()
+        pool.shutdown(wait=True)
+
+    return [
+        (pl, ids, {vid: state.videos[vid] for vid in ids if vid in state.videos})
+        for pl, (ids, _, _) in zip(playlists, results)
+    ]
+
+def iter_unlisted_uploads(playlist_batches: Iterable[Tuple[Dict, Iterable]], uploads_id: str) -> Generator[Tuple[Dict, Iterable], None, None]:
+    """Repassa as playlists do canal e reduz a de uploads (a última) aos vídeos que não estão em nenhuma outra.
+
+    Os IDs são anotados à medida que os lotes passam, então funciona com qualquer motor.
+    """
+    listed = set()
+
+    def note(batches):
+        for chunk, meta in batches:
+            listed.update(chunk)
+            yield chunk, meta
+
+    def unlisted(batches):
+        for chunk, meta in batches:
+            chunk = [vid for vid in chunk if vid not in listed]
+            if chunk:
+                yield chunk, meta
+
+    for pl, batches in playlist_batches:
+        yield pl, (unlisted(batches) if pl["id"] == uploads_id else note(batches))
+
+def iter_metadata_batches(youtube, video_ids: List[str]) -> Generator[Tuple[List[str], Dict[str, Dict]], None, None]:
+    """Resolve os metadados lote a lote, devolvendo (videoIds do lote, metadados)."""
+    for i in range(0, len(video_ids), VIDEOS_BATCH_SIZE):
+        chunk = video_ids[i : i + VIDEOS_BATCH_SIZE]
+        yield chunk, get_videos_metadata(youtube, chunk)
+
+def make_row(channel_name: str, playlist_title: str, info: Dict) -> Dict:
+    """Monta uma linha de saída a partir dos metadados de um vídeo.
+
+    ``durationSeconds`` segue junto para as saídas colunares; o CSV o ignora.
+    """
+    return {
+        "channel": channel_name,
+        "playlist": playlist_title,
+        "videoTitle": info["title"],
+        "description": info["description"],
+        "duration": info["duration"],
+        "durationSeconds": duration_seconds(info),
+    }
+
+def playlist_csv_path(channel_dir: Path, title: str, output_format: str = "csv") -> Path:
+    """Caminho do arquivo de uma playlist (CSV por padrão), com o título sanitizado."""
+    safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
+    return channel_dir / f"{safe_title}{FORMAT_EXTENSIONS[output_format]}"
+
+def resume_conflicts(incremental: bool = False, backend: str = "threads", pipeline: bool = False,
+                     uploads: bool = False, output_format: str = "csv") -> List[str]:
+    """Opções que desligam o journal de retomada (--resume só vale sem nenhuma delas)."""
+    conflicts = []
+    if incremental:
+        conflicts.append("--incremental")
+    if backend != "threads":
+        conflicts.append(f"--backend {backend}")
+    if pipeline:
+        conflicts.append("--pipeline")
+    if uploads:
+        conflicts.append("--uploads")
+    if output_format != "csv":
+        conflicts.append(f"--format {output_format}")
+    return conflicts
+
+def resumable_outputs_missing(checkpoint: Checkpoint, channel_dir: Path, split_by_playlist: bool, out_file: Path) -> bool:
+    """Indica se a saída do journal sumiu ou encolheu (então retomar perderia as playlists já concluídas)."""
+    if split_by_playlist:
+        if not checkpoint.done:
+            return False
+        paths = playlist_file_paths(channel_dir, checkpoint.playlists or [], "csv")
+        return any(pid not in paths or not paths[pid].exists() for pid in checkpoint.done)
+    offset = checkpoint.last_offset()
+    if offset is None:
+        return False
+    return not out_file.exists() or out_file.stat().st_size < offset
+
+def playlist_file_paths(channel_dir: Path, playlists: List[Dict], output_format: str = "csv") -> Dict[str, Path]:
+    """Arquivo de cada playlist do canal, por ID.
+
+    Títulos que viram o mesmo nome de arquivo (ex.: "Aula #1" e "Aula 1", ou
+    só diferindo em maiúsculas) levam o ID da playlist no nome, para que uma
+    não sobrescreva a outra.
+    """
+    paths = {pl["id"]: playlist_csv_path(channel_dir, pl["title"], output_format) for pl in playlists}
+    names = Counter(path.name.lower() for path in paths.values())
+    for pl in playlists:
+        if names[paths[pl["id"]].name.lower()] > 1:
+            paths[pl["id"]] = playlist_csv_path(channel_dir, f"{pl['title']} {pl['id']}", output_format)
+    return paths
+
+def process_playlist(youtube, playlist: Dict, split_by_playlist: bool, channel_dir: Path, channel_name: str = None, return_data: bool = False, progress_queue: queue.Queue = None, prefetched: Tuple[List[str], Dict[str, Dict]] = None, batches: Iterable[Tuple[List[str], Dict[str, Dict]]] = None, output_format: str = "csv", stats: PlaylistStats = None, path: Path = None) -> List[Dict]:
+    """Processa uma única playlist e salva os dados.
+
+    ``prefetched`` recebe (videoIds, metadados) já buscados pelo motor concorrente;
+    ``batches`` recebe lotes (videoIds, metadados) que chegam aos poucos, como os
+    do modo pipeline. ``stats`` acumula as estatísticas da playlist na mesma passada.
+    ``path`` substitui o arquivo derivado do título (ver ``playlist_file_paths``).
+    """
     if progress_queue:
         progress_queue.put({"status": "in_progress", "message": f"Processando playlist: {playlist['title']}", "progress": 0})
     
+    total_videos = playlist.get("itemCount", 0)
+    if prefetched is not None:
+        batches = [prefetched]
+        total_videos = len(prefetched[0])
+    elif batches is None:
+        video_ids = iter_videos_in_playlist(youtube, playlist["id"])
+        batches = iter_metadata_batches(youtube, video_ids)
+        total_videos = len(video_ids)
+        
     rows = []
-    video_ids = iter_videos_in_playlist(youtube, playlist["id"])
-    if not video_ids:  # Skip if no videos found
+    # Rows are streamed to disk batch by batch; the file is only created once a valid row exists
+    writer = None if return_data else open_writer(path or playlist_csv_path(channel_dir, playlist["title"], output_format), output_format)
+    skipped = 0
+    processed = 0
+    
+    try:
+        for chunk, meta in batches:
+            batch_rows = []
+            started = time.perf_counter()
+            for vid in chunk:            # preserva a ordem da playlist
+                info = meta.get(vid)
+                if not info:  # Skip if video is unavailable
+                    skipped += 1
+                    continue
+                batch_rows.append(make_row(channel_name or "Unknown Channel", playlist["title"], info))
+                if stats is not None:
+                    stats.add(info)
+                processed += 1
+                if progress_queue and processed % 5 == 0:  # Atualiza a cada 5 vídeos para reduzir o número de mensagens
+                    progress = min(processed / total_videos, 1) * 100 if total_videos else 0
+                    progress_queue.put({
+                        "status": "in_progress",
+                        "message": f"Processando playlist: {playlist['title']} ({processed}/{total_videos} vídeos)",
+                        "progress": progress
+                    })
+            get_metrics().record_stage("rows", time.perf_counter() - started)
+            if writer is not None:
+                writer.write_rows(batch_rows)
+            else:
+                rows.extend(batch_rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    if stats is not None:
+        stats.unavailable += skipped
+    
+    if not processed and not skipped:  # Skip if no videos found
         print(f"⚠️  Playlist '{playlist['title']}' está vazia, pulando...")
         if progress_queue:
             progress_queue.put({"status": "in_progress", "message": f"Playlist vazia: {playlist['title']}", "progress": 100})
         return [] if return_data else None
-        
-    meta = get_videos_metadata(youtube, video_ids)
-    skipped = 0
-    total_videos = len(video_ids)
-    processed = 0
-    
-    for vid in video_ids:            # preserva a ordem da playlist
-        info = meta.get(vid)
-        if not info:  # Skip if video is unavailable
-            skipped += 1
-            continue
-        rows.append({
-            "channel": channel_name or "Unknown Channel",
-            "playlist": playlist["title"],
-            "videoTitle": info["title"],
-            "description": info["description"],
-            "duration": info["duration"],
-        })
-        processed += 1
-        if progress_queue and processed % 5 == 0:  # Atualiza a cada 5 vídeos para reduzir o número de mensagens
-            progress = (processed / total_videos) * 100
-            progress_queue.put({
-                "status": "in_progress",
-                "message": f"Processando playlist: {playlist['title']} ({processed}/{total_videos} vídeos)",
-                "progress": progress
-            })
     
     if skipped > 0:
         print(f"ℹ️  {skipped} vídeo(s) indisponível(is) na playlist '{playlist['title']}'")
     
-    if not rows:  # Skip if no valid data was collected
+    if not processed:  # Skip if no valid data was collected
         print(f"⚠️  Nenhum dado válido encontrado para '{playlist['title']}', pulando...")
         if progress_queue:
             progress_queue.put({"status": "in_progress", "message": f"Nenhum dado válido em: {playlist['title']}", "progress": 100})
         return [] if return_data else None
 
-    if return_data:
-        if progress_queue:
-            progress_queue.put({
-                "status": "in_progress",
-                "message": f"Playlist concluída: {playlist['title']}",
-                "progress": 100
-            })
-        return rows
-        
-    # Generate filename for this playlist (sanitize filename and ensure .csv extension)
-    safe_title = "".join(c for c in playlist['title'] if c.isalnum() or c in (' ', '-', '_')).strip()
-    playlist_filename = channel_dir / f"{safe_title}.csv"
-    
-    # Create directory only if we're saving a file
-    if not return_data:
-        channel_dir.mkdir(exist_ok=True)
-    
-    df = pd.DataFrame(rows, columns=["channel", "playlist", "videoTitle", "description", "duration"])
-    df.to_csv(playlist_filename, index=False, encoding="utf-8", quoting=csv.QUOTE_ALL)
-    print(f"✅ CSV salvo em {playlist_filename.resolve()}  ({len(df)} linhas)")
+    if writer is not None:
+        print(f"✅ Arquivo salvo em {writer.path.resolve()}  ({writer.rows} linhas)")
     
     if progress_queue:
         progress_queue.put({
@@ -244,19 +882,42 @@ def process_playlist(youtube, playlist: Dict, split_by_playlist: bool, channel_d
             "message": f"Playlist concluída: {playlist['title']}",
             "progress": 100
         })
-    return None
+    return rows if return_data else None
 
 # ---------- main ----------
-def main(api_key: str = None, out_file: Path = None, split_by_playlist: bool = False, channel: str = None, playlist_url: str = None, playlist_id: str = None, return_data: bool = False, progress_queue: queue.Queue = None) -> List[Dict]:
+def main(api_key: str = None, out_file: Path = None, split_by_playlist: bool = False, channel: str = None, playlist_url: str = None, playlist_id: str = None, return_data: bool = False, progress_queue: queue.Queue = None, workers: int = DEFAULT_WORKERS, use_cache: bool = True, refresh_cache: bool = False, incremental: bool = False, resume: bool = False, rate: float = None, quota_budget: int = None, session: YouTubeSession = None, backend: str = None, pipeline: bool = False, output_format: str = None, store: VideoStore = None, uploads: bool = False, stats: ScrapeStats = None, single_dir: Path = None) -> List[Dict]:
     # Get API key from environment if not provided
-    api_key = api_key or os.getenv('YOUTUBE_API_KEY')
+    api_key = api_key or (session.api_key if session else None) or os.getenv('YOUTUBE_API_KEY')
     if not api_key:
         sys.exit("Error: YouTube API key not found. Please set YOUTUBE_API_KEY in .env file or provide it via --api_key")
     
+    # Only touch the shared cache when the caller overrides the default behaviour
+    if not use_cache or refresh_cache:
+        configure_cache(enabled=use_cache, refresh=refresh_cache)
+    if rate is not None or quota_budget is not None:
+        scheduler = get_scheduler()
+        configure_scheduler(
+            rate=rate if rate is not None else scheduler.rate,
+            daily_budget=quota_budget if quota_budget is not None else scheduler.daily_budget,
+        )
+    
     # Set default output file if not provided
     out_file = out_file or Path("playlists.csv")
+    # --format wins over the extension of --out; the extension is adjusted to match
+    output_format = format_for_path(out_file, output_format)
+    out_file = output_path(out_file, output_format)
+    
+    # Reuse the caller's session (client + memoized lookups) when one is given
+    session = session or YouTubeSession(api_key)
+    youtube = session.client
+    # Aggregates are filled while rows are produced; the caller may pass its own to collect several runs
+    stats = stats if stats is not None else ScrapeStats()
+
+    def write_summary(path: Path) -> None:
+        if stats.write(path):
+            print(f"📈 Resumo salvo em {path.resolve()}")
     
-    youtube = build("youtube", "v3", developerKey=api_key, cache_discovery=False)
+    backend = backend or DEFAULT_BACKEND
     
     # Create playlists directory only if we're not returning data
     playlists_dir = Path("playlists")
@@ -270,28 +931,85 @@ def main(api_key: str = None, out_file: Path = None, split_by_playlist: bool = F
             if not playlist_id:
                 sys.exit("URL da playlist inválida.")
         
-        playlist = get_playlist_info(youtube, playlist_id)
-        channel_dir = playlists_dir / "single_playlists"
+        if resume and not return_data:
+            print("⚠️  --resume ignorado: só raspagens de canal têm journal de retomada")
+        playlist = session.playlist_info(playlist_id)
+        # Playlists avulsas vão para playlists/single_playlists, salvo se o chamador der outra pasta
+        channel_dir = Path(single_dir) if single_dir else playlists_dir / "single_playlists"
         
         # Get channel name for the playlist
-        channel_info = get_channel_info(youtube, playlist["channelId"])
+        channel_info = session.channel_info(playlist["channelId"])
         channel_name = channel_info["title"]
         
-        result = process_playlist(youtube, playlist, True, channel_dir, channel_name, return_data, progress_queue)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            batches = iter_pipelined_batches(session, playlist_id, pool, max(1, workers) * PREFETCH_PER_WORKER) if pipeline else None
+            if batches is None and backend == "async":
+                from async_backend import fetch_playlists_sync  # optional dependency (httpx)
+                [(_, video_ids, meta)] = fetch_playlists_sync(api_key, [playlist], concurrency=workers)
+                playlist = {**playlist, "itemCount": len(video_ids)}
+                batches = [(video_ids, meta)]
+            if store is not None:
+                if batches is None:
+                    video_ids = iter_videos_in_playlist(youtube, playlist_id)
+                    playlist = {**playlist, "itemCount": len(video_ids)}
+                    batches = iter_metadata_batches(youtube, video_ids)
+                store.save_channel(playlist["channelId"], channel_name)
+                batches = store.record_batches(playlist["channelId"], playlist, batches)
+            playlist_stats = stats.playlist(channel_name, playlist)
+            result = process_playlist(youtube, playlist, True, channel_dir, channel_name, return_data, progress_queue,
+                                      batches=batches, output_format=output_format, stats=playlist_stats)
+        if not return_data and playlist_stats.videos:
+            # Sem linhas não há arquivo da playlist, então também não há resumo ao lado dele
+            write_summary(summary_path(playlist_csv_path(channel_dir, playlist["title"], output_format)))
         if progress_queue:
             progress_queue.put({"status": "completed", "message": "Download concluído com sucesso!", "progress": 100})
         return result
     else:
         # Process all playlists from channel
-        channel_id = get_channel_id(youtube, channel)
-        channel_info = get_channel_info(youtube, channel_id)
+        channel_id = session.channel_id(channel)
+        channel_info = session.channel_info(channel_id)
         channel_name = channel_info["title"]
-        channel_dir = playlists_dir / channel.lstrip("@")
+        channel_dir = playlists_dir / channel_dir_name(channel)
+        
+        # Journal the job so an interrupted run can pick up where it stopped
+        # (only CSV output can be truncated back to a checkpoint)
+        checkpoint = None
+        conflicts = resume_conflicts(incremental, backend, pipeline, uploads, output_format)
+        if not return_data and not conflicts:
+            job_key = f"{channel_id}|{'split' if split_by_playlist else out_file.name}"
+            checkpoint = Checkpoint.for_channel(channel_dir, job_key, resume)
+            if checkpoint.resumed and resumable_outputs_missing(checkpoint, channel_dir, split_by_playlist,
+                                                                 channel_dir / out_file.name):
+                print(f"⚠️  A saída registrada em {checkpoint.path} não existe mais; descartando o journal e recomeçando")
+                checkpoint.close()
+                checkpoint = Checkpoint.for_channel(channel_dir, job_key, resume=False)
+            if checkpoint.resumed:
+                print(f"↩️  Retomando a partir de {checkpoint.path}")
+        elif resume and not return_data:
+            print(f"⚠️  --resume ignorado: não há journal de retomada com {', '.join(conflicts)}")
         
         # Get all playlists first
-        playlists = list(iter_playlists(youtube, channel_id))
+        if checkpoint is not None and checkpoint.playlists is not None:
+            playlists = checkpoint.playlists
+        else:
+            playlists = session.playlists(channel_id)
+            if checkpoint is not None:
+                checkpoint.record_playlists(playlists)
+        if uploads:
+            # A playlist de uploads vem por último: ao chegar nela todas as outras já foram vistas,
+            # e os vídeos que ela compartilha com elas já têm metadados (threads: um videos.list por vídeo)
+            uploads_playlist = session.uploads_playlist(channel_id)
+            playlists = playlists + [uploads_playlist]
         total_playlists = len(playlists)
         
+        scheduler = get_scheduler()
+        projected = project_channel_quota((pl.get("itemCount", 0) for pl in playlists),
+                                          resolve_method=session.resolution_method(channel))
+        print(f"📊 Quota projetada: ~{projected} unidades "
+              f"(usadas hoje: {scheduler.used_today}/{scheduler.daily_budget})")
+        if projected > scheduler.remaining:
+            print(f"⚠️  A projeção excede as {scheduler.remaining} unidades restantes do orçamento diário")
+        
         if progress_queue:
             progress_queue.put({
                 "status": "in_progress",
@@ -299,10 +1017,39 @@ def main(api_key: str = None, out_file: Path = None, split_by_playlist: bool = F
                 "progress": 0
             })
         
+        # Every engine yields (playlist, batches of (videoIds, metadata)) in playlist order.
+        # Incremental mode only makes sense when files are written to disk
+        state = None
+        uploads_id = uploads_playlist["id"] if uploads else None
+        if incremental and not return_data:
+            state = ScrapeState.for_channel(channel_dir)
+            playlists_changed = set(state.playlists) != {pl["id"] for pl in playlists}
+            fetched = fetch_incremental_playlists(session, playlists, state, workers)
+            if uploads and (state.changed or playlists_changed):
+                state.changed.add(uploads_playlist["id"])   # os vídeos fora de playlists dependem de todas elas
+        elif backend == "async":
+            from async_backend import fetch_playlists_sync  # optional dependency (httpx)
+            fetched = fetch_playlists_sync(api_key, playlists, concurrency=workers, uploads_id=uploads_id)
+        elif pipeline:
+            fetched = None
+        else:
+            fetched = iter_fetched_playlists(session, playlists, workers, checkpoint, uploads_id)
+        if fetched is None:
+            playlist_batches = iter_pipelined_playlists(session, playlists, workers, uploads_id)
+        else:
+            playlist_batches = ((pl, [(video_ids, meta)]) for pl, video_ids, meta in fetched)
+        if uploads:
+            playlist_batches = iter_unlisted_uploads(playlist_batches, uploads_playlist["id"])
+        if store is not None:
+            kind, value = parse_channel_ref(channel)
+            store.save_channel(channel_id, channel_name, value if kind == "handle" else None)
+            playlist_batches = ((pl, store.record_batches(channel_id, pl, batches)) for pl, batches in playlist_batches)
+        
         if split_by_playlist:
             # Process each playlist separately
             all_data = []
-            for i, pl in enumerate(playlists, 1):
+            paths = playlist_file_paths(channel_dir, playlists, output_format)
+            for i, (pl, batches) in enumerate(playlist_batches, 1):
                 if progress_queue:
                     progress = ((i - 1) / total_playlists) * 100
                     progress_queue.put({
@@ -310,67 +1057,133 @@ def main(api_key: str = None, out_file: Path = None, split_by_playlist: bool = F
                         "message": f"Processando playlist {i} de {total_playlists}",
                         "progress": progress
                     })
-                result = process_playlist(youtube, pl, True, channel_dir, channel_name, return_data, progress_queue)
+                if state is not None:
+                    previous_file = state.output_file(pl["id"])
+                    if not state.is_changed(pl["id"]) and previous_file and previous_file.exists():
+                        print(f"⏭️  Playlist '{pl['title']}' sem alterações, mantendo {previous_file}")
+                        if state.stats(pl["id"]):
+                            stats.restore(channel_name, PlaylistStats.from_dict(state.stats(pl["id"])))
+                        continue
+                if checkpoint is not None and checkpoint.is_done(pl["id"]):
+                    if checkpoint.stats(pl["id"]):
+                        stats.restore(channel_name, PlaylistStats.from_dict(checkpoint.stats(pl["id"])))
+                    continue
+                pl_stats = stats.playlist(channel_name, pl)
+                result = process_playlist(youtube, pl, True, channel_dir, channel_name, return_data, progress_queue,
+                                          batches=batches, output_format=output_format, stats=pl_stats, path=paths[pl["id"]])
+                if state is not None:
+                    state.set_output_file(pl["id"], paths[pl["id"]])
+                    state.set_stats(pl["id"], pl_stats.to_dict())
+                if checkpoint is not None:
+                    checkpoint.record_playlist_done(pl["id"], stats=pl_stats.to_dict())
                 if return_data and result:
                     all_data.extend(result)
             
+            if state is not None:
+                state.save([pl["id"] for pl in playlists])
+            if checkpoint is not None:
+                checkpoint.finish()
+            if not return_data:
+                write_summary(channel_dir / SUMMARY_FILENAME)
             if progress_queue:
                 progress_queue.put({"status": "completed", "message": "Download concluído com sucesso!", "progress": 100})
             return all_data if return_data else None
         else:
             # Process all playlists into a single CSV
+            out_file = channel_dir / out_file.name
+            if state is not None and not playlists_changed and not state.changed and out_file.exists():
+                state.save([pl["id"] for pl in playlists])
+                for pl in playlists:
+                    if state.stats(pl["id"]):
+                        stats.restore(channel_name, PlaylistStats.from_dict(state.stats(pl["id"])))
+                write_summary(summary_path(out_file))
+                print(f"⏭️  Nenhuma playlist alterada, mantendo {out_file.resolve()}")
+                if progress_queue:
+                    progress_queue.put({"status": "completed", "message": "Nenhuma alteração desde a última execução.", "progress": 100})
+                return None
+
+            # Rows go straight to disk playlist by playlist unless the caller wants them back
             rows = []
+            resume_offset = checkpoint.last_offset() if checkpoint is not None and checkpoint.resumed else None
+            writer = None if return_data else open_writer(out_file, output_format, resume_offset=resume_offset)
             total_skipped = 0
             
-            for i, pl in enumerate(playlists, 1):
-                if progress_queue:
-                    progress = ((i - 1) / total_playlists) * 100
-                    progress_queue.put({
-                        "status": "in_progress",
-                        "message": f"Processando playlist {i} de {total_playlists}",
-                        "progress": progress
-                    })
-                
-                video_ids = iter_videos_in_playlist(youtube, pl["id"])
-                if not video_ids:  # Skip if no videos found
-                    print(f"⚠️  Playlist '{pl['title']}' está vazia, pulando...")
-                    continue
-                    
-                meta = get_videos_metadata(youtube, video_ids)
-                skipped = 0
-                total_videos = len(video_ids)
-                processed = 0
-                
-                for vid in video_ids:            # preserva a ordem da playlist
-                    info = meta.get(vid)
-                    if not info:  # Skip if video is unavailable
-                        skipped += 1
-                        continue
-                    rows.append({
-                        "channel": channel_name,
-                        "playlist": pl["title"],
-                        "videoTitle": info["title"],
-                        "description": info["description"],
-                        "duration": info["duration"],
-                    })
-                    processed += 1
-                    if progress_queue and processed % 5 == 0:  # Atualiza a cada 5 vídeos
-                        playlist_progress = processed / total_videos
-                        total_progress = ((i - 1 + playlist_progress) / total_playlists) * 100
+            try:
+                for i, (pl, batches) in enumerate(playlist_batches, 1):
+                    if progress_queue:
+                        progress = ((i - 1) / total_playlists) * 100
                         progress_queue.put({
                             "status": "in_progress",
-                            "message": f"Processando playlist {i} de {total_playlists} ({processed}/{total_videos} vídeos)",
-                            "progress": total_progress
+                            "message": f"Processando playlist {i} de {total_playlists}",
+                            "progress": progress
                         })
-                
-                if skipped > 0:
-                    print(f"ℹ️  {skipped} vídeo(s) indisponível(is) na playlist '{pl['title']}'")
-                    total_skipped += skipped
+                    
+                    if checkpoint is not None and checkpoint.is_done(pl["id"]):
+                        if checkpoint.stats(pl["id"]):
+                            stats.restore(channel_name, PlaylistStats.from_dict(checkpoint.stats(pl["id"])))
+                        continue
+                    
+                    if isinstance(batches, list):
+                        total_videos = sum(len(chunk) for chunk, _ in batches)
+                    else:
+                        total_videos = pl.get("itemCount", 0)
+                    skipped = 0
+                    processed = 0
+                    pl_stats = stats.playlist(channel_name, pl)
+                    
+                    for chunk, meta in batches:
+                        batch_rows = []
+                        started = time.perf_counter()
+                        for vid in chunk:            # preserva a ordem da playlist
+                            info = meta.get(vid)
+                            if not info:  # Skip if video is unavailable
+                                skipped += 1
+                                continue
+                            batch_rows.append(make_row(channel_name, pl["title"], info))
+                            pl_stats.add(info)
+                            processed += 1
+                            if progress_queue and processed % 5 == 0:  # Atualiza a cada 5 vídeos
+                                playlist_progress = min(processed / total_videos, 1) if total_videos else 0
+                                total_progress = ((i - 1 + playlist_progress) / total_playlists) * 100
+                                progress_queue.put({
+                                    "status": "in_progress",
+                                    "message": f"Processando playlist {i} de {total_playlists} ({processed}/{total_videos} vídeos)",
+                                    "progress": total_progress
+                                })
+                        get_metrics().record_stage("rows", time.perf_counter() - started)
+                        if writer is not None:
+                            writer.write_rows(batch_rows)
+                        else:
+                            rows.extend(batch_rows)
+                    
+                    pl_stats.unavailable += skipped
+                    if state is not None:
+                        state.set_stats(pl["id"], pl_stats.to_dict())
+                    if not processed and not skipped:  # Skip if no videos found
+                        print(f"⚠️  Playlist '{pl['title']}' está vazia, pulando...")
+                    if writer is not None:
+                        writer.end_group()  # um row group por playlist nos formatos colunares
+                    if checkpoint is not None:
+                        checkpoint.record_playlist_done(pl["id"], writer.tell(), pl_stats.to_dict())
+                    
+                    if skipped > 0:
+                        print(f"ℹ️  {skipped} vídeo(s) indisponível(is) na playlist '{pl['title']}'")
+                        total_skipped += skipped
+            finally:
+                if writer is not None:
+                    writer.close()
+
+            if state is not None:
+                state.save([pl["id"] for pl in playlists])
+            if checkpoint is not None:
+                checkpoint.finish()
+            if not return_data:
+                write_summary(summary_path(out_file))
 
             if total_skipped > 0:
                 print(f"ℹ️  Total de {total_skipped} vídeo(s) indisponível(is) em todas as playlists")
 
-            if not rows:  # Check if we have any data at all
+            if not rows and not (writer and (writer.rows or resume_offset)):  # Check if we have any data at all
                 print("⚠️  Nenhum dado válido encontrado em nenhuma playlist!")
                 if progress_queue:
                     progress_queue.put({"status": "completed", "message": "Nenhum dado válido encontrado!", "progress": 100})
@@ -381,22 +1194,122 @@ def main(api_key: str = None, out_file: Path = None, split_by_playlist: bool = F
                     progress_queue.put({"status": "completed", "message": "Download concluído com sucesso!", "progress": 100})
                 return rows
 
-            # Save the single CSV in the channel directory
-            out_file = channel_dir / out_file.name
-            df = pd.DataFrame(rows, columns=["channel", "playlist", "videoTitle", "description", "duration"])
-            df.to_csv(out_file, index=False, encoding="utf-8", quoting=csv.QUOTE_ALL)
-            print(f"✅ CSV salvo em {out_file.resolve()}  ({len(df)} linhas)")
+            print(f"✅ Arquivo salvo em {out_file.resolve()}  ({writer.rows} linhas)")
             
             if progress_queue:
                 progress_queue.put({"status": "completed", "message": "Download concluído com sucesso!", "progress": 100})
             return None
 
+def query_main(argv: List[str]) -> None:
+    """Subcomando ``query``: busca no banco de vídeos gravado com --store."""
+    ap = argparse.ArgumentParser(prog="youtube_playlist_scraper.py query",
+                                 description="Busca vídeos no banco local (título e descrição)")
+    ap.add_argument("text", nargs="*", help="Termos de busca (todos precisam aparecer)")
+    ap.add_argument("--store", type=Path, default=DEFAULT_STORE_PATH, help="Banco de vídeos (padrão: %(default)s)")
+    ap.add_argument("-c", "--channel", help="Filtra por canal (ID, título ou handle)")
+    ap.add_argument("-p", "--playlist", help="Filtra por playlist (ID ou título)")
+    ap.add_argument("-n", "--limit", type=int, default=DEFAULT_SEARCH_LIMIT, help="Máximo de resultados (padrão: %(default)s)")
+    ap.add_argument("--json", action="store_true", help="Imprime os resultados em JSON")
+    args = ap.parse_args(argv)
+    if not args.store.exists():
+        sys.exit(f"Banco de vídeos não encontrado: {args.store}. Raspe com --store antes de consultar.")
+
+    store = VideoStore(args.store)
+    started = time.perf_counter()
+    results = store.search(" ".join(args.text), channel=args.channel, playlist=args.playlist, limit=args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    store.close()
+    if args.json:
+        import json
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    for video in results:
+        playlists = ", ".join(f"{pl['channel']} / {pl['title']}" for pl in video["playlists"])
+        print(f"{video['id']}  [{video['duration']}]  {video['title']}")
+        if playlists:
+            print(f"    {playlists}")
+        if video["snippet"]:
+            print(f"    {video['snippet']}")
+    print(f"🔎 {len(results)} resultado(s) em {elapsed:.1f} ms")
+
+def merge_main(argv: List[str]) -> None:
+    """Subcomando ``merge``: junta as saídas dos shards de um modo lote."""
+    from batch import BATCH_DIR, merge_outputs
+    ap = argparse.ArgumentParser(prog="youtube_playlist_scraper.py merge",
+                                 description="Junta as saídas de todos os shards na ordem do arquivo de alvos")
+    ap.add_argument("-o", "--out", type=Path, default=Path("playlists") / "merged.csv",
+                    help="Arquivo final (padrão: %(default)s; a extensão segue o formato dos shards)")
+    ap.add_argument("--batch-dir", type=Path, default=BATCH_DIR, help="Pasta dos manifestos (padrão: %(default)s)")
+    ap.add_argument("--allow-partial", action="store_true", help="Junta mesmo que falte algum shard")
+    args = ap.parse_args(argv)
+    try:
+        merge_outputs(args.out, args.batch_dir, args.allow_partial)
+    except Exception as e:
+        sys.exit(f"❌ {e}")
+
+def sweep_main(argv: List[str]) -> None:
+    """Subcomando ``sweep``: mantém uma lista de canais e playlists atualizada conforme a taxa de mudança de cada um."""
+    import sweep
+    ap = argparse.ArgumentParser(prog="youtube_playlist_scraper.py sweep",
+                                 description="Verifica os alvos com chamadas baratas e só raspa o que mudou, "
+                                             "com intervalos que se adaptam à frequência de mudança de cada alvo")
+    ap.add_argument("watchlist", type=Path, help="Arquivo com um canal ou URL de playlist por linha (relido quando muda)")
+    ap.add_argument("--api_key", help="YouTube Data API v3 key (optional if set in .env file)")
+    ap.add_argument("-j", "--jobs", type=int, default=sweep.DEFAULT_JOBS, help="Raspagens simultâneas (padrão: %(default)s)")
+    ap.add_argument("--min-interval", type=sweep.parse_duration, default=sweep.DEFAULT_MIN_INTERVAL,
+                    help="Intervalo mínimo entre verificações de um alvo, ex.: 90s, 15m, 6h, 7d (padrão: 15m)")
+    ap.add_argument("--max-interval", type=sweep.parse_duration, default=sweep.DEFAULT_MAX_INTERVAL,
+                    help="Intervalo máximo entre verificações e entre raspagens completas de um alvo (padrão: 7d)")
+    ap.add_argument("--state", type=Path, default=sweep.DEFAULT_STATE_PATH, help="Histórico dos alvos (padrão: %(default)s)")
+    ap.add_argument("--once", action="store_true", help="Verifica só os alvos vencidos agora e termina")
+    ap.add_argument("-o", "--out", default="playlists.csv", help="Nome do arquivo de saída de cada canal (padrão: %(default)s)")
+    ap.add_argument("--split", action="store_true", help="Gera um arquivo separado para cada playlist")
+    ap.add_argument("--format", choices=OUTPUT_FORMATS, default=None, help="Formato de saída: csv, parquet ou arrow")
+    ap.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                    help="Playlists buscadas em paralelo dentro de cada raspagem (padrão: %(default)s)")
+    ap.add_argument("--uploads", action="store_true", help="Inclui os vídeos de canais que não estão em nenhuma playlist")
+    ap.add_argument("--store", type=Path, nargs="?", const=DEFAULT_STORE_PATH, metavar="ARQUIVO",
+                    help=f"Grava os vídeos no banco SQLite pesquisável (padrão: {DEFAULT_STORE_PATH})")
+    ap.add_argument("--rps", type=float, default=None, help="Máximo de requisições por segundo à API (padrão: 10)")
+    ap.add_argument("--quota-budget", type=int, default=None, help="Orçamento diário de unidades de quota (padrão: 10000)")
+    args = ap.parse_args(argv)
+    api_key = args.api_key or os.getenv('YOUTUBE_API_KEY')
+    if not api_key:
+        sys.exit("Error: YouTube API key not found. Please set YOUTUBE_API_KEY in .env file or provide it via --api_key")
+    if not args.watchlist.exists():
+        sys.exit(f"Arquivo de alvos não encontrado: {args.watchlist}")
+    if args.min_interval > args.max_interval:
+        sys.exit("--min-interval não pode ser maior que --max-interval")
+    if args.rps is not None or args.quota_budget is not None:
+        scheduler = get_scheduler()
+        configure_scheduler(rate=args.rps if args.rps is not None else scheduler.rate,
+                            daily_budget=args.quota_budget if args.quota_budget is not None else scheduler.daily_budget)
+    daemon = sweep.SweepDaemon(
+        api_key, args.watchlist, jobs=args.jobs, min_interval=args.min_interval, max_interval=args.max_interval,
+        state_path=args.state, out_file=Path(args.out), split=args.split, output_format=args.format,
+        workers=args.workers, store=VideoStore(args.store) if args.store else None, uploads=args.uploads,
+    )
+    daemon.run(once=args.once)
+    report = get_scheduler().report()
+    print(f"📊 Quota usada: {sum(report['units'].values())} unidades ({report['usedToday']}/{report['dailyBudget']} hoje)")
+
 if __name__ == "__main__":
-    ap = argparse.ArgumentParser()
+    if sys.argv[1:2] == ["query"]:
+        query_main(sys.argv[2:])
+        sys.exit(0)
+    if sys.argv[1:2] == ["merge"]:
+        merge_main(sys.argv[2:])
+        sys.exit(0)
+    if sys.argv[1:2] == ["sweep"]:
+        sweep_main(sys.argv[2:])
+        sys.exit(0)
+    ap = argparse.ArgumentParser(epilog="Para buscar nos vídeos já gravados: %(prog)s query TEXTO [--store ARQUIVO]. "
+                                        "Para juntar os shards de um lote: %(prog)s merge [-o ARQUIVO]. "
+                                        "Para manter uma lista de alvos atualizada: %(prog)s sweep ARQUIVO")
     ap.add_argument("--api_key", help="YouTube Data API v3 key (optional if set in .env file)")
     ap.add_argument(
         "-o", "--out", default="playlists.csv",
-        help="CSV de saída (padrão: %(default)s). Se --split for usado, será ignorado"
+        help="Arquivo de saída (padrão: %(default)s; .parquet ou .arrow mudam o formato). Se --split for usado, será ignorado"
     )
     ap.add_argument(
         "--split", action="store_true",
@@ -405,11 +1318,117 @@ if __name__ == "__main__":
     group = ap.add_mutually_exclusive_group(required=True)
     group.add_argument(
         "-c", "--channel",
-        help="Handle do canal (ex: @NomeDoCanal)"
+        help="Canal: handle (ex: @NomeDoCanal), ID (UC...) ou URL do canal"
     )
     group.add_argument(
         "-p", "--playlist",
         help="URL da playlist do YouTube"
     )
+    group.add_argument(
+        "-b", "--batch", type=Path, metavar="ARQUIVO",
+        help="Arquivo com um canal ou URL de playlist por linha, raspados num pool de processos"
+    )
+    ap.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="Processos do modo lote (padrão: 4)"
+    )
+    ap.add_argument(
+        "--shard", default="0/1", metavar="i/N",
+        help="No modo lote, processa só a fatia i (de 0 a N-1) dos alvos (padrão: %(default)s)"
+    )
+    ap.add_argument(
+        "--run-id", default=None, metavar="ID",
+        help="No modo lote, ID da execução compartilhado pelos shards (padrão: derivado dos alvos, de N e das opções de saída)"
+    )
+    ap.add_argument(
+        "-w", "--workers", type=int, default=DEFAULT_WORKERS,
+        help="Número de playlists buscadas em paralelo (padrão: %(default)s)"
+    )
+    ap.add_argument(
+        "--no-cache", action="store_true",
+        help="Não usa o cache local de respostas da API"
+    )
+    ap.add_argument(
+        "--refresh", action="store_true",
+        help="Ignora o cache local e grava as respostas novas nele"
+    )
+    ap.add_argument(
+        "--incremental", action="store_true",
+        help="Reaproveita o estado da última execução do canal e só regrava playlists alteradas"
+    )
+    ap.add_argument(
+        "--resume", action="store_true",
+        help="Retoma uma raspagem de canal interrompida a partir do journal salvo"
+    )
+    ap.add_argument(
+        "--rps", type=float, default=None,
+        help="Máximo de requisições por segundo à API (padrão: 10)"
+    )
+    ap.add_argument(
+        "--quota-budget", type=int, default=None,
+        help="Orçamento diário de unidades de quota (padrão: 10000)"
+    )
+    ap.add_argument(
+        "--pipeline", action="store_true",
+        help="Sobrepõe a paginação de playlistItems e as chamadas de videos.list (bom para playlists enormes)"
+    )
+    ap.add_argument(
+        "--uploads", action="store_true",
+        help=f"Lê também a playlist de uploads do canal e inclui os vídeos que não estão em nenhuma playlist (como '{UPLOADS_TITLE}')"
+    )
+    ap.add_argument(
+        "--backend", choices=BACKENDS, default=DEFAULT_BACKEND,
+        help="Motor de busca: 'threads' (googleapiclient) ou 'async' (httpx, requer httpx instalado)"
+    )
+    ap.add_argument(
+        "--format", choices=OUTPUT_FORMATS, default=None,
+        help="Formato de saída: csv, parquet ou arrow (padrão: deduzido da extensão de --out, ou csv)"
+    )
+    ap.add_argument(
+        "--store", type=Path, nargs="?", const=DEFAULT_STORE_PATH, metavar="ARQUIVO",
+        help=f"Grava canais, playlists e vídeos num banco SQLite pesquisável (padrão: {DEFAULT_STORE_PATH})"
+    )
+    ap.add_argument(
+        "--profile", type=Path, metavar="ARQUIVO",
+        help="Grava um relatório JSON com latências por endpoint e tempo gasto em cada etapa"
+    )
     args = ap.parse_args()
-    main(args.api_key, Path(args.out), args.split, args.channel, args.playlist)
+    if args.resume:
+        conflicts = resume_conflicts(args.incremental, args.backend, args.pipeline, args.uploads,
+                                     format_for_path(Path(args.out), args.format))
+        if args.playlist and not args.batch:
+            conflicts.append("--playlist")
+        if conflicts:
+            ap.error(f"--resume não pode ser usado com {', '.join(conflicts)} (só raspagens de canal em CSV com o backend threads)")
+    started = time.perf_counter()
+    if args.batch:
+        from batch import DEFAULT_JOBS, run_batch
+        api_key = args.api_key or os.getenv('YOUTUBE_API_KEY')
+        if not api_key:
+            sys.exit("Error: YouTube API key not found. Please set YOUTUBE_API_KEY in .env file or provide it via --api_key")
+        if args.quota_budget is not None:
+            configure_scheduler(daily_budget=args.quota_budget)
+        try:
+            run_batch(api_key, args.batch, shard=args.shard, jobs=args.jobs or DEFAULT_JOBS, out_file=Path(args.out),
+                      split=args.split, output_format=args.format, workers=args.workers, rate=args.rps,
+                      use_cache=not args.no_cache, refresh_cache=args.refresh, incremental=args.incremental,
+                      resume=args.resume, backend=args.backend, pipeline=args.pipeline, store=args.store,
+                      uploads=args.uploads, run_id=args.run_id)
+        except ValueError as e:
+            sys.exit(f"❌ {e}")
+    else:
+        main(args.api_key, Path(args.out), args.split, args.channel, args.playlist, workers=args.workers,
+             use_cache=not args.no_cache, refresh_cache=args.refresh, incremental=args.incremental,
+             resume=args.resume, rate=args.rps, quota_budget=args.quota_budget, backend=args.backend,
+             pipeline=args.pipeline, output_format=args.format, store=VideoStore(args.store) if args.store else None,
+             uploads=args.uploads)
+    report = get_scheduler().report()
+    print(f"📊 Quota usada nesta execução: {sum(report['units'].values())} unidades "
+          f"({report['usedToday']}/{report['dailyBudget']} hoje)")
+    if report["bytesIn"]:
+        print("📥 Bytes recebidos: " + ", ".join(f"{ep} {n / 1024:.1f} KiB" for ep, n in report["bytesIn"].items()))
+    if args.profile:
+        import json
+        profile = {"wallSeconds": time.perf_counter() - started, **get_metrics().snapshot()}
+        args.profile.write_text(json.dumps(profile, indent=2), encoding="utf-8")
+        print(f"⏱️  Perfil salvo em {args.profile.resolve()}")